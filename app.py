@@ -1,8 +1,16 @@
 import logging
 from flask import Flask
 from config import Config
-from extensions import ma, bcrypt
+from extensions import ma, bcrypt, token_cache, token_generations, password_hasher, rate_limiter, user_cache, response_cache
 from database import init_db
+from commands import maintenance_cli
+from manager.maintenance_manager import MaintenanceManager
+from services.scheduler import PeriodicJob, start_on_first_request
+from services.sms_dispatcher import sms_dispatcher
+from services.phone_lookup import phone_lookup_cache
+from services.number_plan import number_plan
+from services.json_provider import FastJSONProvider
+from twilio_client import configure_twilio_breakers
 from routers.user_router import user
 from routers.todo_router import todo
 
@@ -11,6 +19,7 @@ load_dotenv()
 
 def create_app(config_class=Config):
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
     app.config.from_object(config_class)
 
     logging.basicConfig(
@@ -20,12 +29,59 @@ def create_app(config_class=Config):
     )
 
     ma.init_app(app)
-    bcrypt.init_app(app)
+    token_cache.init_app(app)
+    token_generations.init_app(app)
+    user_cache.init_app(app)
+    response_cache.init_app(app)
+    rate_limiter.init_app(app)
 
     app.register_blueprint(user, url_prefix='/user')
     app.register_blueprint(todo, url_prefix='/todo')
 
     init_db(app)
+    if app.config.get("BCRYPT_AUTO_CALIBRATE"):
+        # Calibrated once and shared through the database, so every worker and host uses the same cost
+        with app.app_context():
+            cost = MaintenanceManager().get_bcrypt_cost()
+        app.config["BCRYPT_LOG_ROUNDS"] = cost["rounds"]
+        logging.info(
+            f"bcrypt cost set to {cost['rounds']}, calibrated on {cost['host']} "
+            f"at {cost['elapsed_ms']} ms per hash (target {cost['target_ms']} ms)"
+        )
+    else:
+        logging.info(f"bcrypt cost set to {app.config.get('BCRYPT_LOG_ROUNDS', 12)} from config")
+    bcrypt.init_app(app)
+    password_hasher.init_app(app)
+
+    app.cli.add_command(maintenance_cli)
+    configure_twilio_breakers(app)
+    number_plan.init_app(app)
+    phone_lookup_cache.init_app(app)
+    sms_dispatcher.init_app(app)
+
+    background_workers = []
+    if app.config.get("SMS_DISPATCHER_ENABLED", True):
+        background_workers.append(sms_dispatcher)
+
+    purge_interval = app.config.get("PURGE_INTERVAL_SECONDS", 0)
+    if purge_interval > 0:
+        app.extensions["purge_job"] = PeriodicJob(app, purge_interval, MaintenanceManager().purge_expired, name="purge-expired")
+        background_workers.append(app.extensions["purge_job"])
+
+    stats_interval = app.config.get("CACHE_STATS_INTERVAL_SECONDS", 0)
+    if stats_interval > 0:
+        app.extensions["cache_stats_job"] = PeriodicJob(
+            app, stats_interval, MaintenanceManager().publish_cache_stats, name="publish-cache-stats"
+        )
+        background_workers.append(app.extensions["cache_stats_job"])
+
+    def start_background_workers():
+        for worker in background_workers:
+            worker.start()
+
+    # Only a process that serves requests runs them, not CLI commands
+    if background_workers and not app.testing:
+        start_on_first_request(app, start_background_workers)
 
     return app
 
@@ -0,0 +1,67 @@
+"""
+Benchmark: bcrypt password verification throughput, inline on request threads vs the process pool,
+at several cost factors. While logins run, a light "todo" task is timed on the same threads to show
+how much hashing starves other requests.
+
+Usage:
+    python benchmarks/bench_login_hashing.py [--costs 8 10 12] [--logins 32] [--threads 8] [--workers 4]
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from flask import Flask
+from flask_bcrypt import Bcrypt
+from services.hashing import PasswordHasher
+
+
+def light_request():
+    started = time.perf_counter()
+    sum(range(2000))
+    return (time.perf_counter() - started) * 1000
+
+
+def run(hasher, pw_hash, logins, threads):
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        started = time.perf_counter()
+        login_futures = [pool.submit(hasher.check_password_hash, pw_hash, "Secret123@") for _ in range(logins)]
+        light_futures = [pool.submit(light_request) for _ in range(logins)]
+        assert all(f.result() for f in login_futures)
+        elapsed = time.perf_counter() - started
+        light = [f.result() for f in light_futures]
+    return logins / elapsed, statistics.median(light), max(light)
+
+
+def make_hasher(cost, workers, queue_limit):
+    app = Flask(__name__)
+    app.config.update(BCRYPT_LOG_ROUNDS=cost, HASH_POOL_WORKERS=workers, HASH_QUEUE_LIMIT=queue_limit)
+    return PasswordHasher(app)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--costs", type=int, nargs="+", default=[8, 10, 12])
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+
+    print(f"{'cost':>4} {'mode':>7} {'logins/s':>9} {'light p50 ms':>13} {'light max ms':>13}")
+    for cost in args.costs:
+        pw_hash = Bcrypt().generate_password_hash("Secret123@", rounds=cost).decode("utf-8")
+        for mode, workers in (("inline", 0), ("pooled", args.workers)):
+            hasher = make_hasher(cost, workers, args.logins)
+            if workers:
+                hasher.check_password_hash(pw_hash, "Secret123@")   # warm up the pool
+            rate, light_p50, light_max = run(hasher, pw_hash, args.logins, args.threads)
+            hasher.shutdown()
+            print(f"{cost:>4} {mode:>7} {rate:>9.1f} {light_p50:>13.3f} {light_max:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
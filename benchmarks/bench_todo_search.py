@@ -0,0 +1,124 @@
+"""
+Benchmark: todo search latency with the full-text index (search_todos, FTS5 + bm25) vs a naive
+LIKE '%term%' scan over task and description, on a synthetic dataset.
+
+Usage:
+    python benchmarks/bench_todo_search.py [--rows 1000000] [--users 10] [--queries 50]
+"""
+import os
+import sys
+import time
+import random
+import itertools
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import insert, or_, text
+from app import create_app
+from config import TestConfig
+from models import db, User, ToDo
+from sql_files.todo_sql import search_todos
+
+COLUMNS = ["uid", "task", "description", "created_at", "modified_at", "status", "user_uid"]
+
+
+def vocabulary(size, rng):
+    syllables = ["ka", "lo", "mi", "ner", "sto", "va", "pri", "den", "tul", "shi", "ro", "bex", "qua", "fen", "dor"]
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def fill_todos(user_uids, count, words, rng):
+    base = datetime(2025, 1, 1)
+    # Zipf-like word frequencies, so queries cover both common and rare words
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(words))))
+    for offset in range(0, count, 20000):
+        rows = []
+        for i in range(offset, min(offset + 20000, count)):
+            rows.append({
+                "uid": f"todo-{i:012d}",
+                "task": " ".join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(2, 6))).capitalize(),
+                "description": " ".join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(5, 30))),
+                "status": "in progress",
+                "created_at": base + timedelta(seconds=i),
+                "modified_at": base + timedelta(seconds=i),
+                "user_uid": user_uids[i % len(user_uids)],
+            })
+        db.session.execute(insert(ToDo), rows)
+    # Built in one pass, like the migration's backfill
+    db.session.execute(text(
+        "INSERT INTO todo_fts (rowid, task, description, user_uid) "
+        "SELECT id, task, description, replace(user_uid, '-', '') FROM todo"
+    ))
+    db.session.commit()
+
+
+def like_scan(user_uid, terms, limit):
+    query = ToDo.query.filter_by(user_uid=user_uid)
+    for term in terms:
+        query = query.filter(or_(ToDo.task.ilike(f"%{term}%"), ToDo.description.ilike(f"%{term}%")))
+    return query.order_by(ToDo.created_at.desc()).with_entities(*(getattr(ToDo, name) for name in COLUMNS)).limit(limit).all()
+
+
+def full_text(user_uid, terms, limit):
+    return search_todos(user_uid, terms, limit, columns=COLUMNS)[0]
+
+
+def time_queries(queries, search, limit):
+    timings = []
+    for user_uid, terms in queries:
+        started = time.perf_counter()
+        search(user_uid, terms, limit)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    words = vocabulary(5000, rng)
+    with tempfile.TemporaryDirectory() as tmp:
+        config = type("BenchConfig", (TestConfig,), {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'bench.db')}"})
+        app = create_app(config)
+        with app.app_context():
+            db.create_all()
+            users = [
+                User(
+                    username=f"bench{i}", first_name="Bench", last_name="User", email=f"bench{i}@example.com",
+                    mobile_number="+919876543210", password="x", phone_verified=True
+                )
+                for i in range(args.users)
+            ]
+            db.session.add_all(users)
+            db.session.commit()
+            user_uids = [user.uid for user in users]
+
+            started = time.perf_counter()
+            fill_todos(user_uids, args.rows, words, rng)
+            print(f"Loaded {args.rows} todos for {args.users} users in {time.perf_counter() - started:.1f} s")
+
+            print(f"{'query':>12} {'LIKE p50 ms':>12} {'LIKE p95 ms':>12} {'FTS p50 ms':>11} {'FTS p95 ms':>11}")
+            bands = {"common": words[:20], "mid": words[200:400], "rare": words[-500:]}
+            for band, pool in bands.items():
+                for term_count in (1, 2):
+                    queries = [(rng.choice(user_uids), rng.sample(pool, term_count)) for _ in range(args.queries)]
+                    like_p50, like_p95 = time_queries(queries, like_scan, args.limit)
+                    fts_p50, fts_p95 = time_queries(queries, full_text, args.limit)
+                    print(f"{band + ' x' + str(term_count):>12} {like_p50:>12.2f} {like_p95:>12.2f} {fts_p50:>11.2f} {fts_p95:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark: /todo/gettodo list rendering with ORM objects + ToDoResponseSchema(many=True).dump + the stdlib
+JSON provider vs column rows + the precompiled serializer + FastJSONProvider (orjson when installed).
+Reports load, dump and encode times separately; both paths must produce the same bytes.
+
+Usage:
+    python benchmarks/bench_todo_serializer.py [--sizes 100 1000 10000] [--repeat 5]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import insert
+from flask.json.provider import DefaultJSONProvider
+from app import create_app
+from config import TestConfig
+from models import db, User, ToDo
+from schemas.todo_schema import ToDoResponseSchema, todo_response_serializer
+from services.json_provider import FastJSONProvider, orjson
+from sql_files.todo_sql import get_todos_by_user
+
+
+def fill_todos(user_uid, count, start):
+    base = datetime(2025, 1, 1)
+    rows = [
+        {
+            "uid": f"todo-{i:012d}",
+            "task": f"Task {i}",
+            "description": "Benchmark item " + "x" * 80 if i % 5 else None,
+            "status": "in progress",
+            "created_at": base + timedelta(seconds=i, microseconds=i % 1000),
+            "modified_at": base + timedelta(seconds=i),
+            "user_uid": user_uid,
+        }
+        for i in range(start, start + count)
+    ]
+    for offset in range(0, len(rows), 5000):
+        db.session.execute(insert(ToDo), rows[offset:offset + 5000])
+    db.session.commit()
+
+
+def timed(func, repeat):
+    """
+    Returns (median ms of load, dump, encode, body) over repeat runs of func, which returns the stage callables.
+    """
+    stages = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        load, dump, encode = func()
+        started = time.perf_counter()
+        rows = load()
+        loaded = time.perf_counter()
+        data = dump(rows)
+        dumped = time.perf_counter()
+        body = encode(data)
+        encoded = time.perf_counter()
+        stages.append(((loaded - started) * 1000, (dumped - loaded) * 1000, (encoded - dumped) * 1000))
+    return tuple(statistics.median(stage) for stage in zip(*stages)) + (body,)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = type("BenchConfig", (TestConfig,), {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'bench.db')}"})
+        app = create_app(config)
+        with app.test_request_context():
+            db.create_all()
+            user = User(
+                username="bench", first_name="Bench", last_name="User", email="bench@example.com",
+                mobile_number="+919876543210", password="x", phone_verified=True
+            )
+            db.session.add(user)
+            db.session.commit()
+            user_uid = user.uid
+            stdlib_json, fast_json = DefaultJSONProvider(app), FastJSONProvider(app)
+
+            baseline = lambda: (
+                lambda: get_todos_by_user(user_uid),
+                ToDoResponseSchema(many=True).dump,
+                lambda data: stdlib_json.response(data).get_data(),
+            )
+            compiled = lambda: (
+                lambda: get_todos_by_user(user_uid, columns=todo_response_serializer.attributes),
+                todo_response_serializer.dump_rows,
+                lambda data: fast_json.response(data).get_data(),
+            )
+
+            print(f"orjson: {'installed' if orjson else 'not installed, stdlib encoder used'}")
+            print(f"{'todos':>8} {'path':>9} {'load ms':>9} {'dump ms':>9} {'encode ms':>10} {'total ms':>9}")
+            total = 0
+            for size in sorted(args.sizes):
+                fill_todos(user_uid, size - total, total)
+                total = size
+                results = {"schema": timed(baseline, args.repeat), "compiled": timed(compiled, args.repeat)}
+                assert results["schema"][3] == results["compiled"][3]
+                for name, (load_ms, dump_ms, encode_ms, _) in results.items():
+                    print(f"{total:>8} {name:>9} {load_ms:>9.2f} {dump_ms:>9.2f} {encode_ms:>10.2f} {load_ms + dump_ms + encode_ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark: peak Python memory and latency of /todo/gettodo serialization, buffered
+(ORM list + ToDoResponseSchema(many=True).dump + jsonify) vs the streaming mode (yield_per + generator).
+
+Usage:
+    python benchmarks/bench_todo_streaming.py [--sizes 1000 10000 100000] [--batch-size 500]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import insert
+from flask import jsonify
+from app import create_app
+from config import TestConfig
+from models import db, User, ToDo
+from schemas.todo_schema import ToDoResponseSchema, todo_response_serializer
+from sql_files.todo_sql import get_todos_by_user, iter_todos_by_user
+from routers.todo_router import stream_todo_list
+
+
+def fill_todos(user_uid, count, start):
+    base = datetime(2025, 1, 1)
+    rows = [
+        {
+            "uid": f"todo-{i:012d}",
+            "task": f"Task {i}",
+            "description": "Benchmark item " + "x" * 80,
+            "status": "in progress",
+            "created_at": base + timedelta(seconds=i),
+            "modified_at": base + timedelta(seconds=i),
+            "user_uid": user_uid,
+        }
+        for i in range(start, start + count)
+    ]
+    for offset in range(0, len(rows), 5000):
+        db.session.execute(insert(ToDo), rows[offset:offset + 5000])
+    db.session.commit()
+
+
+def measure(func):
+    db.session.expunge_all()
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = func()
+    elapsed = (time.perf_counter() - started) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / (1024 * 1024), size
+
+
+def buffered(user_uid):
+    todos = get_todos_by_user(user_uid)
+    return len(jsonify(ToDoResponseSchema(many=True).dump(todos)).get_data())
+
+
+def streamed(user_uid, batch_size):
+    return sum(len(chunk) for chunk in stream_todo_list(
+        iter_todos_by_user(user_uid, None, batch_size, todo_response_serializer.attributes)
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = type("BenchConfig", (TestConfig,), {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'bench.db')}"})
+        app = create_app(config)
+        with app.test_request_context():
+            db.create_all()
+            user = User(
+                username="bench", first_name="Bench", last_name="User", email="bench@example.com",
+                mobile_number="+919876543210", password="x", phone_verified=True
+            )
+            db.session.add(user)
+            db.session.commit()
+            user_uid = user.uid
+
+            print(f"{'todos':>8} {'buffered ms':>12} {'buffered MiB':>13} {'stream ms':>10} {'stream MiB':>11} {'bytes':>12}")
+            total = 0
+            for size in sorted(args.sizes):
+                fill_todos(user_uid, size - total, total)
+                total = size
+                buffered_ms, buffered_mib, buffered_bytes = measure(lambda: buffered(user_uid))
+                stream_ms, stream_mib, stream_bytes = measure(lambda: streamed(user_uid, args.batch_size))
+                assert buffered_bytes == stream_bytes
+                print(f"{total:>8} {buffered_ms:>12.1f} {buffered_mib:>13.2f} {stream_ms:>10.1f} {stream_mib:>11.2f} {stream_bytes:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: user_tokens lookup latency by full token text vs indexed SHA-256 digest.
+
+Usage:
+    python benchmarks/bench_token_lookup.py [--sizes 1000 10000 100000] [--lookups 200]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import insert
+from app import create_app
+from config import TestConfig
+from models import db, UserToken
+from utils import hash_token
+
+
+def fill_tokens(count, start):
+    expiry = datetime.now(timezone.utc) + timedelta(days=7)
+    rows = []
+    for i in range(start, start + count):
+        access_token = f"access.{i:012d}." + "x" * 200
+        refresh_token = f"refresh.{i:012d}." + "y" * 200
+        rows.append({
+            "user_uid": f"user-{i % 1000}",
+            "access_token": access_token,
+            "access_token_digest": hash_token(access_token),
+            "refresh_token": refresh_token,
+            "refresh_token_digest": hash_token(refresh_token),
+            "refresh_token_expiry": expiry,
+            "device_uuid": f"device-{i}",
+        })
+    for offset in range(0, len(rows), 5000):
+        db.session.execute(insert(UserToken), rows[offset:offset + 5000])
+    db.session.commit()
+
+
+def time_lookups(tokens, lookup):
+    timings = []
+    for token in tokens:
+        started = time.perf_counter()
+        lookup(token)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), max(timings)
+
+
+def by_text(token):
+    return UserToken.query.filter_by(access_token=token).first()
+
+
+def by_digest(token):
+    return UserToken.query.filter_by(access_token_digest=hash_token(token)).first()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        print(f"{'rows':>10} {'text p50 ms':>12} {'text max ms':>12} {'digest p50 ms':>14} {'digest max ms':>14}")
+        total = 0
+        for size in sorted(args.sizes):
+            fill_tokens(size - total, total)
+            total = size
+            sample = [f"access.{random.randrange(total):012d}." + "x" * 200 for _ in range(args.lookups)]
+            text_p50, text_max = time_lookups(sample, by_text)
+            digest_p50, digest_max = time_lookups(sample, by_digest)
+            print(f"{total:>10} {text_p50:>12.3f} {text_max:>12.3f} {digest_p50:>14.3f} {digest_max:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import json
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from extensions import token_cache
+from sql_files.user_sql import compact_user_tokens
+from manager.maintenance_manager import MaintenanceManager
+
+maintenance_cli = AppGroup('maintenance', help="Database maintenance tasks.")
+
+
+@maintenance_cli.command('compact-tokens')
+def compact_tokens():
+    """
+    Collapses duplicate user_tokens rows down to one session per (user_uid, device_uuid).
+    """
+    deleted = compact_user_tokens()
+    token_cache.clear()
+    click.echo(f"Removed {deleted} duplicate session rows")
+
+
+@maintenance_cli.command('purge-expired')
+@click.option('--batch-size', type=int, default=None, help="Rows per delete batch (defaults to PURGE_BATCH_SIZE).")
+def purge_expired(batch_size):
+    """
+    Deletes expired user tokens, stale OTPs, expired phone lookups, old todo tombstones and finished
+    SMS outbox messages in bounded batches.
+    """
+    def echo_batch(table, deleted, elapsed):
+        click.echo(f"{table}: deleted {deleted} rows in {elapsed * 1000:.1f} ms")
+
+    report = MaintenanceManager().purge_expired(batch_size, on_batch=echo_batch)
+    for table, totals in report.items():
+        click.echo(f"{table}: reclaimed {totals['rows']} rows in {totals['batches']} batches, {totals['seconds']:.3f} s")
+
+
+@maintenance_cli.command('calibrate-bcrypt')
+def calibrate_bcrypt():
+    """
+    Measures the largest bcrypt cost within BCRYPT_TARGET_MS on this host and stores it as the cost
+    every server process reads at boot.
+    """
+    current_rounds = current_app.config.get("BCRYPT_LOG_ROUNDS", 12)
+    try:
+        cost = MaintenanceManager().pin_bcrypt_cost(replace=True)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    click.echo(f"bcrypt cost {cost['rounds']} takes {cost['elapsed_ms']} ms per hash (target {cost['target_ms']} ms)")
+    if current_app.config.get("BCRYPT_AUTO_CALIBRATE"):
+        click.echo(f"Stored bcrypt cost {cost['rounds']} (was {current_rounds}); server processes use it from their next start")
+    else:
+        click.echo(f"BCRYPT_AUTO_CALIBRATE is off, so servers keep BCRYPT_LOG_ROUNDS={current_rounds}")
+
+
+@maintenance_cli.command('cache-stats')
+@click.option('--max-age', type=int, default=None,
+              help="Only show processes that published in the last N seconds (defaults to 3 publish intervals).")
+def cache_stats(max_age):
+    """
+    Prints the hit ratios and sizes of the running server processes' caches and their SMS dispatcher
+    queue depth and latency, as published to cache_stats.
+    """
+    if max_age is None:
+        max_age = 3 * current_app.config.get("CACHE_STATS_INTERVAL_SECONDS", 30)
+    stats = MaintenanceManager().get_published_cache_stats(max_age)
+    if not stats:
+        click.echo(f"No server process published cache stats in the last {max_age} s")
+        return
+    click.echo(json.dumps(stats, indent=2))
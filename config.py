@@ -10,15 +10,107 @@ class Config:
     ACCESS_TOKEN_EXPIRES = int(os.getenv("ACCESS_TOKEN_EXPIRES", 120))         # seconds
     REFRESH_TOKEN_EXPIRES = int(os.getenv("REFRESH_TOKEN_EXPIRES", 604800))    # seconds
 
+    # Access-token verification: "db" checks user_tokens on every request,
+    # "stateless" compares the token's session generation with a cached per-user value
+    TOKEN_VERIFICATION_MODE = os.getenv("TOKEN_VERIFICATION_MODE", "db")
+    TOKEN_GENERATION_CACHE_SIZE = int(os.getenv("TOKEN_GENERATION_CACHE_SIZE", 10000))
+    TOKEN_GENERATION_CACHE_TTL = int(os.getenv("TOKEN_GENERATION_CACHE_TTL", 15))   # seconds, bounds revoke delay across workers
+
+    # Verified access-token cache (per process)
+    TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10000))               # entries, 0 disables
+    TOKEN_CACHE_TTL = int(os.getenv("TOKEN_CACHE_TTL", 60))                    # seconds
+
+    # Known-user cache, skips the user existence check on authenticated requests (per process)
+    USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 10000))
+    USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 300))                     # seconds
+
+    # bcrypt cost: the largest cost within BCRYPT_TARGET_MS, between the min and max rounds, calibrated by
+    # the first process to boot and stored in app_settings for every other worker and host to read
+    # (`flask maintenance calibrate-bcrypt` re-measures it). With BCRYPT_AUTO_CALIBRATE off,
+    # BCRYPT_LOG_ROUNDS is used as-is
+    BCRYPT_LOG_ROUNDS = int(os.getenv("BCRYPT_LOG_ROUNDS", 12))
+    BCRYPT_AUTO_CALIBRATE = os.getenv("BCRYPT_AUTO_CALIBRATE", "true").lower() == "true"
+    BCRYPT_TARGET_MS = int(os.getenv("BCRYPT_TARGET_MS", 250))
+    BCRYPT_MIN_ROUNDS = int(os.getenv("BCRYPT_MIN_ROUNDS", 10))
+    BCRYPT_MAX_ROUNDS = int(os.getenv("BCRYPT_MAX_ROUNDS", 16))
+
+    # Password hashing pool
+    HASH_POOL_WORKERS = int(os.getenv("HASH_POOL_WORKERS", 2))                 # processes, 0 hashes inline
+    HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", 16))                  # in-flight hashes before 503, 0 for unlimited
+    HASH_TIMEOUT_SECONDS = int(os.getenv("HASH_TIMEOUT_SECONDS", 10))
+
     # OTP settings
     OTP_EXPIRY_MINUTES = int(os.getenv("OTP_EXPIRY_MINUTES", 5))
     OTP_LENGTH = int(os.getenv("OTP_LENGTH", 6))
+    OTP_RESEND_LIMIT = int(os.getenv("OTP_RESEND_LIMIT", 3))                   # resends per window and user
+    OTP_RESEND_WINDOW_SECONDS = int(os.getenv("OTP_RESEND_WINDOW_SECONDS", 900))
+    OTP_VERIFY_LIMIT = int(os.getenv("OTP_VERIFY_LIMIT", 10))                  # verification attempts per window and user
+    OTP_VERIFY_WINDOW_SECONDS = int(os.getenv("OTP_VERIFY_WINDOW_SECONDS", 900))
+
+    # Rate limiter: "memory" is per process, "sqlite" shares counters across workers on one host
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_STORAGE = os.getenv("RATE_LIMIT_STORAGE", "memory")
+    RATE_LIMIT_SQLITE_PATH = os.getenv("RATE_LIMIT_SQLITE_PATH", "ratelimit.db")
+
+    # ToDo listing
+    TODO_PAGE_SIZE = int(os.getenv("TODO_PAGE_SIZE", 50))                      # default page size with limit/cursor
+    TODO_PAGE_SIZE_MAX = int(os.getenv("TODO_PAGE_SIZE_MAX", 200))
+    TODO_UNPAGINATED_LIMIT = int(os.getenv("TODO_UNPAGINATED_LIMIT", 1000))    # cap for the legacy full list
+    TODO_BULK_MAX_ITEMS = int(os.getenv("TODO_BULK_MAX_ITEMS", 100))           # items per bulk request
+    TODO_STREAM_BATCH_SIZE = int(os.getenv("TODO_STREAM_BATCH_SIZE", 500))     # rows fetched per batch with stream=true
+    TODO_CHANGES_PAGE_SIZE = int(os.getenv("TODO_CHANGES_PAGE_SIZE", 500))     # changes per /todo/changes response
+    TODO_CHANGES_PAGE_SIZE_MAX = int(os.getenv("TODO_CHANGES_PAGE_SIZE_MAX", 1000))
+    TODO_TOMBSTONE_RETENTION_DAYS = int(os.getenv("TODO_TOMBSTONE_RETENTION_DAYS", 30))  # older sync cursors must resync
+    TODO_SEARCH_PAGE_SIZE = int(os.getenv("TODO_SEARCH_PAGE_SIZE", 20))        # results per /todo/search page
+    TODO_SEARCH_PAGE_SIZE_MAX = int(os.getenv("TODO_SEARCH_PAGE_SIZE_MAX", 100))
+
+    # Serialized todo list cache, keyed by the list version: per-process LRU, optionally backed by a
+    # SQLite file shared by workers. Entries never expire; both levels evict by size
+    RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+    RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "none")            # "none" or "sqlite"
+    RESPONSE_CACHE_SQLITE_PATH = os.getenv("RESPONSE_CACHE_SQLITE_PATH", "response_cache.db")
+    RESPONSE_CACHE_SQLITE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_SQLITE_MAX_BYTES", 256 * 1024 * 1024))
+
+    # Maintenance settings
+    PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", 500))                 # rows per delete
+    PURGE_INTERVAL_SECONDS = int(os.getenv("PURGE_INTERVAL_SECONDS", 0))       # in-process timer, 0 disables
+    OTP_RETENTION_MINUTES = int(os.getenv("OTP_RETENTION_MINUTES", 60))        # keep used/expired OTPs before purging
+    CACHE_STATS_INTERVAL_SECONDS = int(os.getenv("CACHE_STATS_INTERVAL_SECONDS", 30))  # publish to cache_stats, 0 disables
+
+    # Offline number plan; Lookup is skipped for numbers from these regions (comma-separated ISO codes),
+    # except under calling codes shared by several regions such as +1
+    NUMBER_PLAN_PATH = os.getenv("NUMBER_PLAN_PATH")                           # defaults to data/number_plan.csv
+    PHONE_LOOKUP_SKIP_REGIONS = os.getenv("PHONE_LOOKUP_SKIP_REGIONS", "")
+
+    # Phone lookup cache (memory + phone_lookups table)
+    PHONE_LOOKUP_CACHE_SIZE = int(os.getenv("PHONE_LOOKUP_CACHE_SIZE", 10000))
+    PHONE_LOOKUP_TTL_SECONDS = int(os.getenv("PHONE_LOOKUP_TTL_SECONDS", 2592000))            # 30 days
+    PHONE_LOOKUP_NEGATIVE_TTL_SECONDS = int(os.getenv("PHONE_LOOKUP_NEGATIVE_TTL_SECONDS", 86400))  # invalid numbers
+
+    # SMS outbox dispatcher
+    SMS_PROVIDER = os.getenv("SMS_PROVIDER", "twilio")                         # "twilio" or "fake"
+    SMS_DISPATCHER_ENABLED = os.getenv("SMS_DISPATCHER_ENABLED", "true").lower() == "true"
+    SMS_DISPATCHER_THREADS = int(os.getenv("SMS_DISPATCHER_THREADS", 4))
+    SMS_POLL_INTERVAL_SECONDS = float(os.getenv("SMS_POLL_INTERVAL_SECONDS", 1.0))
+    SMS_BATCH_SIZE = int(os.getenv("SMS_BATCH_SIZE", 20))
+    SMS_MAX_ATTEMPTS = int(os.getenv("SMS_MAX_ATTEMPTS", 5))
+    SMS_RETRY_BASE_SECONDS = int(os.getenv("SMS_RETRY_BASE_SECONDS", 2))      # doubles after each failure
+    SMS_CLAIM_TIMEOUT_SECONDS = int(os.getenv("SMS_CLAIM_TIMEOUT_SECONDS", 60))
+    SMS_OUTBOX_RETENTION_HOURS = int(os.getenv("SMS_OUTBOX_RETENTION_HOURS", 24))  # keep sent/failed messages before purging
 
     # Twilio credentials
     TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
     TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
     TWILIO_PHONE_NUMBER    = os.getenv("TWILIO_PHONE_NUMBER")
+    TWILIO_TIMEOUT_SECONDS = float(os.getenv("TWILIO_TIMEOUT_SECONDS", 5))      # per call
+    TWILIO_BREAKER_FAILURES = int(os.getenv("TWILIO_BREAKER_FAILURES", 5))      # consecutive failures before opening
+    TWILIO_BREAKER_RESET_SECONDS = int(os.getenv("TWILIO_BREAKER_RESET_SECONDS", 30))  # open time before a probe
 
 class TestConfig(Config):
     TESTING = True
+    HASH_POOL_WORKERS = 0
+    BCRYPT_AUTO_CALIBRATE = False
+    SMS_PROVIDER = "fake"
+    SMS_DISPATCHER_ENABLED = False
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
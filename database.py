@@ -1,10 +1,19 @@
+from sqlalchemy import event
 from extensions import db, migrate
 from models import User, ToDo
 
+def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # SQLite only enforces foreign keys when asked to, per connection
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
 def init_db(app):
     db.init_app(app)
     migrate.init_app(app, db)
     with app.app_context():
+        if db.engine.dialect.name == "sqlite":
+            event.listen(db.engine, "connect", enable_sqlite_foreign_keys)
         db.create_all()
     # Ensure sessions are removed after each request
     @app.teardown_appcontext
@@ -2,8 +2,19 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_marshmallow import Marshmallow
 from flask_bcrypt import Bcrypt
 from flask_migrate import Migrate
+from services.token_cache import TokenCache, TokenGenerationCache
+from services.hashing import PasswordHasher
+from services.rate_limiter import RateLimiter
+from services.user_cache import UserExistenceCache
+from services.response_cache import ResponseCache
 
 db = SQLAlchemy()
 ma = Marshmallow()
 bcrypt = Bcrypt()
-migrate = Migrate()
\ No newline at end of file
+migrate = Migrate()
+token_cache = TokenCache()
+token_generations = TokenGenerationCache()
+user_cache = UserExistenceCache()
+response_cache = ResponseCache()
+password_hasher = PasswordHasher()
+rate_limiter = RateLimiter()
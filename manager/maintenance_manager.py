@@ -0,0 +1,150 @@
+import os
+import json
+import time
+import socket
+import logging
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from extensions import token_cache, token_generations, user_cache, response_cache
+from services.sms_dispatcher import sms_dispatcher
+from sql_files.user_sql import delete_expired_user_tokens_batch
+from sql_files.otp_sql import delete_stale_otps_batch
+from sql_files.phone_sql import delete_expired_phone_lookups_batch
+from sql_files.todo_sql import delete_old_tombstones_batch
+from sql_files.sms_sql import delete_finished_sms_batch
+from sql_files.stats_sql import save_cache_stats, get_cache_stats, delete_cache_stats_before
+from sql_files.settings_sql import get_setting, add_setting_if_absent, save_setting
+from services.hashing import calibrate_bcrypt_cost
+
+BCRYPT_COST_SETTING = "bcrypt_cost"
+
+
+class MaintenanceManager:
+    def purge_expired(self, batch_size=None, on_batch=None):
+        """
+        Deletes expired user tokens, used or expired OTPs, expired phone lookups, and todo tombstones
+        and sent or failed SMS outbox messages past their retention in bounded batches.
+        Each batch commits on its own so no write lock is held for long.
+        Returns a report with the rows reclaimed per table and the time taken.
+        """
+
+        batch_size = batch_size or current_app.config.get("PURGE_BATCH_SIZE", 500)
+        retention_minutes = current_app.config.get("OTP_RETENTION_MINUTES", 60)
+        now = datetime.now(timezone.utc)
+        otp_cutoff = now - timedelta(minutes=retention_minutes)
+        tombstone_cutoff = now - timedelta(days=current_app.config.get("TODO_TOMBSTONE_RETENTION_DAYS", 30))
+        sms_cutoff = now - timedelta(hours=current_app.config.get("SMS_OUTBOX_RETENTION_HOURS", 24))
+
+        jobs = {
+            "user_tokens": (0, lambda after_id: delete_expired_user_tokens_batch(now, after_id, batch_size)),
+            "user_otps": (0, lambda after_id: delete_stale_otps_batch(now, otp_cutoff, after_id, batch_size)),
+            "phone_lookups": ("", lambda after_key: delete_expired_phone_lookups_batch(now, after_key, batch_size)),
+            "todo_tombstones": (0, lambda after_id: delete_old_tombstones_batch(tombstone_cutoff, after_id, batch_size)),
+            "sms_outbox": (0, lambda after_id: delete_finished_sms_batch(sms_cutoff, after_id, batch_size)),
+        }
+        report = {}
+        for table, (first_key, delete_batch) in jobs.items():
+            report[table] = self._run_batches(table, first_key, delete_batch, on_batch)
+        return report
+
+    def get_bcrypt_cost(self):
+        """
+        Returns the bcrypt cost every process uses, as stored in app_settings by pin_bcrypt_cost.
+        The first process to find none calibrates and stores it; the others read that value.
+        """
+
+        setting = get_setting(BCRYPT_COST_SETTING)
+        if setting is None:
+            return self.pin_bcrypt_cost()
+        return json.loads(setting.value)
+
+    def pin_bcrypt_cost(self, replace=False):
+        """
+        Measures the largest bcrypt cost within BCRYPT_TARGET_MS on this host and stores it in app_settings.
+        Unless replace is set, a cost stored meanwhile by another process is kept and returned instead.
+        Returns {"rounds", "elapsed_ms", "target_ms", "host"}. Raises ValueError for invalid round bounds.
+        """
+
+        target_ms = current_app.config.get("BCRYPT_TARGET_MS", 250)
+        rounds, elapsed_ms = calibrate_bcrypt_cost(
+            target_ms,
+            current_app.config.get("BCRYPT_MIN_ROUNDS", 10),
+            current_app.config.get("BCRYPT_MAX_ROUNDS", 16)
+        )
+        value = json.dumps({"rounds": rounds, "elapsed_ms": round(elapsed_ms, 1), "target_ms": target_ms, "host": socket.gethostname()})
+        now = datetime.now(timezone.utc)
+        if replace:
+            setting = save_setting(BCRYPT_COST_SETTING, value, now)
+        else:
+            setting = add_setting_if_absent(BCRYPT_COST_SETTING, value, now)
+        logging.info(f"bcrypt cost {rounds} measured at {elapsed_ms:.1f} ms per hash (target {target_ms} ms)")
+        return json.loads(setting.value)
+
+    def collect_cache_stats(self):
+        """
+        Returns hit ratios and sizes of this process's caches, plus the SMS outbox depth
+        and the dispatcher's send counters and latency.
+        """
+
+        return {
+            "token_cache": token_cache.stats(),
+            "token_generations": token_generations.stats(),
+            "user_cache": user_cache.stats(),
+            "response_cache": response_cache.stats(),
+            "sms_dispatcher": sms_dispatcher.stats(),
+        }
+
+    def publish_cache_stats(self):
+        """
+        Stores this process's cache stats in cache_stats under "hostname:pid", so other processes
+        (the maintenance CLI) can read a running server's counters.
+        Snapshots of processes that stopped publishing ten intervals ago are deleted.
+        """
+
+        interval = current_app.config.get("CACHE_STATS_INTERVAL_SECONDS", 30)
+        now = datetime.now(timezone.utc)
+        save_cache_stats(f"{socket.gethostname()}:{os.getpid()}", json.dumps(self.collect_cache_stats()), now)
+        delete_cache_stats_before(now - timedelta(seconds=10 * interval))
+
+    def get_published_cache_stats(self, max_age):
+        """
+        Returns {process: stats} for the processes that published in the last max_age seconds,
+        with the snapshot time under "updated_at".
+        """
+
+        since = datetime.now(timezone.utc) - timedelta(seconds=max_age)
+        return {
+            row.process: dict(json.loads(row.stats), updated_at=row.updated_at.isoformat())
+            for row in get_cache_stats(since)
+        }
+
+    def _run_batches(self, table, first_key, delete_batch, on_batch):
+        """
+        Repeats delete_batch from first_key until it reports nothing left, logging rows and time per batch.
+        """
+
+        totals = {"rows": 0, "batches": 0, "seconds": 0.0}
+        after_id = first_key
+        while True:
+            started = time.perf_counter()
+            try:
+                deleted, after_id = delete_batch(after_id)
+            except Exception as e:
+                logging.error(f"Purge of {table} failed after {totals['rows']} rows: {str(e)}")
+                break
+            elapsed = time.perf_counter() - started
+            if after_id is None:
+                break
+
+            totals["rows"] += deleted
+            totals["batches"] += 1
+            totals["seconds"] += elapsed
+            logging.info(f"Purged {deleted} rows from {table} in {elapsed * 1000:.1f} ms")
+            if on_batch:
+                on_batch(table, deleted, elapsed)
+
+        logging.info(
+            f"Purge of {table} finished: {totals['rows']} rows in {totals['batches']} batches, "
+            f"{totals['seconds']:.3f} s"
+        )
+        return totals
@@ -1,16 +1,39 @@
+import time
 import logging
+from flask import current_app, g
+from sqlalchemy.exc import IntegrityError
+from utils import encode_cursor, encode_search_cursor, encode_sync_cursor
 from sql_files.todo_sql import (
     insert_todo,
     get_user_by_uid,
     get_todos_by_user,
+    get_todos_page,
+    iter_todos_by_user,
+    get_todo_version,
+    get_todo_changes,
+    search_todos,
+    bulk_insert_todos,
+    bulk_update_todos,
+    bulk_delete_todos,
     delete_todo_by_uid,
     update_todo_by_uid,
 )
 
+SYNC_CURSOR_EXPIRED = "Sync cursor expired, download the full list again"
+SEARCH_CURSOR_EXPIRED = "Search cursor expired, the todo list changed; search again"
+
 class ToDoManager:
+    def _is_principal(self, user_uid):
+        """
+        True if user_uid is the request's authenticated user, whose existence token_required already checked.
+        """
+        return g.get("current_user_uid") == user_uid
+
+
     def create(self, task, description, user_uid):
         """
-        Contains the logic to create a new ToDo item for a user after validating input and user existence.
+        Contains the logic to create a new ToDo item for a user after validating input.
+        User existence is enforced by the todo.user_uid foreign key.
         """
 
         try:
@@ -18,31 +41,32 @@ class ToDoManager:
                 logging.warning("Create ToDo failed: Task and user_uid are required")
                 return None, "Task and user_uid are required"
 
-            user = get_user_by_uid(user_uid)
-            if not user:
-                logging.warning(f"Create ToDo failed: User with uid {user_uid} does not exist")
-                return None, "User does not exist"
-
             todo = insert_todo(task, description, user_uid)
             logging.info(f"ToDo created successfully for user_uid {user_uid} with task: {task}")
             return todo, None
 
+        except IntegrityError:
+            logging.warning(f"Create ToDo failed: User with uid {user_uid} does not exist")
+            return None, "User does not exist"
         except Exception as e:
             logging.error(f"Unexpected error in create: {str(e)}")
             return None, "Internal server error"
 
 
-    def get_by_user_uid(self, user_uid, date=None):
+    def get_by_user_uid(self, user_uid, created_range=None, columns=None):
         """
-        Contains the logic to retrieve ToDo items for a user, with optional filtering by date.
+        Contains the logic to retrieve ToDo items for a user, with optional filtering by a UTC creation range.
+        With columns, returns rows of just those ToDo attributes.
         """
 
         try:
-            user = get_user_by_uid(user_uid)
-            if not user:
+            if not self._is_principal(user_uid) and not get_user_by_uid(user_uid):
                 logging.warning(f"Get ToDos failed: User with uid {user_uid} not found")
                 return None, "User not found"
-            todos = get_todos_by_user(user_uid, date)
+            cap = current_app.config.get("TODO_UNPAGINATED_LIMIT", 1000)
+            todos = get_todos_by_user(user_uid, created_range, limit=cap, columns=columns)
+            if len(todos) == cap:
+                logging.warning(f"Unpaginated ToDo list for user_uid {user_uid} truncated at {cap} items")
             logging.info(f"Retrieved {len(todos)} ToDos for user_uid {user_uid}")
             return todos, None
 
@@ -51,6 +75,138 @@ class ToDoManager:
             return None, "Internal server error"
 
 
+    def iter_by_user_uid(self, user_uid, created_range=None, columns=None):
+        """
+        Contains the logic to stream all ToDo items of a user without materializing the list.
+        Returns a row iterator, or None and an error.
+        """
+
+        try:
+            if not self._is_principal(user_uid) and not get_user_by_uid(user_uid):
+                logging.warning(f"Stream ToDos failed: User with uid {user_uid} not found")
+                return None, "User not found"
+            batch_size = current_app.config.get("TODO_STREAM_BATCH_SIZE", 500)
+            return iter_todos_by_user(user_uid, created_range, batch_size, columns), None
+
+        except Exception as e:
+            logging.error(f"Unexpected error in iter_by_user_uid: {str(e)}")
+            return None, "Internal server error"
+
+
+    def get_list_version(self, user_uid):
+        """
+        Contains the logic to read a user's todo list version, used as the list's ETag.
+        Returns None if the version cannot be read, in which case the list is served without one.
+        """
+
+        try:
+            return get_todo_version(user_uid)
+        except Exception as e:
+            logging.error(f"Unexpected error in get_list_version: {str(e)}")
+            return None
+
+
+    def get_page_by_user_uid(self, user_uid, limit=None, after=None, created_range=None, columns=None):
+        """
+        Contains the logic to retrieve one page of ToDo items for a user.
+        Returns {"todos", "next_cursor"}; next_cursor is None on the last page.
+        """
+
+        try:
+            if not self._is_principal(user_uid) and not get_user_by_uid(user_uid):
+                logging.warning(f"Get ToDos failed: User with uid {user_uid} not found")
+                return None, "User not found"
+            max_limit = current_app.config.get("TODO_PAGE_SIZE_MAX", 200)
+            limit = min(limit or current_app.config.get("TODO_PAGE_SIZE", 50), max_limit)
+            todos, has_more = get_todos_page(user_uid, limit, after, created_range, columns)
+            next_cursor = encode_cursor(todos[-1].created_at, todos[-1].id) if has_more else None
+            logging.info(f"Retrieved page of {len(todos)} ToDos for user_uid {user_uid}")
+            return {"todos": todos, "next_cursor": next_cursor}, None
+
+        except Exception as e:
+            logging.error(f"Unexpected error in get_page_by_user_uid: {str(e)}")
+            return None, "Internal server error"
+
+
+    def get_changes(self, user_uid, after=None, synced_at=None, limit=None, columns=None):
+        """
+        Contains the logic of the /todo/changes feed: todos written and deleted after the (change_seq, id)
+        position after, oldest change first. Without after, returns a full sync of every todo.
+        Returns {"todos", "deleted", "next_cursor", "has_more"}, or SYNC_CURSOR_EXPIRED once the
+        tombstones a cursor relies on may have been purged.
+        """
+
+        try:
+            if not self._is_principal(user_uid) and not get_user_by_uid(user_uid):
+                logging.warning(f"Get ToDo changes failed: User with uid {user_uid} not found")
+                return None, "User not found"
+            now = int(time.time())
+            retention = current_app.config.get("TODO_TOMBSTONE_RETENTION_DAYS", 30) * 86400
+            if after is not None and synced_at < now - retention:
+                logging.info(f"Sync cursor of user_uid {user_uid} is older than the tombstone retention")
+                return None, SYNC_CURSOR_EXPIRED
+
+            max_limit = current_app.config.get("TODO_CHANGES_PAGE_SIZE_MAX", 1000)
+            limit = min(limit or current_app.config.get("TODO_CHANGES_PAGE_SIZE", 500), max_limit)
+            todos, tombstones = get_todo_changes(user_uid, limit, after, columns)
+            # Both sources are ordered by (change_seq, id) and hold limit + 1 rows, so merging them yields the first limit changes
+            changes = sorted(
+                [((row[-2], row[-1]), row, False) for row in todos]
+                + [((row.change_seq, row.todo_id), row, True) for row in tombstones],
+                key=lambda change: change[0]
+            )
+            has_more = len(changes) > limit
+            changes = changes[:limit]
+
+            position = changes[-1][0] if changes else (after or (0, 0))
+            # Until the feed is drained, later deletions may still lie between the cursor and the present
+            synced_from = now if after is None or not has_more else synced_at
+            logging.info(f"Retrieved {len(changes)} ToDo changes for user_uid {user_uid}")
+            return {
+                "todos": [row for _, row, deleted in changes if not deleted],
+                "deleted": [row.todo_uid for _, row, deleted in changes if deleted],
+                "next_cursor": encode_sync_cursor(*position, synced_from),
+                "has_more": has_more,
+            }, None
+
+        except Exception as e:
+            logging.error(f"Unexpected error in get_changes: {str(e)}")
+            return None, "Internal server error"
+
+
+    def search(self, user_uid, terms, limit=None, after=None, columns=None):
+        """
+        Contains the logic to full-text search a user's todos, best match first, one page at a time.
+        after is the (offset, list version) of a cursor; pages stay consistent while the user's list is
+        unchanged, and a write in between makes the cursor return SEARCH_CURSOR_EXPIRED.
+        Ranking on SQLite still depends on every user's todos, so others' writes can reorder results
+        slightly between pages.
+        Returns {"todos", "next_cursor"}; next_cursor is None on the last page.
+        """
+
+        try:
+            version = get_todo_version(user_uid)
+            if version is None:
+                logging.warning(f"Search ToDos failed: User with uid {user_uid} not found")
+                return None, "User not found"
+            offset = 0
+            if after is not None:
+                offset, ranked_at = after
+                if ranked_at != version:
+                    logging.info(f"Search cursor of user_uid {user_uid} predates a todo write")
+                    return None, SEARCH_CURSOR_EXPIRED
+            max_limit = current_app.config.get("TODO_SEARCH_PAGE_SIZE_MAX", 100)
+            limit = min(limit or current_app.config.get("TODO_SEARCH_PAGE_SIZE", 20), max_limit)
+            todos, has_more = search_todos(user_uid, terms, limit, offset, columns)
+            next_cursor = encode_search_cursor(offset + len(todos), version, terms) if has_more else None
+            logging.info(f"Search matched {len(todos)} ToDos on this page for user_uid {user_uid}")
+            return {"todos": todos, "next_cursor": next_cursor}, None
+
+        except Exception as e:
+            logging.error(f"Unexpected error in search: {str(e)}")
+            return None, "Internal server error"
+
+
     def delete_by_uid(self, todo_uid, user_uid):
         """
         Contains the logic to delete a ToDo item by its UID for a specific user.
@@ -99,3 +255,87 @@ class ToDoManager:
         except Exception as e:
             logging.error(f"Unexpected error in update_by_uid: {str(e)}")
             return None, "Internal server error"
+
+
+    def _check_batch(self, items):
+        """
+        Returns an error message if a batch is empty or larger than TODO_BULK_MAX_ITEMS, else None.
+        """
+        max_items = current_app.config.get("TODO_BULK_MAX_ITEMS", 100)
+        if not items:
+            return "At least one item is required"
+        if len(items) > max_items:
+            return f"At most {max_items} items are allowed per request"
+        return None
+
+
+    def bulk_create(self, user_uid, items):
+        """
+        Contains the logic to create several ToDo items for a user in one transaction.
+        Returns per-item results in input order.
+        """
+
+        try:
+            error = self._check_batch(items)
+            if error:
+                logging.warning(f"Bulk create failed: {error}")
+                return None, error
+
+            uids = bulk_insert_todos(user_uid, items)
+            logging.info(f"Bulk created {len(uids)} ToDos for user_uid {user_uid}")
+            return [{"todo_uid": uid, "status": "created"} for uid in uids], None
+
+        except IntegrityError:
+            logging.warning(f"Bulk create failed: User with uid {user_uid} does not exist")
+            return None, "User does not exist"
+        except Exception as e:
+            logging.error(f"Unexpected error in bulk_create: {str(e)}")
+            return None, "Internal server error"
+
+
+    def bulk_update(self, user_uid, items):
+        """
+        Contains the logic to update several ToDo items of a user in one transaction.
+        Returns per-item results; items the user does not own are reported as not_found.
+        """
+
+        try:
+            error = self._check_batch(items)
+            if error:
+                logging.warning(f"Bulk update failed: {error}")
+                return None, error
+
+            updated = bulk_update_todos(user_uid, items)
+            logging.info(f"Bulk updated {len(updated)} ToDos for user_uid {user_uid}")
+            return [
+                {"todo_uid": item["todo_uid"], "status": "updated" if item["todo_uid"] in updated else "not_found"}
+                for item in items
+            ], None
+
+        except Exception as e:
+            logging.error(f"Unexpected error in bulk_update: {str(e)}")
+            return None, "Internal server error"
+
+
+    def bulk_delete(self, user_uid, todo_uids):
+        """
+        Contains the logic to delete several ToDo items of a user in one statement.
+        Returns per-item results; items the user does not own are reported as not_found.
+        """
+
+        try:
+            error = self._check_batch(todo_uids)
+            if error:
+                logging.warning(f"Bulk delete failed: {error}")
+                return None, error
+
+            deleted = bulk_delete_todos(user_uid, todo_uids)
+            logging.info(f"Bulk deleted {len(deleted)} ToDos for user_uid {user_uid}")
+            return [
+                {"todo_uid": todo_uid, "status": "deleted" if todo_uid in deleted else "not_found"}
+                for todo_uid in todo_uids
+            ], None
+
+        except Exception as e:
+            logging.error(f"Unexpected error in bulk_delete: {str(e)}")
+            return None, "Internal server error"
@@ -1,6 +1,8 @@
 #user_manager.py
 import logging
-from extensions import bcrypt
+from extensions import password_hasher, token_cache, token_generations, rate_limiter, user_cache
+from services.hashing import HashingBusyError
+from services.circuit_breaker import ServiceUnavailableError
 from models import User
 from flask import current_app
 from utils import validate_phone_number, generate_otp, send_otp_sms, send_welcome_sms
@@ -8,18 +10,22 @@ from sql_files.user_sql import (
     get_user_by_email,
     get_user_by_username,
     get_user_by_uid,
+    user_exists,
     insert_user,
     insert_user_token,
+    get_user_token_by_access_token,
+    delete_user_token,
+    delete_user_tokens,
+    get_token_generation,
+    increment_token_generation,
     is_email_registered,
     is_username_taken,
     # is_mobile_registered,
-    update_user_phone_verification
+    update_user_password,
 )
 from sql_files.otp_sql import (
     store_otp,
-    get_latest_valid_otp,
-    mark_otp_as_used,
-    count_otp_requests_recent,
+    consume_phone_verification_otp,
     get_latest_unexpired_unused_otp,
 )
 
@@ -49,7 +55,7 @@ class UserManager:
 
             pepper = current_app.config["PEPPER"]
             password_with_pepper = data['password'] + pepper
-            hashed_pw = bcrypt.generate_password_hash(password_with_pepper).decode('utf-8')
+            hashed_pw = password_hasher.generate_password_hash(password_with_pepper)
 
             user = User(
                 username=data['username'],
@@ -82,6 +88,8 @@ class UserManager:
                 "message": "Registration initiated. Please verify your phone number with the OTP sent."
             }
 
+        except (HashingBusyError, ServiceUnavailableError):
+            raise
         except KeyError as e:
             logging.warning(f"Missing registration field: {e}")
             return None
@@ -95,20 +103,12 @@ class UserManager:
         Verifies the OTP and completes user registration.
         """
         try:
-            otp_record = get_latest_valid_otp(user_uid, otp_code, 'phone_verification')
+            user = consume_phone_verification_otp(user_uid, otp_code)
             
-            if not otp_record:
+            if not user:
                 logging.warning(f"OTP verification failed for user {user_uid}")
                 return {"success": False, "error": "Invalid or expired OTP"}
             
-            mark_otp_as_used(otp_record)
-            
-            user = update_user_phone_verification(user_uid, True)
-            
-            if not user:
-                logging.error(f"Failed to update phone verification for user {user_uid}")
-                return {"success": False, "error": "Failed to complete verification"}
-            
             send_welcome_sms(user.mobile_number, user.first_name)
             
             logging.info(f"Phone verification completed for user: {user.username}")
@@ -144,9 +144,13 @@ class UserManager:
             if user.phone_verified:
                 return {"success": False, "error": "Phone number already verified"}
             
-            recent_count = count_otp_requests_recent(user_uid, 'phone_verification', interval_minutes=15)
-            if recent_count >= 3:
-                return {"success": False, "error": "Too many OTP requests. Please try again later."}
+            limit = rate_limiter.hit(
+                f"otp_resend:{user_uid}",
+                current_app.config.get("OTP_RESEND_LIMIT", 3),
+                current_app.config.get("OTP_RESEND_WINDOW_SECONDS", 900)
+            )
+            if not limit.allowed:
+                return {"success": False, "error": "Too many OTP requests. Please try again later.", "retry_after": limit.retry_after}
             
             latest_otp = get_latest_unexpired_unused_otp(user_uid, 'phone_verification')
             if latest_otp:
@@ -184,23 +188,39 @@ class UserManager:
             user = get_user_by_email(email)
             pepper = current_app.config["PEPPER"]
             password_with_pepper = password + pepper
-            if user and bcrypt.check_password_hash(user.password, password_with_pepper):
+            if user and password_hasher.check_password_hash(user.password, password_with_pepper):
+                if password_hasher.needs_rehash(user.password):
+                    self._upgrade_password_hash(user, password_with_pepper)
                 logging.info(f"Login successful for user: {email}")
                 return user
 
             logging.warning(f"Login failed for user: {email}")
             return None
 
+        except HashingBusyError:
+            raise
         except Exception as e:
             logging.error(f"Unexpected error in login_user: {e}")
             return None
         
 
+     def _upgrade_password_hash(self, user, password_with_pepper):
+        """
+        Re-hashes a verified password at the current bcrypt cost. Failures are logged and do not block the login.
+        """
+        try:
+            update_user_password(user, password_hasher.generate_password_hash(password_with_pepper))
+            logging.info(f"Password hash upgraded to cost {password_hasher.rounds} for user: {user.email}")
+        except Exception as e:
+            logging.warning(f"Could not upgrade password hash for user {user.email}: {str(e)}")
+        
+
      def save_token(self, user_uid, access_token, access_expiry, refresh_token, refresh_token_expiry=None, device_uuid=None):
         """
-        Saves a user's tokens to the database.
+        Saves a user's tokens to the database, replacing any earlier session on the same device.
         """
         try:
+            token_cache.invalidate_user(user_uid, device_uuid)
             return insert_user_token(
                 user_uid=user_uid,
                 access_token=access_token,
@@ -213,4 +233,77 @@ class UserManager:
             logging.error(f"Error saving tokens for user_uid {user_uid}: {str(e)}")
             return None
 
-   
\ No newline at end of file
+
+     def logout_user(self, user_uid, access_token, device_uuid):
+        """
+        Revokes the session that owns the given access token and drops it from the token cache.
+        """
+        try:
+            token_record = get_user_token_by_access_token(user_uid, access_token)
+            if not token_record or token_record.device_uuid != device_uuid:
+                logging.warning(f"Logout failed: No matching session for user_uid {user_uid}")
+                return False
+
+            token_cache.invalidate(token_record.access_token)
+            delete_user_token(token_record)
+            self.bump_token_generation(user_uid)
+            logging.info(f"User {user_uid} logged out from device {device_uuid}")
+            return True
+        except Exception as e:
+            logging.error(f"Error logging out user_uid {user_uid}: {str(e)}")
+            return False
+
+
+     def revoke_all_sessions(self, user_uid, access_token, device_uuid):
+        """
+        Revokes every session of the user that owns the given access token, on all devices.
+        """
+        try:
+            token_record = get_user_token_by_access_token(user_uid, access_token)
+            if not token_record or token_record.device_uuid != device_uuid:
+                logging.warning(f"Revoke-all failed: No matching session for user_uid {user_uid}")
+                return False
+
+            deleted = delete_user_tokens(user_uid)
+            token_cache.invalidate_user(user_uid)
+            self.bump_token_generation(user_uid)
+            logging.info(f"Revoked {deleted} sessions for user_uid {user_uid}")
+            return True
+        except Exception as e:
+            logging.error(f"Error revoking sessions for user_uid {user_uid}: {str(e)}")
+            return False
+
+
+     def current_token_generation(self, user_uid):
+        """
+        Returns the user's session generation, served from the per-process cache when possible.
+        Returns None if the user does not exist.
+        """
+        generation = token_generations.get(user_uid)
+        if generation is None:
+            generation = get_token_generation(user_uid)
+            if generation is not None:
+                token_generations.set(user_uid, generation)
+        return generation
+
+
+     def user_exists(self, user_uid):
+        """
+        Checks that the user still exists, served from the per-process cache when possible.
+        """
+        if user_cache.exists(user_uid):
+            return True
+        if not user_exists(user_uid):
+            return False
+        user_cache.mark_exists(user_uid)
+        return True
+
+
+     def bump_token_generation(self, user_uid):
+        """
+        Invalidates every stateless access token of the user by moving to a new session generation.
+        """
+        generation = increment_token_generation(user_uid)
+        if generation is not None:
+            token_generations.set(user_uid, generation)
+        return generation
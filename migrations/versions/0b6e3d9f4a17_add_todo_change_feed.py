@@ -0,0 +1,54 @@
+"""todo.change_seq and todo_tombstones for the /todo/changes delta sync feed
+
+Revision ID: 0b6e3d9f4a17
+Revises: f2a8d5c0e7b4
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b6e3d9f4a17'
+down_revision = 'f2a8d5c0e7b4'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = 'ix_todo_user_change_seq'
+
+
+def upgrade():
+    # create_app() runs db.create_all(), which already creates new tables and their indexes
+    inspector = sa.inspect(op.get_bind())
+    if not any(column['name'] == 'change_seq' for column in inspector.get_columns('todo')):
+        with op.batch_alter_table('todo') as batch_op:
+            batch_op.add_column(sa.Column('change_seq', sa.Integer(), nullable=False, server_default='0'))
+    if not any(index['name'] == INDEX_NAME for index in inspector.get_indexes('todo')):
+        op.create_index(INDEX_NAME, 'todo', ['user_uid', 'change_seq', 'id'], unique=False)
+
+    if inspector.has_table('todo_tombstones'):
+        return
+    op.create_table(
+        'todo_tombstones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('todo_id', sa.Integer(), nullable=False),
+        sa.Column('todo_uid', sa.String(length=36), nullable=False),
+        sa.Column('user_uid', sa.String(length=36), nullable=False),
+        sa.Column('change_seq', sa.Integer(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_todo_tombstones_user_change_seq', 'todo_tombstones', ['user_uid', 'change_seq', 'todo_id'], unique=False
+    )
+    op.create_index('ix_todo_tombstones_deleted_at', 'todo_tombstones', ['deleted_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_todo_tombstones_deleted_at', table_name='todo_tombstones')
+    op.drop_index('ix_todo_tombstones_user_change_seq', table_name='todo_tombstones')
+    op.drop_table('todo_tombstones')
+    op.drop_index(INDEX_NAME, table_name='todo')
+    with op.batch_alter_table('todo') as batch_op:
+        batch_op.drop_column('change_seq')
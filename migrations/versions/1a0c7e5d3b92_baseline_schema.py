@@ -0,0 +1,89 @@
+"""baseline schema: user, todo, user_tokens and user_otps as first deployed
+
+Revision ID: 1a0c7e5d3b92
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1a0c7e5d3b92'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases deployed before migrations existed were built by db.create_all() and already have
+    # these tables; an empty database gets them here, in the shape later revisions start from
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('user'):
+        op.create_table(
+            'user',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('uid', sa.String(length=36), nullable=False),
+            sa.Column('username', sa.String(length=150), nullable=False),
+            sa.Column('first_name', sa.String(length=100), nullable=False),
+            sa.Column('last_name', sa.String(length=100), nullable=False),
+            sa.Column('email', sa.String(length=150), nullable=False),
+            sa.Column('mobile_number', sa.String(length=15), nullable=False),
+            sa.Column('password', sa.String(length=200), nullable=False),
+            sa.Column('create_date', sa.DateTime(), nullable=False),
+            sa.Column('email_verified', sa.Boolean(), nullable=False),
+            sa.Column('phone_verified', sa.Boolean(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('uid'),
+            sa.UniqueConstraint('username'),
+            sa.UniqueConstraint('email')
+        )
+    if not inspector.has_table('todo'):
+        op.create_table(
+            'todo',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('uid', sa.String(length=36), nullable=False),
+            sa.Column('task', sa.String(length=200), nullable=False),
+            sa.Column('description', sa.String(length=500), nullable=True),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('modified_at', sa.DateTime(), nullable=False),
+            sa.Column('user_uid', sa.String(length=36), nullable=False),
+            sa.ForeignKeyConstraint(['user_uid'], ['user.uid'], name='fk_todo_user_uid'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('uid')
+        )
+    if not inspector.has_table('user_tokens'):
+        op.create_table(
+            'user_tokens',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_uid', sa.String(length=64), nullable=False),
+            sa.Column('access_token', sa.Text(), nullable=False),
+            sa.Column('access_token_expiry', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('refresh_token', sa.Text(), nullable=False),
+            sa.Column('refresh_token_expiry', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('device_uuid', sa.String(length=100), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if not inspector.has_table('user_otps'):
+        op.create_table(
+            'user_otps',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_uid', sa.String(), nullable=False),
+            sa.Column('otp_code', sa.String(), nullable=False),
+            sa.Column('purpose', sa.String(), nullable=False),
+            sa.Column('expires_at', sa.DateTime(), nullable=False),
+            sa.Column('is_used', sa.Boolean(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['user_uid'], ['user.uid']),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade():
+    op.drop_table('user_otps')
+    op.drop_table('user_tokens')
+    op.drop_table('todo')
+    op.drop_table('user')
@@ -0,0 +1,91 @@
+"""add token digest columns to user_tokens
+
+Revision ID: 3f2a9c1d7b10
+Revises: 1a0c7e5d3b92
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+import hashlib
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2a9c1d7b10'
+down_revision = '1a0c7e5d3b92'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def _digest(token):
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {c['name'] for c in inspector.get_columns('user_tokens')}
+    indexes = {index['name'] for index in inspector.get_indexes('user_tokens')}
+
+    with op.batch_alter_table('user_tokens') as batch_op:
+        if 'access_token_digest' not in columns:
+            batch_op.add_column(sa.Column('access_token_digest', sa.String(length=64), nullable=True))
+        if 'refresh_token_digest' not in columns:
+            batch_op.add_column(sa.Column('refresh_token_digest', sa.String(length=64), nullable=True))
+
+    # Backfill existing rows in primary-key batches
+    user_tokens = sa.table(
+        'user_tokens',
+        sa.column('id', sa.Integer),
+        sa.column('access_token', sa.Text),
+        sa.column('access_token_digest', sa.String),
+        sa.column('refresh_token', sa.Text),
+        sa.column('refresh_token_digest', sa.String),
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(user_tokens.c.id, user_tokens.c.access_token, user_tokens.c.refresh_token)
+            .where(user_tokens.c.id > last_id)
+            .order_by(user_tokens.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        for row in rows:
+            bind.execute(
+                user_tokens.update()
+                .where(user_tokens.c.id == row.id)
+                .values(
+                    access_token_digest=_digest(row.access_token),
+                    refresh_token_digest=_digest(row.refresh_token),
+                )
+            )
+        last_id = rows[-1].id
+
+    # Tokens used to carry no jti and whole-second exp, so two logins in the same second could store
+    # identical tokens; keep only the newest row of each before the digests become unique
+    for column in ('access_token_digest', 'refresh_token_digest'):
+        op.execute(
+            f"DELETE FROM user_tokens WHERE id NOT IN ("
+            f"SELECT max(id) FROM user_tokens GROUP BY {column})"
+        )
+
+    with op.batch_alter_table('user_tokens') as batch_op:
+        batch_op.alter_column('access_token_digest', existing_type=sa.String(length=64), nullable=False)
+        batch_op.alter_column('refresh_token_digest', existing_type=sa.String(length=64), nullable=False)
+        # create_app() runs db.create_all(), which already creates the indexes on a fresh database
+        if 'ix_user_tokens_access_token_digest' not in indexes:
+            batch_op.create_index('ix_user_tokens_access_token_digest', ['access_token_digest'], unique=True)
+        if 'ix_user_tokens_refresh_token_digest' not in indexes:
+            batch_op.create_index('ix_user_tokens_refresh_token_digest', ['refresh_token_digest'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('user_tokens') as batch_op:
+        batch_op.drop_index('ix_user_tokens_refresh_token_digest')
+        batch_op.drop_index('ix_user_tokens_access_token_digest')
+        batch_op.drop_column('refresh_token_digest')
+        batch_op.drop_column('access_token_digest')
@@ -0,0 +1,44 @@
+"""add sms_outbox table
+
+Revision ID: 5e8f3b7a2d91
+Revises: c7d05e9a1f42
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8f3b7a2d91'
+down_revision = 'c7d05e9a1f42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_app() runs db.create_all(), so the table may already exist
+    if sa.inspect(op.get_bind()).has_table('sms_outbox'):
+        return
+    op.create_table(
+        'sms_outbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('to_number', sa.String(length=20), nullable=False),
+        sa.Column('body', sa.String(length=1600), nullable=False),
+        sa.Column('kind', sa.String(length=30), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('claimed_at', sa.DateTime(), nullable=True),
+        sa.Column('last_error', sa.String(length=500), nullable=True),
+        sa.Column('provider_message_id', sa.String(length=64), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_sms_outbox_status_next_attempt', 'sms_outbox', ['status', 'next_attempt_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_sms_outbox_status_next_attempt', table_name='sms_outbox')
+    op.drop_table('sms_outbox')
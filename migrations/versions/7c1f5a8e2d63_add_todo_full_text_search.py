@@ -0,0 +1,48 @@
+"""full-text search index over todo task and description
+
+Revision ID: 7c1f5a8e2d63
+Revises: 0b6e3d9f4a17
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1f5a8e2d63'
+down_revision = '0b6e3d9f4a17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        # create_app() runs db.create_all(), which creates todo_fts along with a new todo table
+        if sa.inspect(bind).has_table('todo_fts'):
+            return
+        op.execute(
+            "CREATE VIRTUAL TABLE todo_fts USING fts5("
+            "task, description, user_uid, tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "INSERT INTO todo_fts (rowid, task, description, user_uid) "
+            "SELECT id, task, description, replace(user_uid, '-', '') FROM todo"
+        )
+    elif bind.dialect.name == 'postgresql':
+        op.execute(
+            "ALTER TABLE todo ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('simple', coalesce(task, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'B')) STORED"
+        )
+        op.execute("CREATE INDEX IF NOT EXISTS ix_todo_search_vector ON todo USING GIN (search_vector)")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS todo_fts")
+    elif bind.dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_todo_search_vector")
+        op.execute("ALTER TABLE todo DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,35 @@
+"""one user_tokens row per (user_uid, device_uuid)
+
+Revision ID: 8b41e6d2c5a3
+Revises: 3f2a9c1d7b10
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b41e6d2c5a3'
+down_revision = '3f2a9c1d7b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep only the newest session per device before enforcing uniqueness
+    op.execute(
+        "DELETE FROM user_tokens WHERE id NOT IN ("
+        "SELECT max(id) FROM user_tokens GROUP BY user_uid, device_uuid)"
+    )
+    # create_app() runs db.create_all(), which already creates the index on a fresh database
+    indexes = sa.inspect(op.get_bind()).get_indexes('user_tokens')
+    if any(index['name'] == 'uq_user_tokens_user_device' for index in indexes):
+        return
+    with op.batch_alter_table('user_tokens') as batch_op:
+        batch_op.create_index('uq_user_tokens_user_device', ['user_uid', 'device_uuid'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('user_tokens') as batch_op:
+        batch_op.drop_index('uq_user_tokens_user_device')
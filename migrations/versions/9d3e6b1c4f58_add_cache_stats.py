@@ -0,0 +1,35 @@
+"""add cache_stats table for per-process cache counters
+
+Revision ID: 9d3e6b1c4f58
+Revises: 7c1f5a8e2d63
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d3e6b1c4f58'
+down_revision = '7c1f5a8e2d63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_app() runs db.create_all(), so the table may already exist
+    if sa.inspect(op.get_bind()).has_table('cache_stats'):
+        return
+    op.create_table(
+        'cache_stats',
+        sa.Column('process', sa.String(length=100), nullable=False),
+        sa.Column('stats', sa.Text(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('process')
+    )
+    op.create_index('ix_cache_stats_updated_at', 'cache_stats', ['updated_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_cache_stats_updated_at', table_name='cache_stats')
+    op.drop_table('cache_stats')
@@ -0,0 +1,38 @@
+"""add phone_lookups cache table
+
+Revision ID: a9c2e4f61b07
+Revises: 5e8f3b7a2d91
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9c2e4f61b07'
+down_revision = '5e8f3b7a2d91'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_app() runs db.create_all(), so the table may already exist
+    if sa.inspect(op.get_bind()).has_table('phone_lookups'):
+        return
+    op.create_table(
+        'phone_lookups',
+        sa.Column('phone_number', sa.String(length=20), nullable=False),
+        sa.Column('valid', sa.Boolean(), nullable=False),
+        sa.Column('normalized_number', sa.String(length=20), nullable=True),
+        sa.Column('country_code', sa.String(length=2), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('phone_number')
+    )
+    op.create_index('ix_phone_lookups_expires_at', 'phone_lookups', ['expires_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_phone_lookups_expires_at', table_name='phone_lookups')
+    op.drop_table('phone_lookups')
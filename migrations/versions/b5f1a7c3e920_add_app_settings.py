@@ -0,0 +1,33 @@
+"""add app_settings table for values shared by every process, such as the bcrypt cost
+
+Revision ID: b5f1a7c3e920
+Revises: 9d3e6b1c4f58
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5f1a7c3e920'
+down_revision = '9d3e6b1c4f58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_app() runs db.create_all(), so the table may already exist
+    if sa.inspect(op.get_bind()).has_table('app_settings'):
+        return
+    op.create_table(
+        'app_settings',
+        sa.Column('key', sa.String(length=100), nullable=False),
+        sa.Column('value', sa.Text(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade():
+    op.drop_table('app_settings')
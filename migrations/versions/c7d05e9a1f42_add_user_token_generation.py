@@ -0,0 +1,29 @@
+"""add token_generation to user
+
+Revision ID: c7d05e9a1f42
+Revises: 8b41e6d2c5a3
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d05e9a1f42'
+down_revision = '8b41e6d2c5a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_app() runs db.create_all(), which already creates the column on a fresh database
+    if any(column['name'] == 'token_generation' for column in sa.inspect(op.get_bind()).get_columns('user')):
+        return
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.add_column(sa.Column('token_generation', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.drop_column('token_generation')
@@ -0,0 +1,30 @@
+"""composite index for OTP verify-and-consume
+
+Revision ID: d4b7e2a9c318
+Revises: a9c2e4f61b07
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4b7e2a9c318'
+down_revision = 'a9c2e4f61b07'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = 'ix_user_otps_user_purpose_used_expiry'
+
+
+def upgrade():
+    # create_app() runs db.create_all(), which already creates the index on a fresh database
+    indexes = sa.inspect(op.get_bind()).get_indexes('user_otps')
+    if any(index['name'] == INDEX_NAME for index in indexes):
+        return
+    op.create_index(INDEX_NAME, 'user_otps', ['user_uid', 'purpose', 'is_used', 'expires_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index(INDEX_NAME, table_name='user_otps')
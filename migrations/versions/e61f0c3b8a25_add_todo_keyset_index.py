@@ -0,0 +1,30 @@
+"""composite index for keyset pagination of todos
+
+Revision ID: e61f0c3b8a25
+Revises: d4b7e2a9c318
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e61f0c3b8a25'
+down_revision = 'd4b7e2a9c318'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = 'ix_todo_user_created_id'
+
+
+def upgrade():
+    # create_app() runs db.create_all(), which already creates the index on a fresh database
+    indexes = sa.inspect(op.get_bind()).get_indexes('todo')
+    if any(index['name'] == INDEX_NAME for index in indexes):
+        return
+    op.create_index(INDEX_NAME, 'todo', ['user_uid', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(INDEX_NAME, table_name='todo')
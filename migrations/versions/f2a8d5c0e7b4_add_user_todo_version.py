@@ -0,0 +1,29 @@
+"""add user.todo_version for todo list ETags
+
+Revision ID: f2a8d5c0e7b4
+Revises: e61f0c3b8a25
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a8d5c0e7b4'
+down_revision = 'e61f0c3b8a25'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_app() runs db.create_all(), which already creates the column on a fresh database
+    if any(column['name'] == 'todo_version' for column in sa.inspect(op.get_bind()).get_columns('user')):
+        return
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.add_column(sa.Column('todo_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.drop_column('todo_version')
@@ -1,6 +1,7 @@
 import uuid
 from datetime import datetime, timezone
-from extensions import db
+from sqlalchemy import event
+from extensions import db, user_cache, token_cache, token_generations
 
 class User(db.Model):
     __tablename__ = 'user'
@@ -15,6 +16,8 @@ class User(db.Model):
     create_date = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
     email_verified = db.Column(db.Boolean, nullable=False, default=False)
     phone_verified = db.Column(db.Boolean, nullable=False, default=False)
+    token_generation = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    todo_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
     # todos = db.relationship('ToDo', backref='user', lazy=True)
     todos = db.relationship(
@@ -25,8 +28,22 @@ class User(db.Model):
 )
 
 
+@event.listens_for(User, "after_delete")
+def forget_deleted_user(mapper, connection, target):
+    """
+    Drops a deleted user from the per-process auth caches. Bulk query deletes bypass this hook.
+    """
+    user_cache.invalidate(target.uid)
+    token_cache.invalidate_user(target.uid)
+    token_generations.delete(target.uid)
+
+
 class ToDo(db.Model):
     __tablename__ = 'todo'
+    __table_args__ = (
+        db.Index("ix_todo_user_created_id", "user_uid", "created_at", "id"),
+        db.Index("ix_todo_user_change_seq", "user_uid", "change_seq", "id"),
+    )
     id = db.Column(db.Integer, primary_key=True)
     uid = db.Column(db.String(36), unique=True, nullable=False, default=lambda: str(uuid.uuid4()))
     task = db.Column(db.String(200), nullable=False)
@@ -35,15 +52,70 @@ class ToDo(db.Model):
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
     modified_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
     user_uid = db.Column(db.String(36),db.ForeignKey('user.uid', name='fk_todo_user_uid'),nullable=False)
+    # User.todo_version after the last write to this item; orders the /todo/changes feed
+    change_seq = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+
+# Full-text index over todo task and description, created and dropped along with the todo table.
+# SQLite: an FTS5 table keyed by todo.id, which sql_files/todo_sql.py writes together with todo rows;
+# user_uid (without hyphens) is indexed too so searches can be narrowed to one user inside MATCH.
+# Postgres: a generated tsvector column with a GIN index, which the database keeps in sync itself.
+TODO_SEARCH_DDL = {
+    "sqlite": (
+        ["CREATE VIRTUAL TABLE IF NOT EXISTS todo_fts USING fts5("
+         "task, description, user_uid, tokenize='unicode61 remove_diacritics 2')"],
+        ["DROP TABLE IF EXISTS todo_fts"],
+    ),
+    "postgresql": (
+        ["ALTER TABLE todo ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+         "setweight(to_tsvector('simple', coalesce(task, '')), 'A') || "
+         "setweight(to_tsvector('simple', coalesce(description, '')), 'B')) STORED",
+         "CREATE INDEX IF NOT EXISTS ix_todo_search_vector ON todo USING GIN (search_vector)"],
+        [],
+    ),
+}
+
+
+@event.listens_for(ToDo.__table__, "after_create")
+def create_todo_search_index(target, connection, **kw):
+    for statement in TODO_SEARCH_DDL.get(connection.dialect.name, ((), ()))[0]:
+        connection.exec_driver_sql(statement)
+
+
+@event.listens_for(ToDo.__table__, "before_drop")
+def drop_todo_search_index(target, connection, **kw):
+    for statement in TODO_SEARCH_DDL.get(connection.dialect.name, ((), ()))[1]:
+        connection.exec_driver_sql(statement)
+
+
+class ToDoTombstone(db.Model):
+    """
+    Record of a deleted ToDo item, kept so device caches can sync deletions via /todo/changes.
+    """
+    __tablename__ = 'todo_tombstones'
+    __table_args__ = (
+        db.Index("ix_todo_tombstones_user_change_seq", "user_uid", "change_seq", "todo_id"),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    todo_id = db.Column(db.Integer, nullable=False)
+    todo_uid = db.Column(db.String(36), nullable=False)
+    user_uid = db.Column(db.String(36), nullable=False)
+    change_seq = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
 
 
 class UserToken(db.Model):
     __tablename__ = "user_tokens"
+    __table_args__ = (
+        db.Index("uq_user_tokens_user_device", "user_uid", "device_uuid", unique=True),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_uid = db.Column(db.String(64), nullable=False)
     access_token = db.Column(db.Text, nullable=False)
+    access_token_digest = db.Column(db.String(64), unique=True, index=True, nullable=False)
     access_token_expiry = db.Column(db.DateTime(timezone=True), nullable=True)
     refresh_token = db.Column(db.Text, nullable=False)
+    refresh_token_digest = db.Column(db.String(64), unique=True, index=True, nullable=False)
     refresh_token_expiry = db.Column(db.DateTime(timezone=True), nullable=False)
     device_uuid = db.Column(db.String(100), nullable=True)
     created_at = db.Column(db.DateTime(timezone=True),default=lambda: datetime.now(timezone.utc))
@@ -51,6 +123,9 @@ class UserToken(db.Model):
 
 class UserOTP(db.Model):
     __tablename__ = "user_otps"
+    __table_args__ = (
+        db.Index("ix_user_otps_user_purpose_used_expiry", "user_uid", "purpose", "is_used", "expires_at"),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_uid = db.Column(db.String, db.ForeignKey("user.uid"), nullable=False)
     otp_code = db.Column(db.String, nullable=False)
@@ -62,6 +137,46 @@ class UserOTP(db.Model):
     user = db.relationship("User", backref=db.backref("otps", lazy=True))
 
 
-   
+class SmsOutbox(db.Model):
+    __tablename__ = "sms_outbox"
+    __table_args__ = (
+        db.Index("ix_sms_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    to_number = db.Column(db.String(20), nullable=False)
+    body = db.Column(db.String(1600), nullable=False)
+    kind = db.Column(db.String(30), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    claimed_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.String(500), nullable=True)
+    provider_message_id = db.Column(db.String(64), nullable=True)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+
+class PhoneLookup(db.Model):
+    __tablename__ = "phone_lookups"
+    phone_number = db.Column(db.String(20), primary_key=True)
+    valid = db.Column(db.Boolean, nullable=False)
+    normalized_number = db.Column(db.String(20), nullable=True)
+    country_code = db.Column(db.String(2), nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+
+class CacheStats(db.Model):
+    __tablename__ = "cache_stats"
+    # One row per serving process ("hostname:pid"), overwritten with a JSON snapshot of its cache counters
+    process = db.Column(db.String(100), primary_key=True)
+    stats = db.Column(db.Text, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, index=True)
 
 
+class AppSetting(db.Model):
+    __tablename__ = "app_settings"
+    # Values shared by every process and host, such as the calibrated bcrypt cost (JSON text)
+    key = db.Column(db.String(100), primary_key=True)
+    value = db.Column(db.Text, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
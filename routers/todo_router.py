@@ -1,20 +1,35 @@
 from datetime import datetime, timezone
 import logging
 import jwt
-from flask import Blueprint, request, jsonify
-from schemas.todo_schema import ToDoCreateSchema, ToDoQuerySchema, ToDoResponseSchema, ToDoUpdateSchema
-from manager.todo_manager import ToDoManager
+from flask import Blueprint, request, jsonify, current_app, g, stream_with_context
+from schemas.compiled_schema import compiled_serializer
+from schemas.todo_schema import (
+    ToDoCreateSchema,
+    ToDoQuerySchema,
+    ToDoChangesQuerySchema,
+    ToDoSearchQuerySchema,
+    ToDoUpdateSchema,
+    ToDoBulkUpdateSchema,
+    ToDoBulkDeleteSchema,
+    ToDoResponseSchema,
+    todo_response_serializer,
+)
+from manager.todo_manager import ToDoManager, SYNC_CURSOR_EXPIRED, SEARCH_CURSOR_EXPIRED
+from manager.user_manager import UserManager
 from marshmallow import ValidationError
 from functools import wraps
-from models import UserToken
+from sql_files.user_sql import get_user_token_by_access_token
+from extensions import token_cache, response_cache
 from utils import decode_token, require_standard_headers 
 
 todo = Blueprint('todo', __name__)
 todo_manager = ToDoManager()
+user_manager = UserManager()
 
 def token_required(f):
     """
     Decorator to validate the JWT access token and inject the current user's UID into the route function.
+    The authenticated, existing user's UID is also kept on flask.g as the request principal.
     """
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -35,19 +50,36 @@ def token_required(f):
             return jsonify({"error": "Token is missing"}), 401
 
         try:
-            data = decode_token(token)
-            current_user_uid = data["uid"]
-            token_record = UserToken.query.filter_by(
-                user_uid=current_user_uid,
-                access_token=token
-            ).first()
-            
-            if not token_record:
-                return jsonify({"error": "Invalid token"}), 401
-            if token_record.device_uuid != device_uuid:
+            if current_app.config.get("TOKEN_VERIFICATION_MODE") == "stateless":
+                # Trust the signed claims; revocation is a per-user generation bump
+                data = decode_token(token)
+                current_user_uid = data["uid"]
+                if data.get("type") != "access" or "gen" not in data:
+                    return jsonify({"error": "Invalid token"}), 401
+                if data["gen"] != user_manager.current_token_generation(current_user_uid):
+                    return jsonify({"error": "Token revoked"}), 401
+                token_device_uuid = data.get("device")
+            else:
+                cached = token_cache.get(token)
+                if cached:
+                    current_user_uid, token_device_uuid, _ = cached
+                else:
+                    data = decode_token(token)
+                    current_user_uid = data["uid"]
+                    token_record = get_user_token_by_access_token(current_user_uid, token)
+
+                    if not token_record:
+                        return jsonify({"error": "Invalid token"}), 401
+                    token_device_uuid = token_record.device_uuid
+                    token_cache.set(token, current_user_uid, token_device_uuid, data["exp"])
+
+            if token_device_uuid != device_uuid:
                 return jsonify({"error": "Device UUID mismatch"}), 401
 
-            
+            if not user_manager.user_exists(current_user_uid):
+                return jsonify({"error": "User not found"}), 401
+            g.current_user_uid = current_user_uid
+
         except jwt.ExpiredSignatureError:
             return jsonify({"error": "Token expired"}), 401
         except jwt.InvalidTokenError:
@@ -81,22 +113,118 @@ def create_todo(current_user_uid):
         return jsonify({"error": "Internal server error"}), 500
 
 
+def list_etag(current_user_uid, version):
+    """
+    ETag of a user's todo list: the user's list version, which every todo write bumps.
+    """
+    return f"{current_user_uid}.{version}"
+
+
+def todo_list_serializer(params):
+    """
+    Serializer for the requested sparse fieldset (the fields query parameter), or for every field.
+    Only the columns it reads are selected.
+    """
+    return compiled_serializer(ToDoResponseSchema, params['only']) if 'only' in params else todo_response_serializer
+
+
+def render_todo_list(current_user_uid, params):
+    """
+    Loads and serializes the requested todo list or page to JSON bytes. Returns (body, error).
+    Rows are selected as plain column tuples of the requested fields and dumped by their precompiled serializer.
+    """
+    created_range = params.get('created_range')
+    serializer = todo_list_serializer(params)
+    columns = serializer.attributes
+    if 'limit' in params or 'after' in params:
+        page, error = todo_manager.get_page_by_user_uid(
+            current_user_uid, params.get('limit'), params.get('after'), created_range, columns
+        )
+        if error:
+            return None, error
+        data = {
+            "todos": serializer.dump_rows(page['todos']),
+            "next_cursor": page['next_cursor']
+        }
+    else:
+        todos, error = todo_manager.get_by_user_uid(current_user_uid, created_range, columns)
+        if error:
+            return None, error
+        data = serializer.dump_rows(todos)
+    return current_app.json.response(data).get_data(), None
+
+
+def stream_todo_list(rows, serializer=todo_response_serializer):
+    """
+    Writes the JSON array of todos one item at a time, producing the same bytes as jsonify
+    does outside debug mode. rows follow serializer.attributes order.
+    """
+    dump_row = serializer.dump_row
+    dumps = current_app.json.dumps
+    yield "["
+    for index, row in enumerate(rows):
+        yield ("," if index else "") + dumps(dump_row(row), separators=(",", ":"))
+    yield "]\n"
+
+
 @todo.route('/gettodo', methods=['GET'])
 @token_required
 def get_todos(current_user_uid):
     """
-    Retrieves ToDo items for the authenticated user, optionally filtered by date.
+    Retrieves ToDo items for the authenticated user, optionally filtered by date or a from/to
+    day range, interpreted in the tz timezone (UTC by default).
+    With limit or cursor, returns one page as {"todos", "next_cursor"}; otherwise a capped list.
+    With stream=true, writes the full, uncapped list incrementally instead.
+    fields=uid,task,... limits each todo to those fields, and only their columns are queried.
+    Answers If-None-Match with 304 before any todo rows are loaded, and serves
+    unchanged lists from the response cache.
     """
 
     try:        
         logging.info(f"Fetching todos for user_uid: {current_user_uid}")
         params = ToDoQuerySchema().load(request.args)
-        date = params.get('date')
-        todos, error = todo_manager.get_by_user_uid(current_user_uid, date)
+
+        version = todo_manager.get_list_version(current_user_uid)
+        etag = list_etag(current_user_uid, version) if version is not None else None
+        if etag and request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+
+        if params['stream']:
+            serializer = todo_list_serializer(params)
+            rows, error = todo_manager.iter_by_user_uid(current_user_uid, params.get('created_range'), serializer.attributes)
+            if error:
+                logging.warning(f"Stream ToDos failed: {error}")
+                return jsonify({"error": error}), 404
+            response = current_app.response_class(
+                stream_with_context(stream_todo_list(rows, serializer)),
+                mimetype=current_app.json.mimetype
+            )
+            if etag:
+                response.set_etag(etag)
+            return response
+
+        if version is None:
+            body, error = render_todo_list(current_user_uid, params)
+        else:
+            # The version is part of the key, so an entry is never served across a write. The key is built
+            # from the loaded params, so ignored arguments (cache busters like ?_=<ts>) share one entry;
+            # tz only matters through created_range
+            cache_key = f"{version}:{sorted((name, value) for name, value in params.items() if name != 'tz')!r}"
+            body, error = response_cache.get_or_render(
+                current_user_uid,
+                cache_key,
+                lambda: render_todo_list(current_user_uid, params)
+            )
+
         if error:
             logging.warning(f"Get ToDos failed: {error}")
             return jsonify({"error": error}), 404
-        return jsonify(ToDoResponseSchema(many=True).dump(todos))
+        response = current_app.response_class(body, mimetype=current_app.json.mimetype)
+        if etag:
+            response.set_etag(etag)
+        return response
     except ValidationError as e:
         logging.warning(f"Validation error in get_todos: {e.messages}")
         return jsonify({"error": "Validation error", "details": e.messages}), 400
@@ -105,6 +233,71 @@ def get_todos(current_user_uid):
         return jsonify({"error": "Internal server error"}), 500
 
 
+@todo.route('/changes', methods=['GET'])
+@token_required
+def get_todo_changes(current_user_uid):
+    """
+    Delta sync for device caches: returns the todos created or updated and the UIDs deleted after
+    the since cursor, oldest change first, with the cursor to send next time.
+    Without since, returns every todo (a full sync). Keep calling while has_more is true.
+    Answers 410 when the cursor is older than the tombstone retention; the client should then resync in full.
+    """
+
+    try:
+        params = ToDoChangesQuerySchema().load(request.args)
+        result, error = todo_manager.get_changes(
+            current_user_uid, params.get('after'), params.get('synced_at'), params.get('limit'),
+            todo_response_serializer.attributes
+        )
+        if error:
+            logging.warning(f"Get ToDo changes failed: {error}")
+            return jsonify({"error": error}), 410 if error == SYNC_CURSOR_EXPIRED else 404
+
+        return jsonify({
+            "todos": todo_response_serializer.dump_rows(result['todos']),
+            "deleted": result['deleted'],
+            "next_cursor": result['next_cursor'],
+            "has_more": result['has_more']
+        }), 200
+    except ValidationError as e:
+        logging.warning(f"Validation error in get_todo_changes: {e.messages}")
+        return jsonify({"error": "Validation error", "details": e.messages}), 400
+    except Exception as e:
+        logging.error(f"Internal server error in get_todo_changes: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@todo.route('/search', methods=['GET'])
+@token_required
+def search_todos(current_user_uid):
+    """
+    Full-text search over the authenticated user's todo tasks and descriptions.
+    Every word of q must match a whole word; results come best match first as {"todos", "next_cursor"}.
+    A cursor only continues the same q, and returns 410 once the user's todos changed since the first page.
+    """
+
+    try:
+        params = ToDoSearchQuerySchema().load(request.args)
+        result, error = todo_manager.search(
+            current_user_uid, params['terms'], params.get('limit'), params.get('after'),
+            todo_response_serializer.attributes
+        )
+        if error:
+            logging.warning(f"Search ToDos failed: {error}")
+            return jsonify({"error": error}), 410 if error == SEARCH_CURSOR_EXPIRED else 404
+
+        return jsonify({
+            "todos": todo_response_serializer.dump_rows(result['todos']),
+            "next_cursor": result['next_cursor']
+        }), 200
+    except ValidationError as e:
+        logging.warning(f"Validation error in search_todos: {e.messages}")
+        return jsonify({"error": "Validation error", "details": e.messages}), 400
+    except Exception as e:
+        logging.error(f"Internal server error in search_todos: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
 @todo.route('/delete', methods=['DELETE'])
 @token_required
 def delete_todo(current_user_uid):
@@ -160,7 +353,7 @@ def update_todo(current_user_uid):
 
         return jsonify({
             "message": "Todo updated successfully",
-            "todo": ToDoResponseSchema().dump(updated_todo)
+            "todo": todo_response_serializer.dump_object(updated_todo)
         }), 200
     
     except ValidationError as e:
@@ -170,3 +363,84 @@ def update_todo(current_user_uid):
     except Exception as e:
         logging.error(f"Internal server error in update_todo: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
+
+
+def bulk_error_status(error):
+    """
+    HTTP status for a bulk manager error: 500 for internal errors, 404 for a missing user,
+    400 for a batch the client has to fix (empty or too large).
+    """
+    if error == "Internal server error":
+        return 500
+    if error == "User does not exist":
+        return 404
+    return 400
+
+
+@todo.route('/bulk-create', methods=['POST'])
+@token_required
+def bulk_create_todos(current_user_uid):
+    """
+    Creates several ToDo items for the authenticated user in one transaction.
+    Expects a JSON array of {task, description} and returns per-item results.
+    """
+
+    try:
+        items = ToDoCreateSchema(many=True).load(request.get_json())
+        results, error = todo_manager.bulk_create(current_user_uid, items)
+        if error:
+            logging.warning(f"Bulk ToDo request failed: {error}")
+            return jsonify({"error": error}), bulk_error_status(error)
+        return jsonify({"results": results}), 201
+    except ValidationError as e:
+        logging.warning(f"Validation error in bulk_create_todos: {e.messages}")
+        return jsonify({"error": "Validation error", "details": e.messages}), 400
+    except Exception as e:
+        logging.error(f"Internal server error in bulk_create_todos: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@todo.route('/bulk-update', methods=['PUT'])
+@token_required
+def bulk_update_todos(current_user_uid):
+    """
+    Updates several ToDo items of the authenticated user in one transaction.
+    Expects a JSON array of {todo_uid, task?, description?, status?} and returns per-item results.
+    """
+
+    try:
+        items = ToDoBulkUpdateSchema(many=True).load(request.get_json())
+        results, error = todo_manager.bulk_update(current_user_uid, items)
+        if error:
+            logging.warning(f"Bulk ToDo request failed: {error}")
+            return jsonify({"error": error}), bulk_error_status(error)
+        return jsonify({"results": results}), 200
+    except ValidationError as e:
+        logging.warning(f"Validation error in bulk_update_todos: {e.messages}")
+        return jsonify({"error": "Validation error", "details": e.messages}), 400
+    except Exception as e:
+        logging.error(f"Internal server error in bulk_update_todos: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@todo.route('/bulk-delete', methods=['DELETE'])
+@token_required
+def bulk_delete_todos(current_user_uid):
+    """
+    Deletes several ToDo items of the authenticated user in one statement.
+    Expects {"todo_uids": [...]} and returns per-item results.
+    """
+
+    try:
+        data = ToDoBulkDeleteSchema().load(request.get_json())
+        results, error = todo_manager.bulk_delete(current_user_uid, data['todo_uids'])
+        if error:
+            logging.warning(f"Bulk ToDo request failed: {error}")
+            return jsonify({"error": error}), bulk_error_status(error)
+        return jsonify({"results": results}), 200
+    except ValidationError as e:
+        logging.warning(f"Validation error in bulk_delete_todos: {e.messages}")
+        return jsonify({"error": "Validation error", "details": e.messages}), 400
+    except Exception as e:
+        logging.error(f"Internal server error in bulk_delete_todos: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
@@ -1,11 +1,13 @@
 from datetime import datetime, timedelta, timezone
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from marshmallow import ValidationError
 from schemas.user_schema import UserSchema,LoginSchema, OTPVerificationSchema
 from manager.user_manager import UserManager
 from utils import generate_access_token, generate_refresh_token, require_standard_headers, decode_token
-from models import UserToken
-from extensions import db
+from sql_files.user_sql import get_user_token_by_refresh_token, update_user_access_token
+from extensions import token_cache, rate_limiter
+from services.hashing import HashingBusyError
+from services.circuit_breaker import ServiceUnavailableError
 import logging 
 import jwt
 
@@ -36,13 +38,28 @@ def register():
     except ValidationError as e:
         logging.error(f"Validation error during registration: {e.messages}")
         return jsonify(e.messages), 400
+    except HashingBusyError:
+        return jsonify({"error": "Server is busy, please retry shortly"}), 503, {"Retry-After": "1"}
+    except ServiceUnavailableError as e:
+        logging.warning(f"Registration unavailable: {str(e)}")
+        retry_after = current_app.config.get("TWILIO_BREAKER_RESET_SECONDS", 30)
+        return jsonify({"error": "Phone validation is temporarily unavailable, please retry shortly"}), 503, {"Retry-After": str(retry_after)}
     except Exception as e:
         logging.error(f"Unexpected error in register: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
 
 
+def otp_user_key():
+    """
+    Rate-limit key for OTP routes: the user being verified, falling back to the client address.
+    """
+    data = request.get_json(silent=True) or {}
+    return data.get('user_uid') or request.remote_addr
+
+
 @user.route('/verify-otp', methods=['POST'])
 @require_standard_headers
+@rate_limiter.limit("OTP_VERIFY_LIMIT", "OTP_VERIFY_WINDOW_SECONDS", key_func=otp_user_key)
 def verify_otp():
     """
     Verifies OTP and completes user registration.
@@ -90,6 +107,8 @@ def resend_otp():
         
         if not result['success']:
             logging.warning(f"OTP resend failed: {result['error']}")
+            if result.get('retry_after'):
+                return jsonify({"error": result['error']}), 429, {"Retry-After": str(result['retry_after'])}
             return jsonify({"error": result['error']}), 400
         
         logging.info(f"OTP resent successfully for user: {user_uid}")
@@ -114,9 +133,9 @@ def login():
         if not user:
             return jsonify({"error": "Invalid credentials"}), 401
 
-        access_token, access_expiry = generate_access_token(user.uid)
-        refresh_token, refresh_expiry = generate_refresh_token(user.uid)
         device_uuid = request.headers.get("Device-Uuid")
+        access_token, access_expiry = generate_access_token(user.uid, device_uuid, user.token_generation)
+        refresh_token, refresh_expiry = generate_refresh_token(user.uid)
 
         user_manager.save_token(
             user_uid=user.uid,
@@ -136,6 +155,8 @@ def login():
         })
     except ValidationError as e:
         return jsonify(e.messages), 400
+    except HashingBusyError:
+        return jsonify({"error": "Server is busy, please retry shortly"}), 503, {"Retry-After": "1"}
     except Exception as e:
         logging.error(f"Error in login: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
@@ -163,7 +184,7 @@ def refresh_token_route():
         user_uid = data["uid"]
         
         # Check if this token exists in DB
-        token_record = UserToken.query.filter_by(refresh_token=token, user_uid=user_uid).first()
+        token_record = get_user_token_by_refresh_token(user_uid, token)
         if not token_record:
             return jsonify({"error": "Invalid refresh token"}), 401
         
@@ -173,12 +194,12 @@ def refresh_token_route():
             return jsonify({"error": "Device UUID mismatch"}), 401
 
         # Generate new access token
-        new_access_token, new_access_expiry = generate_access_token(user_uid)
+        generation = user_manager.current_token_generation(user_uid)
+        new_access_token, new_access_expiry = generate_access_token(user_uid, incoming_device_uuid, generation)
 
-        # Update DB
-        token_record.access_token = new_access_token
-        token_record.access_token_expiry = new_access_expiry
-        db.session.commit()
+        # Update DB and forget the replaced access token
+        token_cache.invalidate(token_record.access_token)
+        update_user_access_token(token_record, new_access_token, new_access_expiry)
 
         return jsonify({"access_token": new_access_token})
 
@@ -190,3 +211,68 @@ def refresh_token_route():
         logging.error(f"Error in refresh_token: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
 
+
+@user.route('/logout', methods=['POST'])
+@require_standard_headers
+def logout():
+    """
+    Revokes the current device's session so its access and refresh tokens stop working.
+    """
+
+    token = None
+    if "Authorization" in request.headers:
+        bearer = request.headers["Authorization"]
+        if bearer.startswith("Bearer "):
+            token = bearer.split(" ")[1]
+
+    if not token:
+        return jsonify({"error": "Access token is missing"}), 401
+
+    try:
+        data = decode_token(token)
+        device_uuid = request.headers.get("Device-Uuid")
+        if not user_manager.logout_user(data["uid"], token, device_uuid):
+            return jsonify({"error": "Invalid token"}), 401
+
+        return jsonify({"message": "Logged out successfully"}), 200
+
+    except jwt.ExpiredSignatureError:
+        return jsonify({"error": "Token expired"}), 401
+    except jwt.InvalidTokenError:
+        return jsonify({"error": "Invalid token"}), 401
+    except Exception as e:
+        logging.error(f"Error in logout: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@user.route('/logout-all', methods=['POST'])
+@require_standard_headers
+def logout_all():
+    """
+    Revokes every session of the current user on all devices.
+    """
+
+    token = None
+    if "Authorization" in request.headers:
+        bearer = request.headers["Authorization"]
+        if bearer.startswith("Bearer "):
+            token = bearer.split(" ")[1]
+
+    if not token:
+        return jsonify({"error": "Access token is missing"}), 401
+
+    try:
+        data = decode_token(token)
+        device_uuid = request.headers.get("Device-Uuid")
+        if not user_manager.revoke_all_sessions(data["uid"], token, device_uuid):
+            return jsonify({"error": "Invalid token"}), 401
+
+        return jsonify({"message": "Logged out from all devices"}), 200
+
+    except jwt.ExpiredSignatureError:
+        return jsonify({"error": "Token expired"}), 401
+    except jwt.InvalidTokenError:
+        return jsonify({"error": "Invalid token"}), 401
+    except Exception as e:
+        logging.error(f"Error in logout_all: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
@@ -0,0 +1,95 @@
+from functools import lru_cache
+from operator import attrgetter
+from marshmallow import fields
+
+@lru_cache(maxsize=4096)
+def _cached_isoformat(value, tzinfo):
+    return value.isoformat()
+
+
+def iso_datetime(value):
+    """
+    Cached datetime.isoformat; created_at and modified_at often repeat across a list.
+    Keyed by tzinfo as well, since aware datetimes in different zones compare equal.
+    """
+    return _cached_isoformat(value, value.tzinfo)
+
+
+def _text_expression(var):
+    # Same result as fields.Str: str(value), bytes decoded as UTF-8, None kept
+    return f"({var} if {var} is None or {var}.__class__ is str else _text({var}))"
+
+
+def _datetime_expression(var):
+    return f"(None if {var} is None else _iso({var}))"
+
+
+def _text(value):
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return str(value)
+
+
+class CompiledSerializer:
+    """
+    Fast equivalent of Schema().dump for flat schemas, generated once from the schema's declared fields.
+    dump_row works on row tuples whose first values follow `attributes` order
+    (select those columns first); dump_object reads the same attributes from an object.
+    only limits the output to those field names, like Schema(only=...).
+    Supports fields.Str and ISO fields.DateTime; any other field type raises TypeError at build time.
+    """
+
+    def __init__(self, schema_class, only=None):
+        self.schema_class = schema_class
+        self.attributes = []
+        entries = []
+        declared = schema_class._declared_fields
+        if only is not None:
+            unknown = set(only) - set(declared)
+            if unknown:
+                raise ValueError(f"{schema_class.__name__} has no fields {sorted(unknown)}")
+        dumped = [
+            (name, field) for name, field in declared.items()
+            if not field.load_only and (only is None or name in only)
+        ]
+        if not dumped:
+            raise ValueError(f"{schema_class.__name__} has no fields to dump")
+        for index, (name, field) in enumerate(dumped):
+            var = f"_{index}"
+            if type(field) is fields.String:
+                expression = _text_expression(var)
+            elif type(field) is fields.DateTime and (field.format or field.DEFAULT_FORMAT) in ("iso", "iso8601"):
+                expression = _datetime_expression(var)
+            else:
+                raise TypeError(f"{schema_class.__name__}.{name}: {type(field).__name__} is not supported")
+            self.attributes.append(field.attribute or name)
+            entries.append(f"        {field.data_key or name!r}: {expression},")
+
+        variables = ", ".join(f"_{index}" for index in range(len(self.attributes)))
+        source = "\n".join([
+            "def dump_row(row):",
+            f"    {variables}, *_ = row",
+            "    return {",
+            *entries,
+            "    }",
+        ])
+        namespace = {"_text": _text, "_iso": iso_datetime}
+        exec(compile(source, f"<compiled {schema_class.__name__}>", "exec"), namespace)
+        self.dump_row = namespace["dump_row"]
+        getter = attrgetter(*self.attributes)
+        self._get_attributes = getter if len(self.attributes) > 1 else (lambda obj: (getter(obj),))
+
+    def dump_rows(self, rows):
+        dump_row = self.dump_row
+        return [dump_row(row) for row in rows]
+
+    def dump_object(self, obj):
+        return self.dump_row(self._get_attributes(obj))
+
+
+@lru_cache(maxsize=128)
+def compiled_serializer(schema_class, only=None):
+    """
+    Returns the shared CompiledSerializer of schema_class, limited to the field names in only (a tuple) if given.
+    """
+    return CompiledSerializer(schema_class, only)
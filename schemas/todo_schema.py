@@ -1,5 +1,9 @@
 from extensions import ma
-from marshmallow import fields, validates_schema, ValidationError, validate, EXCLUDE
+import re
+import pytz
+from marshmallow import fields, validates_schema, post_load, ValidationError, validate, EXCLUDE
+from utils import decode_cursor, decode_search_cursor, decode_sync_cursor, local_days_to_utc_range
+from schemas.compiled_schema import compiled_serializer
 
 class ToDoCreateSchema(ma.Schema):
     class Meta:
@@ -18,10 +22,117 @@ class ToDoQuerySchema(ma.Schema):
     class Meta:
         unknown = EXCLUDE
 
-    date = fields.Str(
+    date = fields.Date(
         required=False,
-        validate=validate.Regexp(r'^\d{4}-\d{2}-\d{2}$', error="Date must be in YYYY-MM-DD format")
+        format="%Y-%m-%d",
+        error_messages={"invalid": "Date must be in YYYY-MM-DD format"}
     )
+    from_date = fields.Date(
+        required=False,
+        data_key="from",
+        format="%Y-%m-%d",
+        error_messages={"invalid": "from must be in YYYY-MM-DD format"}
+    )
+    to_date = fields.Date(
+        required=False,
+        data_key="to",
+        format="%Y-%m-%d",
+        error_messages={"invalid": "to must be in YYYY-MM-DD format"}
+    )
+    tz = fields.Str(
+        required=False,
+        load_default="UTC",
+        validate=validate.OneOf(pytz.all_timezones_set, error="Unknown timezone")
+    )
+    limit = fields.Int(
+        required=False,
+        validate=validate.Range(min=1, error="Limit must be a positive integer")
+    )
+    cursor = fields.Str(required=False)
+    stream = fields.Bool(required=False, load_default=False)
+    field_names = fields.Str(required=False, data_key="fields")
+
+    @validates_schema
+    def validate_date_range(self, data, **kwargs):
+        if data.get("stream") and ("limit" in data or "cursor" in data):
+            raise ValidationError("stream cannot be combined with limit or cursor.", field_name="stream")
+        if "date" in data and ("from_date" in data or "to_date" in data):
+            raise ValidationError("Use either date or from/to, not both.")
+        if "from_date" in data and "to_date" in data and data["from_date"] > data["to_date"]:
+            raise ValidationError("from must not be after to.", field_name="from")
+
+    @post_load
+    def resolve_filters(self, data, **kwargs):
+        # Day filters become a half-open UTC range on created_at, so the index can be used
+        if "date" in data:
+            day = data.pop("date")
+            data["created_range"] = local_days_to_utc_range(day, day, data["tz"])
+        elif "from_date" in data or "to_date" in data:
+            data["created_range"] = local_days_to_utc_range(data.pop("from_date", None), data.pop("to_date", None), data["tz"])
+
+        if "cursor" in data:
+            try:
+                data["after"] = decode_cursor(data.pop("cursor"))
+            except ValueError:
+                raise ValidationError("Invalid cursor", field_name="cursor")
+
+        if "field_names" in data:
+            # Sparse fieldset: a comma-separated list of ToDoResponseSchema fields, kept in schema order
+            requested = {name.strip() for name in data.pop("field_names").split(",") if name.strip()}
+            unknown = requested - set(ToDoResponseSchema._declared_fields)
+            if unknown:
+                raise ValidationError(f"Unknown fields: {', '.join(sorted(unknown))}", field_name="fields")
+            if not requested:
+                raise ValidationError("fields must name at least one field", field_name="fields")
+            data["only"] = tuple(name for name in ToDoResponseSchema._declared_fields if name in requested)
+        return data
+
+class ToDoChangesQuerySchema(ma.Schema):
+    class Meta:
+        unknown = EXCLUDE
+
+    since = fields.Str(required=False)
+    limit = fields.Int(
+        required=False,
+        validate=validate.Range(min=1, error="Limit must be a positive integer")
+    )
+
+    @post_load
+    def resolve_cursor(self, data, **kwargs):
+        if "since" in data:
+            try:
+                data["after"], data["synced_at"] = decode_sync_cursor(data.pop("since"))
+            except ValueError:
+                raise ValidationError("Invalid cursor", field_name="since")
+        return data
+
+class ToDoSearchQuerySchema(ma.Schema):
+    class Meta:
+        unknown = EXCLUDE
+
+    q = fields.Str(
+        required=True,
+        validate=validate.Length(min=1, max=200, error="q must be between 1 and 200 characters"),
+        error_messages={"required": "q is required"}
+    )
+    limit = fields.Int(
+        required=False,
+        validate=validate.Range(min=1, error="Limit must be a positive integer")
+    )
+    cursor = fields.Str(required=False)
+
+    @post_load
+    def resolve_terms(self, data, **kwargs):
+        # Only words are searched, so punctuation in q can never become full-text query syntax
+        data["terms"] = re.findall(r"\w+", data["q"].lower())[:10]
+        if not data["terms"]:
+            raise ValidationError("q must contain at least one word", field_name="q")
+        if "cursor" in data:
+            try:
+                data["after"] = decode_search_cursor(data.pop("cursor"), data["terms"])
+            except ValueError:
+                raise ValidationError("Invalid cursor", field_name="cursor")
+        return data
 
 class ToDoResponseSchema(ma.Schema):
     uid = fields.Str()
@@ -32,6 +143,9 @@ class ToDoResponseSchema(ma.Schema):
     status = fields.Str()
     user_uid = fields.Str()
 
+# Fast path for serializing todo lists and rows; produces the same output as ToDoResponseSchema
+todo_response_serializer = compiled_serializer(ToDoResponseSchema)
+
 class ToDoUpdateSchema(ma.Schema):
     class Meta:
         unknown = EXCLUDE
@@ -53,3 +167,17 @@ class ToDoUpdateSchema(ma.Schema):
     def validate_at_least_one(self, data, **kwargs):
         if not data:
             raise ValidationError("At least one field (task, description, or status) must be provided.")
+
+class ToDoBulkUpdateSchema(ToDoUpdateSchema):
+    todo_uid = fields.Str(required=True, error_messages={"required": "todo_uid is required"})
+
+    @validates_schema
+    def validate_at_least_one(self, data, **kwargs):
+        if not any(field in data for field in ("task", "description", "status")):
+            raise ValidationError("At least one field (task, description, or status) must be provided.")
+
+class ToDoBulkDeleteSchema(ma.Schema):
+    class Meta:
+        unknown = EXCLUDE
+
+    todo_uids = fields.List(fields.Str(), required=True, error_messages={"required": "todo_uids is required"})
@@ -1,6 +1,7 @@
 import re
 from extensions import ma
-from marshmallow import fields, validate, ValidationError, EXCLUDE, validates
+from marshmallow import fields, validate, ValidationError, EXCLUDE, validates, pre_load
+from services.number_plan import number_plan, normalize_phone_number
 
 class UserSchema(ma.Schema):
     class Meta:
@@ -42,6 +43,12 @@ class UserSchema(ma.Schema):
     ]
 )
     
+    @pre_load
+    def normalize_mobile_number(self, data, **kwargs):
+        if isinstance(data, dict) and isinstance(data.get("mobile_number"), str):
+            data = dict(data, mobile_number=normalize_phone_number(data["mobile_number"]))
+        return data
+
     @validates("mobile_number")
     def validate_mobile_number(self, value, **kwargs):
         if not value.startswith("+"):
@@ -49,6 +56,8 @@ class UserSchema(ma.Schema):
         pattern = r'^\+\d{10,15}$'
         if not re.fullmatch(pattern, value):
             raise ValidationError("Invalid mobile number format. Must be in E.164 format, e.g., +919876543210")
+        if number_plan.parse(value) is None:
+            raise ValidationError("Mobile number is not a possible number for its country code")
 
         
 
@@ -0,0 +1,146 @@
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Shared threads used to enforce hard per-call deadlines
+_call_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="breaker-call")
+
+
+class ServiceUnavailableError(Exception):
+    """
+    Raised when an external service cannot be used right now; callers should answer 503.
+    """
+
+
+class CircuitOpenError(ServiceUnavailableError):
+    """
+    Raised without calling the service while the circuit is open.
+    retry_after is the number of seconds until the breaker lets a probe through.
+    """
+
+    def __init__(self, message, retry_after=0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CallTimeoutError(ServiceUnavailableError):
+    """
+    Raised when a guarded call does not finish within its timeout.
+    """
+
+
+class CircuitBreaker:
+    """
+    Fails fast after consecutive failures of an external call.
+    Opens after failure_threshold failures, then after reset_timeout lets a single probe through
+    (half-open); the probe's outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30, timeout=None, is_failure=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.timeout = timeout
+        self.is_failure = is_failure or (lambda error: True)
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.calls = 0
+        self.rejected = 0
+        self._probing = False
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def configure(self, failure_threshold=None, reset_timeout=None, timeout=None):
+        if failure_threshold is not None:
+            self.failure_threshold = failure_threshold
+        if reset_timeout is not None:
+            self.reset_timeout = reset_timeout
+        if timeout is not None:
+            self.timeout = timeout
+        self.reset()
+
+    def add_listener(self, callback):
+        """
+        Registers a metrics hook called as callback(name, old_state, new_state) on every state change.
+        """
+        self._listeners.append(callback)
+
+    def call(self, func, *args, **kwargs):
+        """
+        Runs func through the breaker, enforcing the per-call timeout.
+        """
+        self._before_call()
+        try:
+            if self.timeout:
+                future = _call_executor.submit(func, *args, **kwargs)
+                try:
+                    result = future.result(timeout=self.timeout)
+                except FutureTimeoutError:
+                    future.cancel()
+                    raise CallTimeoutError(f"{self.name} call timed out after {self.timeout} s")
+            else:
+                result = func(*args, **kwargs)
+        except Exception as e:
+            self._after_call(failed=isinstance(e, CallTimeoutError) or self.is_failure(e))
+            raise
+        self._after_call(failed=False)
+        return result
+
+    def _before_call(self):
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self._set_state(HALF_OPEN)
+            if self.state == OPEN or (self.state == HALF_OPEN and self._probing):
+                self.rejected += 1
+                retry_after = 0
+                if self.state == OPEN:
+                    retry_after = max(self.reset_timeout - (time.monotonic() - self.opened_at), 0)
+                raise CircuitOpenError(f"{self.name} circuit is open", retry_after=retry_after)
+            if self.state == HALF_OPEN:
+                self._probing = True
+            self.calls += 1
+
+    def _after_call(self, failed):
+        with self._lock:
+            self._probing = False
+            if not failed:
+                self.failures = 0
+                if self.state != CLOSED:
+                    self._set_state(CLOSED)
+                return
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                if self.state != OPEN:
+                    self._set_state(OPEN)
+
+    def _set_state(self, new_state):
+        old_state, self.state = self.state, new_state
+        logging.warning(f"Circuit {self.name} changed from {old_state} to {new_state}")
+        for callback in self._listeners:
+            try:
+                callback(self.name, old_state, new_state)
+            except Exception as e:
+                logging.error(f"Circuit {self.name} listener failed: {str(e)}")
+
+    def reset(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "calls": self.calls,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,168 @@
+import time
+import atexit
+import logging
+import threading
+import bcrypt
+from types import SimpleNamespace
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from flask_bcrypt import Bcrypt
+
+BCRYPT_SETTINGS = ("BCRYPT_LOG_ROUNDS", "BCRYPT_HASH_PREFIX", "BCRYPT_HANDLE_LONG_PASSWORDS")
+
+
+class HashingBusyError(Exception):
+    """
+    Raised when the hashing service is saturated and the request should be rejected with 503.
+    """
+
+
+def _bcrypt_from_settings(settings):
+    hasher = Bcrypt()
+    hasher.init_app(SimpleNamespace(config=settings))
+    return hasher
+
+
+def _generate_hash(settings, password):
+    return _bcrypt_from_settings(settings).generate_password_hash(password).decode("utf-8")
+
+
+def _check_hash(settings, pw_hash, password):
+    return _bcrypt_from_settings(settings).check_password_hash(pw_hash, password)
+
+
+def hash_cost(pw_hash):
+    """
+    Returns the cost factor encoded in a bcrypt hash such as $2b$12$..., or None if it cannot be read.
+    """
+    try:
+        return int(pw_hash.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def calibrate_bcrypt_cost(target_ms, min_rounds=10, max_rounds=16):
+    """
+    Picks the largest bcrypt cost whose hashing time stays within target_ms on this host.
+    Never goes below min_rounds. Returns (rounds, measured milliseconds).
+    """
+    if not 4 <= min_rounds <= max_rounds <= 31:
+        raise ValueError(f"bcrypt rounds must satisfy 4 <= min ({min_rounds}) <= max ({max_rounds}) <= 31")
+    chosen, chosen_ms = min_rounds, None
+    for rounds in range(min_rounds, max_rounds + 1):
+        started = time.perf_counter()
+        bcrypt.hashpw(b"calibration-password", bcrypt.gensalt(rounds))
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if rounds > min_rounds and elapsed_ms > target_ms:
+            break
+        chosen, chosen_ms = rounds, elapsed_ms
+        # Each extra round doubles the work, so stop before a round that would clearly overshoot
+        if elapsed_ms * 2 > target_ms:
+            break
+    return chosen, chosen_ms
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification in a bounded process pool so slow hashes do not hold request threads' GIL.
+    With HASH_POOL_WORKERS set to 0 hashing runs inline, still subject to the in-flight limit
+    (HASH_QUEUE_LIMIT, 0 for unlimited).
+    """
+
+    def __init__(self, app=None):
+        self.workers = 0
+        self.max_in_flight = 16
+        self.timeout = 10
+        self.settings = {}
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._slots_lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+        atexit.register(self.shutdown)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.shutdown()
+        self.workers = app.config.get("HASH_POOL_WORKERS", self.workers)
+        self.max_in_flight = app.config.get("HASH_QUEUE_LIMIT", self.max_in_flight)
+        self.timeout = app.config.get("HASH_TIMEOUT_SECONDS", self.timeout)
+        self.settings = {key: app.config[key] for key in BCRYPT_SETTINGS if key in app.config}
+        self.rejected = 0
+        app.extensions["password_hasher"] = self
+
+    @property
+    def rounds(self):
+        return self.settings.get("BCRYPT_LOG_ROUNDS", 12)
+
+    def needs_rehash(self, pw_hash):
+        """
+        Returns True if a stored hash was made with a different cost than the current one.
+        Every process reads the same pinned cost at boot, so hashes only move when that cost is changed.
+        """
+        return hash_cost(pw_hash) != self.rounds
+
+    def generate_password_hash(self, password):
+        """
+        Returns the bcrypt hash of password as a string.
+        """
+        return self._run(_generate_hash, self.settings, password)
+
+    def check_password_hash(self, pw_hash, password):
+        """
+        Returns True if password matches the stored bcrypt hash.
+        """
+        return self._run(_check_hash, self.settings, pw_hash, password)
+
+    def _run(self, func, *args):
+        with self._slots_lock:
+            if 0 < self.max_in_flight <= self.in_flight:
+                self.rejected += 1
+                logging.warning("Password hashing rejected: hashing queue is full")
+                raise HashingBusyError("Password hashing queue is full")
+            self.in_flight += 1
+        if self.workers <= 0:
+            try:
+                return func(*args)
+            finally:
+                self._release_slot()
+
+        try:
+            future = self._get_executor().submit(func, *args)
+        except BaseException:
+            self._release_slot()
+            raise
+        # The slot is held until the hash really finishes (or is cancelled), not until the caller gives up,
+        # so timed-out hashes still running in the pool count against the in-flight limit
+        future.add_done_callback(self._release_slot)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            logging.warning(f"Password hashing timed out after {self.timeout} s")
+            raise HashingBusyError("Password hashing timed out")
+
+    def _release_slot(self, future=None):
+        with self._slots_lock:
+            self.in_flight -= 1
+
+    def _get_executor(self):
+        # Created lazily so each forked server worker gets its own pool
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,55 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional speedup, the stdlib encoder is used without it
+    orjson = None
+
+COMPACT_SEPARATORS = (",", ":")
+
+# Exact types orjson writes the same way as the stdlib encoder; floats are not among them
+# (orjson writes 1e16, 1e-7 and NaN as 1e16, 1e-7 and null where json writes 1e+16, 1e-07 and NaN)
+_CONTAINER_TYPES = (dict, list, tuple)
+_SCALAR_TYPES = frozenset((str, int, bool, type(None)))
+
+
+def _is_plain(obj):
+    """
+    Returns True if obj is built only from dicts, lists, tuples, str, int, bool and None.
+    """
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        cls = value.__class__
+        if cls is dict:
+            stack.extend(value.values())
+        elif cls is list or cls is tuple:
+            stack.extend(value)
+        elif cls not in _SCALAR_TYPES:
+            return False
+    return True
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that encodes compact responses with orjson when it is installed.
+    Only payloads made of str/int/bool/None/list/dict go through orjson, and only output that matches
+    the default provider byte for byte is kept: keys are sorted, and non-ASCII text or DEL (which Flask
+    escapes) falls back to the stdlib encoder. Floats, dates and any other type always use the stdlib
+    encoder, as do values orjson rejects such as non-string keys or integers wider than 64 bits.
+    """
+
+    orjson_options = orjson.OPT_SORT_KEYS if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        if (
+            orjson is not None and kwargs == {"separators": COMPACT_SEPARATORS}
+            and self.sort_keys and self.ensure_ascii and _is_plain(obj)
+        ):
+            try:
+                encoded = orjson.dumps(obj, option=self.orjson_options)
+            except orjson.JSONEncodeError:
+                encoded = None
+            if encoded is not None and encoded.isascii() and b"\x7f" not in encoded:
+                return encoded.decode("ascii")
+        return super().dumps(obj, **kwargs)
@@ -0,0 +1,96 @@
+import os
+import re
+import csv
+import logging
+import threading
+
+DEFAULT_NUMBER_PLAN_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "number_plan.csv")
+E164_PATTERN = re.compile(r"\+[1-9]\d{6,14}")
+# NANP national numbers: area code and exchange start with 2-9 and are not N11 service codes;
+# N9X area codes are reserved for expansion
+NANP_PATTERN = re.compile(r"[2-9](?!11)[0-8]\d[2-9](?!11)\d{6}")
+
+
+def normalize_phone_number(phone_number):
+    """
+    Strips formatting characters and turns a 00 international prefix into +,
+    so equivalent spellings of a number compare equal.
+    """
+    number = re.sub(r"[\s\-().]", "", phone_number or "")
+    if number.startswith("00"):
+        number = "+" + number[2:]
+    return number
+
+
+class NumberPlan:
+    """
+    Offline E.164 validator backed by a compact country-code/length table, loaded once at startup.
+    Country calling codes are prefix-free, so the first 1-3 digit code found in the table decides
+    the allowed national number length. Numbers with codes missing from the table are left to Lookup.
+    Codes shared by several regions (1 for the NANP, 7 for Russia and Kazakhstan) have an empty
+    region: the code alone cannot tell the country, so those numbers are never trusted and Lookup
+    reports it. NANP numbers must also have a possible area code and exchange.
+    """
+
+    def __init__(self, app=None):
+        self.path = DEFAULT_NUMBER_PLAN_PATH
+        self.codes = {}
+        self.trusted_regions = set()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.path = app.config.get("NUMBER_PLAN_PATH") or DEFAULT_NUMBER_PLAN_PATH
+        self.trusted_regions = {
+            region.strip().upper()
+            for region in app.config.get("PHONE_LOOKUP_SKIP_REGIONS", "").split(",")
+            if region.strip()
+        }
+        self.load()
+        app.extensions["number_plan"] = self
+
+    def load(self):
+        codes = {}
+        with open(self.path, newline="") as plan_file:
+            for row in csv.DictReader(plan_file):
+                codes[row["calling_code"]] = (row["region"] or None, int(row["min_length"]), int(row["max_length"]))
+        with self._lock:
+            self.codes = codes
+        logging.info(f"Loaded number plan for {len(codes)} country codes from {self.path}")
+
+    def parse(self, phone_number):
+        """
+        Normalizes a number and checks it against the plan.
+        Returns {"number", "country_code", "calling_code"} for a possible number
+        (country_code is None if the calling code is not in the table), or None if the number is impossible.
+        """
+        if not self.codes:
+            self.load()
+
+        number = normalize_phone_number(phone_number)
+        if not E164_PATTERN.fullmatch(number):
+            return None
+
+        digits = number[1:]
+        for code_length in (1, 2, 3):
+            entry = self.codes.get(digits[:code_length])
+            if entry is None:
+                continue
+            region, min_length, max_length = entry
+            if not min_length <= len(digits) - code_length <= max_length:
+                return None
+            if digits[:code_length] == "1" and not NANP_PATTERN.fullmatch(digits[1:]):
+                return None
+            return {"number": number, "country_code": region, "calling_code": digits[:code_length]}
+
+        return {"number": number, "country_code": None, "calling_code": None}
+
+    def is_trusted(self, parsed):
+        """
+        Returns True if numbers from this region may skip the Lookup API.
+        """
+        return parsed["country_code"] is not None and parsed["country_code"] in self.trusted_regions
+
+
+number_plan = NumberPlan()
@@ -0,0 +1,63 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from services.ttl_cache import TTLCache
+from sql_files.phone_sql import get_phone_lookup, save_phone_lookup
+
+
+class PhoneLookupCache(TTLCache):
+    """
+    Cache of Twilio Lookup results keyed by E.164 number: an in-process LRU in front of the
+    phone_lookups table, so results survive restarts and are shared across workers.
+    Invalid numbers are cached as well, for PHONE_LOOKUP_NEGATIVE_TTL_SECONDS.
+    """
+
+    def __init__(self, app=None, max_size=10000, ttl=2592000, negative_ttl=86400):
+        super().__init__(max_size, ttl)
+        self.negative_ttl = negative_ttl
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_size = app.config.get("PHONE_LOOKUP_CACHE_SIZE", self.max_size)
+        self.ttl = app.config.get("PHONE_LOOKUP_TTL_SECONDS", self.ttl)
+        self.negative_ttl = app.config.get("PHONE_LOOKUP_NEGATIVE_TTL_SECONDS", self.negative_ttl)
+        self.clear()
+        app.extensions["phone_lookup_cache"] = self
+
+    def get(self, phone_number):
+        """
+        Returns the cached result dict (with a "valid" flag) for a number, or None if it has to be looked up.
+        """
+        result = super().get(phone_number)
+        if result is not None:
+            return result
+
+        record = get_phone_lookup(phone_number)
+        if record is None:
+            return None
+        result = {"valid": record.valid}
+        if record.valid:
+            result.update(number=record.normalized_number, country_code=record.country_code)
+        super().set(phone_number, result, expires_at=record.expires_at.replace(tzinfo=timezone.utc).timestamp())
+        return result
+
+    def put(self, phone_number, result):
+        """
+        Stores a Lookup result in memory and in the database.
+        """
+        ttl = self.ttl if result["valid"] else self.negative_ttl
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl)
+        super().set(phone_number, result, expires_at=expires_at.timestamp())
+        try:
+            save_phone_lookup(
+                phone_number,
+                result["valid"],
+                result.get("number"),
+                result.get("country_code"),
+                expires_at
+            )
+        except Exception as e:
+            logging.error(f"Failed to persist phone lookup for {phone_number}: {str(e)}")
+
+
+phone_lookup_cache = PhoneLookupCache()
@@ -0,0 +1,191 @@
+import math
+import time
+import sqlite3
+import logging
+import threading
+from functools import wraps
+from collections import namedtuple
+from flask import current_app, jsonify, request
+
+RateLimitResult = namedtuple("RateLimitResult", ["allowed", "remaining", "retry_after"])
+
+
+def sliding_window_check(previous, current, limit, window, elapsed):
+    """
+    Sliding-window counter: the previous fixed window's count is weighted by how much of it still
+    overlaps the sliding window. Returns (allowed, remaining, retry_after seconds).
+    """
+    estimate = previous * (1 - elapsed / window) + current
+    if estimate + 1 <= limit:
+        return True, int(limit - estimate - 1), 0
+
+    if current + 1 <= limit and previous:
+        # Wait until enough of the previous window has slid out
+        wait = (1 - (limit - current - 1) / previous) * window - elapsed
+    else:
+        # Wait into the next window, where this window's count becomes the weighted one
+        # (with a limit below 1 nothing is ever counted, so only the rest of this window)
+        wait = window - elapsed
+        if current:
+            wait += max(0.0, 1 - (limit - 1) / current) * window
+    return False, 0, max(1, math.ceil(wait))
+
+
+class MemoryRateLimitStore:
+    """
+    Per-process store holding (window start, previous count, current count) per key under a lock.
+    """
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, window, now):
+        window_start = int(now // window * window)
+        with self._lock:
+            started, previous, current = self._counters.get(key, (window_start, 0, 0))
+            if started != window_start:
+                previous = current if window_start - started == window else 0
+                current = 0
+            allowed, remaining, retry_after = sliding_window_check(previous, current, limit, window, now - window_start)
+            if allowed:
+                current += 1
+            if key not in self._counters and len(self._counters) >= self.max_keys:
+                self._drop_stale(now, window)
+            self._counters[key] = (window_start, previous, current)
+        return RateLimitResult(allowed, remaining, retry_after)
+
+    def _drop_stale(self, now, window):
+        cutoff = now - 2 * window
+        for key in [key for key, (started, _, _) in self._counters.items() if started < cutoff]:
+            del self._counters[key]
+
+    def reset(self, key=None):
+        with self._lock:
+            if key is None:
+                self._counters.clear()
+            else:
+                self._counters.pop(key, None)
+
+
+class SqliteRateLimitStore:
+    """
+    Store backed by a local SQLite file, so every worker process on the host shares the same counters.
+    Each hit runs in an IMMEDIATE transaction, which serializes concurrent writers across processes.
+    """
+
+    def __init__(self, path, timeout=5.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                "key TEXT NOT NULL, window_start INTEGER NOT NULL, count INTEGER NOT NULL, "
+                "PRIMARY KEY (key, window_start))"
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key, limit, window, now):
+        window_start = int(now // window * window)
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            counts = dict(conn.execute(
+                "SELECT window_start, count FROM rate_limits WHERE key = ? AND window_start >= ?",
+                (key, window_start - window)
+            ).fetchall())
+            previous, current = counts.get(window_start - window, 0), counts.get(window_start, 0)
+            allowed, remaining, retry_after = sliding_window_check(previous, current, limit, window, now - window_start)
+            if allowed:
+                conn.execute(
+                    "INSERT INTO rate_limits (key, window_start, count) VALUES (?, ?, 1) "
+                    "ON CONFLICT (key, window_start) DO UPDATE SET count = count + 1",
+                    (key, window_start)
+                )
+            conn.execute("DELETE FROM rate_limits WHERE key = ? AND window_start < ?", (key, window_start - window))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return RateLimitResult(allowed, remaining, retry_after)
+
+    def reset(self, key=None):
+        conn = self._connect()
+        if key is None:
+            conn.execute("DELETE FROM rate_limits")
+        else:
+            conn.execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+
+
+class RateLimiter:
+    """
+    Sliding-window rate limiter. Counters live in process memory by default, or in a shared
+    SQLite file (RATE_LIMIT_STORAGE = "sqlite") so limits hold across gunicorn workers.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.store = MemoryRateLimitStore()
+        self.rejected = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get("RATE_LIMIT_ENABLED", True)
+        storage = app.config.get("RATE_LIMIT_STORAGE", "memory")
+        if storage == "sqlite":
+            self.store = SqliteRateLimitStore(app.config.get("RATE_LIMIT_SQLITE_PATH", "ratelimit.db"))
+        elif storage == "memory":
+            self.store = MemoryRateLimitStore(app.config.get("RATE_LIMIT_MAX_KEYS", 100000))
+        else:
+            raise ValueError(f"Unknown RATE_LIMIT_STORAGE: {storage}")
+        self.rejected = 0
+        logging.info(f"Rate limiter using {storage} storage")
+        app.extensions["rate_limiter"] = self
+
+    def hit(self, key, limit, window):
+        """
+        Counts one request for key against limit requests per window seconds.
+        Returns RateLimitResult(allowed, remaining, retry_after); rejected requests are not counted.
+        """
+        if not self.enabled:
+            return RateLimitResult(True, limit, 0)
+        result = self.store.hit(key, limit, window, time.time())
+        if not result.allowed:
+            self.rejected += 1
+            logging.warning(f"Rate limit exceeded for {key}")
+        return result
+
+    def reset(self, key=None):
+        self.store.reset(key)
+
+    def limit(self, limit, window, key_func=None, scope=None):
+        """
+        Decorator that answers 429 with Retry-After once a client goes over limit requests per window seconds.
+        limit and window may be numbers or config keys. Clients are keyed by key_func(),
+        or by remote address if it is not given.
+        """
+        def decorator(f):
+            @wraps(f)
+            def decorated(*args, **kwargs):
+                max_requests = current_app.config[limit] if isinstance(limit, str) else limit
+                seconds = current_app.config[window] if isinstance(window, str) else window
+                client = key_func() if key_func else request.remote_addr
+                result = self.hit(f"{scope or f.__name__}:{client}", max_requests, seconds)
+                if not result.allowed:
+                    response = jsonify({"error": "Too many requests. Please try again later."})
+                    response.headers["Retry-After"] = str(result.retry_after)
+                    return response, 429
+                return f(*args, **kwargs)
+            return decorated
+        return decorator
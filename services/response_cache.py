@@ -0,0 +1,228 @@
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+
+
+class ResponseCacheBackend:
+    """
+    Shared second-level store for serialized responses, so several workers can reuse each other's renders.
+    Entries are keyed by namespace (the user uid) and key; they are never updated in place.
+    """
+
+    def get(self, namespace, key):
+        """
+        Returns the cached body or None.
+        """
+        raise NotImplementedError
+
+    def set(self, namespace, key, body):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class SqliteResponseCacheBackend(ResponseCacheBackend):
+    """
+    Backend stored in a local SQLite file shared by every worker process on the host.
+    The file is held to max_bytes of bodies by evicting the oldest entries every prune_every writes.
+    """
+
+    def __init__(self, path, timeout=5.0, max_bytes=256 * 1024 * 1024, prune_every=100):
+        self.path = path
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.prune_every = prune_every
+        self._writes = 0
+        self._local = threading.local()
+        conn = self._connect()
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(response_cache)")}
+        if columns and "size" not in columns:
+            # Files written before sizes were tracked hold nothing worth keeping
+            conn.execute("DROP TABLE response_cache")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, body BLOB NOT NULL, stored_at REAL NOT NULL, "
+            "size INTEGER NOT NULL, PRIMARY KEY (namespace, key))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_response_cache_stored_at ON response_cache (stored_at)")
+        self.prune()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, namespace, key):
+        row = self._connect().execute(
+            "SELECT body FROM response_cache WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def set(self, namespace, key, body):
+        self._connect().execute(
+            "INSERT OR REPLACE INTO response_cache (namespace, key, body, stored_at, size) VALUES (?, ?, ?, ?, ?)",
+            (namespace, key, body, time.time(), len(body) + len(namespace) + len(key))
+        )
+        self._writes += 1
+        if self._writes % self.prune_every == 0:
+            self.prune()
+
+    def prune(self):
+        """
+        Deletes the oldest entries beyond max_bytes. Returns the rows deleted.
+        """
+        return self._connect().execute(
+            "DELETE FROM response_cache WHERE rowid IN ("
+            "SELECT rowid FROM (SELECT rowid, sum(size) OVER (ORDER BY stored_at DESC, rowid DESC) AS kept "
+            "FROM response_cache) WHERE kept > ?)",
+            (self.max_bytes,)
+        ).rowcount
+
+    def clear(self):
+        self._connect().execute("DELETE FROM response_cache")
+
+
+class ResponseCache:
+    """
+    Two-level cache of serialized response bodies: an in-process LRU bounded by total bytes,
+    in front of an optional shared backend.
+    Callers put the data's version in the key, so an entry never goes stale: a write makes the next
+    request use a new key, and entries for old versions are evicted as the byte limits require.
+    """
+
+    def __init__(self, app=None, max_bytes=32 * 1024 * 1024):
+        self.enabled = True
+        self.max_bytes = max_bytes
+        self.backend = None
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._reset_counters()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get("RESPONSE_CACHE_ENABLED", True)
+        self.max_bytes = app.config.get("RESPONSE_CACHE_MAX_BYTES", self.max_bytes)
+        backend = app.config.get("RESPONSE_CACHE_BACKEND", "none")
+        if backend == "sqlite":
+            self.backend = SqliteResponseCacheBackend(
+                app.config.get("RESPONSE_CACHE_SQLITE_PATH", "response_cache.db"),
+                max_bytes=app.config.get("RESPONSE_CACHE_SQLITE_MAX_BYTES", 256 * 1024 * 1024)
+            )
+        elif backend == "none":
+            self.backend = None
+        else:
+            raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {backend}")
+        # Only the local level is reset; other workers may still be using the shared backend
+        self._clear_local()
+        app.extensions["response_cache"] = self
+
+    def _reset_counters(self):
+        self.hits = 0
+        self.misses = 0
+        self.backend_hits = 0
+        self.evictions = 0
+
+    def _get_local(self, namespace, key):
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                return None
+            self._entries.move_to_end((namespace, key))
+            return entry[0]
+
+    def _store_local(self, namespace, key, body):
+        size = len(body) + len(namespace) + len(key)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop((namespace, key), None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[(namespace, key)] = (body, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def get(self, namespace, key):
+        """
+        Returns the body from the local LRU or the shared backend, or None on a miss.
+        """
+        body = self._get_local(namespace, key)
+        if body is None and self.backend is not None:
+            try:
+                body = self.backend.get(namespace, key)
+            except sqlite3.Error as e:
+                logging.error(f"Response cache backend read failed: {str(e)}")
+            if body is not None:
+                self.backend_hits += 1
+                self._store_local(namespace, key, body)
+        return body
+
+    def set(self, namespace, key, body):
+        self._store_local(namespace, key, body)
+        if self.backend is not None:
+            try:
+                self.backend.set(namespace, key, body)
+            except sqlite3.Error as e:
+                logging.error(f"Response cache backend write failed: {str(e)}")
+
+    def get_or_render(self, namespace, key, render):
+        """
+        Returns (body, error): the cached body, or on a miss the result of render(), which returns
+        (body, error). Only bodies without an error are cached.
+        """
+        if not self.enabled:
+            return render()
+
+        body = self.get(namespace, key)
+        if body is not None:
+            self.hits += 1
+            return body, None
+
+        self.misses += 1
+        body, error = render()
+        if error is None:
+            self.set(namespace, key, body)
+        return body, error
+
+    def _clear_local(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._reset_counters()
+
+    def clear(self):
+        """
+        Drops every cached response, locally and in the shared backend.
+        """
+        self._clear_local()
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self):
+        """
+        Returns hit/miss counters and memory use of the local LRU.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "backend_hits": self.backend_hits,
+                "evictions": self.evictions,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            }
@@ -0,0 +1,56 @@
+import logging
+import threading
+
+
+class PeriodicJob:
+    """
+    Runs a function inside the app context on a fixed interval from a daemon thread.
+    """
+
+    def __init__(self, app, interval, func, name=None):
+        self.app = app
+        self.interval = interval
+        self.func = func
+        self.name = name or getattr(func, "__name__", "periodic-job")
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None or self.interval <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        logging.info(f"Started periodic job {self.name} every {self.interval} s")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                with self.app.app_context():
+                    self.func()
+            except Exception as e:
+                logging.error(f"Periodic job {self.name} failed: {str(e)}")
+
+
+def start_on_first_request(app, start):
+    """
+    Calls start() once, before the first request the app handles.
+    CLI commands build the app with create_app() too but never serve requests, so they start nothing.
+    """
+    lock = threading.Lock()
+    started = False
+
+    @app.before_request
+    def start_once():
+        nonlocal started
+        if started:
+            return
+        with lock:
+            if not started:
+                started = True
+                start()
@@ -0,0 +1,153 @@
+import time
+import logging
+import threading
+import statistics
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor, wait
+from twilio.base.exceptions import TwilioRestException
+from twilio_client import is_twilio_outage
+from services.circuit_breaker import CircuitOpenError
+from services.sms_providers import create_sms_provider
+from sql_files.sms_sql import (
+    claim_due_sms,
+    release_stale_sms_claims,
+    mark_sms_sent,
+    mark_sms_retry,
+    mark_sms_failed,
+    count_pending_sms,
+)
+
+
+class SmsDispatcher:
+    """
+    Sends messages from the SMS outbox on background threads, retrying failures with exponential backoff.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.provider = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._executor = None
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=1000)
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.stop()
+        self.app = app
+        self.provider = create_sms_provider(app)
+        self.threads = app.config.get("SMS_DISPATCHER_THREADS", 4)
+        self.poll_interval = app.config.get("SMS_POLL_INTERVAL_SECONDS", 1.0)
+        self.batch_size = app.config.get("SMS_BATCH_SIZE", 20)
+        self.max_attempts = app.config.get("SMS_MAX_ATTEMPTS", 5)
+        self.retry_base = app.config.get("SMS_RETRY_BASE_SECONDS", 2)
+        self.claim_timeout = app.config.get("SMS_CLAIM_TIMEOUT_SECONDS", 60)
+        with self._lock:
+            self._latencies.clear()
+            self.sent = self.retried = self.failed = 0
+        app.extensions["sms_dispatcher"] = self
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="sms-send")
+        self._thread = threading.Thread(target=self._poll, name="sms-dispatcher", daemon=True)
+        self._thread.start()
+        logging.info(f"SMS dispatcher started with {self.threads} threads")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _poll(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                with self.app.app_context():
+                    release_stale_sms_claims(self.claim_timeout)
+                    self.dispatch_due()
+            except Exception as e:
+                logging.error(f"SMS dispatcher poll failed: {str(e)}")
+
+    def dispatch_due(self):
+        """
+        Claims due messages and sends them, on the thread pool when running. Returns the number processed.
+        """
+        messages = claim_due_sms(self.batch_size)
+        if self._executor is None:
+            for message in messages:
+                self._send(message)
+        else:
+            wait([self._executor.submit(self._send_in_context, message) for message in messages])
+        return len(messages)
+
+    def _send_in_context(self, message):
+        with self.app.app_context():
+            self._send(message)
+
+    def _send(self, message):
+        message_id, to_number, body, attempts = message
+        started = time.perf_counter()
+        try:
+            provider_message_id = self.provider.send(to_number, body)
+        except CircuitOpenError as e:
+            # Nothing was sent, so this is not an attempt; wait until the breaker lets a probe through
+            delay = max(e.retry_after, self.poll_interval)
+            mark_sms_retry(message_id, attempts, datetime.now(timezone.utc) + timedelta(seconds=delay), str(e))
+            logging.warning(f"SMS {message_id} to {to_number} deferred for {delay:.1f} s: {str(e)}")
+            return
+        except Exception as e:
+            attempts += 1
+            if isinstance(e, TwilioRestException) and not is_twilio_outage(e):
+                # Twilio rejected the message itself (e.g. an invalid number); retrying cannot help
+                mark_sms_failed(message_id, attempts, str(e))
+                with self._lock:
+                    self.failed += 1
+                logging.error(f"SMS {message_id} to {to_number} rejected by Twilio: {str(e)}")
+            elif attempts >= self.max_attempts:
+                mark_sms_failed(message_id, attempts, str(e))
+                with self._lock:
+                    self.failed += 1
+                logging.error(f"SMS {message_id} to {to_number} failed permanently after {attempts} attempts: {str(e)}")
+            else:
+                delay = self.retry_base * (2 ** (attempts - 1))
+                mark_sms_retry(message_id, attempts, datetime.now(timezone.utc) + timedelta(seconds=delay), str(e))
+                with self._lock:
+                    self.retried += 1
+                logging.warning(f"SMS {message_id} to {to_number} failed (attempt {attempts}), retrying in {delay} s: {str(e)}")
+            return
+
+        elapsed = time.perf_counter() - started
+        mark_sms_sent(message_id, provider_message_id)
+        with self._lock:
+            self.sent += 1
+            self._latencies.append(elapsed)
+        logging.info(f"SMS {message_id} sent to {to_number} in {elapsed * 1000:.1f} ms. Message SID: {provider_message_id}")
+
+    def stats(self):
+        """
+        Returns queue depth and send counters/latency. Needs an app context for the queue depth.
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            counters = {"sent": self.sent, "retried": self.retried, "failed": self.failed}
+        return dict(
+            counters,
+            queue_depth=count_pending_sms(),
+            latency_p50_ms=statistics.median(latencies) * 1000 if latencies else None,
+            latency_p95_ms=latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else None,
+        )
+
+
+sms_dispatcher = SmsDispatcher()
@@ -0,0 +1,59 @@
+import uuid
+import threading
+from twilio_client import get_twilio_client, sms_breaker
+
+
+class SmsProvider:
+    """
+    Interface for SMS backends used by the outbox dispatcher.
+    send() returns the provider's message id and raises on failure.
+    """
+
+    def send(self, to_number, body):
+        raise NotImplementedError
+
+
+class TwilioSmsProvider(SmsProvider):
+    def __init__(self, from_number):
+        self.from_number = from_number
+
+    def send(self, to_number, body):
+        message = sms_breaker.call(
+            get_twilio_client().messages.create,
+            body=body,
+            from_=self.from_number,
+            to=to_number
+        )
+        return message.sid
+
+
+class FakeSmsProvider(SmsProvider):
+    """
+    Offline provider that records messages in memory. It can be told to fail the next few sends.
+    """
+
+    def __init__(self):
+        self.sent = []
+        self.fail_next = 0
+        self._lock = threading.Lock()
+
+    def send(self, to_number, body):
+        with self._lock:
+            if self.fail_next > 0:
+                self.fail_next -= 1
+                raise RuntimeError("Fake SMS provider failure")
+            message_id = f"FAKE{uuid.uuid4().hex[:28]}"
+            self.sent.append({"to": to_number, "body": body, "message_id": message_id})
+            return message_id
+
+
+def create_sms_provider(app):
+    """
+    Builds the SMS provider named by the SMS_PROVIDER config value.
+    """
+    name = app.config.get("SMS_PROVIDER", "twilio")
+    if name == "twilio":
+        return TwilioSmsProvider(app.config.get("TWILIO_PHONE_NUMBER"))
+    if name == "fake":
+        return FakeSmsProvider()
+    raise ValueError(f"Unknown SMS_PROVIDER: {name}")
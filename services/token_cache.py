@@ -0,0 +1,68 @@
+from services.ttl_cache import TTLCache
+from utils import hash_token
+
+
+class TokenCache(TTLCache):
+    """
+    Bounded LRU + TTL cache of access tokens that have already been verified against the database.
+    Entries are keyed by token digest and hold (user_uid, device_uuid, expiry).
+    """
+
+    def __init__(self, app=None, max_size=10000, ttl=60):
+        super().__init__(max_size, ttl)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Reads the cache size and TTL from the app config and starts with an empty cache.
+        """
+        self.max_size = app.config.get("TOKEN_CACHE_SIZE", self.max_size)
+        self.ttl = app.config.get("TOKEN_CACHE_TTL", self.ttl)
+        self.clear()
+        app.extensions["token_cache"] = self
+
+    def get(self, token):
+        """
+        Returns the cached (user_uid, device_uuid, expiry) for a token, or None on a miss.
+        """
+        return super().get(hash_token(token))
+
+    def set(self, token, user_uid, device_uuid, expiry):
+        """
+        Caches a verified token until its expiry (epoch seconds) or the cache TTL, whichever comes first.
+        """
+        super().set(hash_token(token), (user_uid, device_uuid, expiry), expires_at=expiry)
+
+    def invalidate(self, token):
+        """
+        Drops a token from the cache, e.g. after it was replaced or revoked.
+        """
+        if token:
+            self.delete(hash_token(token))
+
+    def invalidate_user(self, user_uid, device_uuid=None):
+        """
+        Drops every cached token of a user, optionally limited to one device.
+        """
+        self.delete_where(
+            lambda key, entry: entry[0] == user_uid and (device_uuid is None or entry[1] == device_uuid)
+        )
+
+
+class TokenGenerationCache(TTLCache):
+    """
+    Per-user cache of the session generation used by stateless access-token verification.
+    The TTL bounds how long another worker may keep accepting tokens after a revoke.
+    """
+
+    def __init__(self, app=None, max_size=10000, ttl=15):
+        super().__init__(max_size, ttl)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_size = app.config.get("TOKEN_GENERATION_CACHE_SIZE", self.max_size)
+        self.ttl = app.config.get("TOKEN_GENERATION_CACHE_TTL", self.ttl)
+        self.clear()
+        app.extensions["token_generations"] = self
@@ -0,0 +1,31 @@
+from services.ttl_cache import TTLCache
+
+
+class UserExistenceCache(TTLCache):
+    """
+    Per-process cache of user uids known to exist, so authenticated requests do not re-select the user.
+    Entries are dropped when the user row is deleted; the TTL bounds staleness across workers.
+    """
+
+    def __init__(self, app=None, max_size=10000, ttl=300):
+        super().__init__(max_size, ttl)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_size = app.config.get("USER_CACHE_SIZE", self.max_size)
+        self.ttl = app.config.get("USER_CACHE_TTL", self.ttl)
+        self.clear()
+        app.extensions["user_cache"] = self
+
+    def exists(self, user_uid):
+        """
+        Returns True if the user is known to exist, or None if it has to be checked.
+        """
+        return self.get(user_uid)
+
+    def mark_exists(self, user_uid):
+        self.set(user_uid, True)
+
+    def invalidate(self, user_uid):
+        self.delete(user_uid)
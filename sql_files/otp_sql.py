@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta, timezone
-from models import db, UserOTP
+from sqlalchemy import or_, select, update
+from models import db, User, UserOTP
 from flask import current_app
 
 
@@ -20,32 +21,34 @@ def store_otp(user_uid, otp_code, purpose):
     db.session.commit()
 
 
-def get_latest_valid_otp(user_uid, otp_code, purpose):
+def consume_phone_verification_otp(user_uid, otp_code):
     """
-    Gets the latest unused and unexpired OTP for a given user and purpose.
+    Atomically marks a matching unused, unexpired phone verification OTP as used and sets the
+    user's phone_verified flag, in one transaction. The conditional UPDATE lets only one of two
+    concurrent verifications consume the code. Returns the user, or None if no OTP matched.
     """
     now = datetime.now(timezone.utc)
-    return (
-        UserOTP.query
-        .filter_by(user_uid=user_uid, purpose=purpose, otp_code=otp_code, is_used=False)
-        .filter(UserOTP.expires_at > now)
-        .order_by(UserOTP.created_at.desc())
-        .first()
-    )
-
+    consumed = db.session.scalars(
+        update(UserOTP)
+        .filter_by(user_uid=user_uid, purpose='phone_verification', otp_code=otp_code, is_used=False)
+        .where(UserOTP.expires_at > now)
+        .values(is_used=True)
+        .returning(UserOTP.id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if not consumed:
+        db.session.rollback()
+        return None
 
-def mark_otp_as_used(otp_record):
-    """
-    Marks the OTP instance as used.
-    """
-    otp_record.is_used = True
+    user = db.session.scalars(
+        update(User)
+        .where(User.uid == user_uid)
+        .values(phone_verified=True)
+        .returning(User),
+        execution_options={"populate_existing": True}
+    ).one_or_none()
     db.session.commit()
-
-
-def count_otp_requests_recent(user_uid, purpose, interval_minutes=15):
-    now = datetime.now(timezone.utc)
-    interval_start = now - timedelta(minutes=interval_minutes)
-    return UserOTP.query.filter_by(user_uid=user_uid, purpose=purpose).filter(UserOTP.created_at >= interval_start).count()
+    return user
 
 
 def get_latest_unexpired_unused_otp(user_uid, purpose):
@@ -57,3 +60,29 @@ def get_latest_unexpired_unused_otp(user_uid, purpose):
         .order_by(UserOTP.created_at.desc())
         .first()
     )
+
+
+def delete_stale_otps_batch(now, created_before, after_id, batch_size):
+    """
+    Deletes up to batch_size OTPs that are used or expired and were created before created_before,
+    scanning by primary key after after_id. Returns (rows deleted, last id scanned), or (0, None) when nothing is left.
+    """
+    stale = (
+        or_(UserOTP.is_used.is_(True), UserOTP.expires_at < now),
+        UserOTP.created_at < created_before,
+    )
+    ids = db.session.scalars(
+        select(UserOTP.id)
+        .where(UserOTP.id > after_id, *stale)
+        .order_by(UserOTP.id)
+        .limit(batch_size)
+    ).all()
+    if not ids:
+        return 0, None
+    deleted = (
+        UserOTP.query
+        .filter(UserOTP.id.between(ids[0], ids[-1]), *stale)
+        .delete(synchronize_session=False)
+    )
+    db.session.commit()
+    return deleted, ids[-1]
@@ -0,0 +1,50 @@
+from datetime import datetime, timezone
+from sqlalchemy import select
+from models import db, PhoneLookup
+
+
+def get_phone_lookup(phone_number):
+    """
+    Retrieves an unexpired cached Lookup result for a phone number.
+    """
+    now = datetime.now(timezone.utc)
+    return db.session.scalar(
+        select(PhoneLookup).where(PhoneLookup.phone_number == phone_number, PhoneLookup.expires_at > now)
+    )
+
+
+def save_phone_lookup(phone_number, valid, normalized_number, country_code, expires_at):
+    """
+    Inserts or replaces the cached Lookup result for a phone number.
+    """
+    lookup = db.session.merge(PhoneLookup(
+        phone_number=phone_number,
+        valid=valid,
+        normalized_number=normalized_number,
+        country_code=country_code,
+        expires_at=expires_at
+    ))
+    db.session.commit()
+    return lookup
+
+
+def delete_expired_phone_lookups_batch(now, after_key, batch_size):
+    """
+    Deletes up to batch_size expired Lookup results, scanning by primary key after after_key.
+    Returns (rows deleted, last key scanned), or (0, None) when nothing is left.
+    """
+    keys = db.session.scalars(
+        select(PhoneLookup.phone_number)
+        .where(PhoneLookup.phone_number > after_key, PhoneLookup.expires_at < now)
+        .order_by(PhoneLookup.phone_number)
+        .limit(batch_size)
+    ).all()
+    if not keys:
+        return 0, None
+    deleted = (
+        PhoneLookup.query
+        .filter(PhoneLookup.phone_number.between(keys[0], keys[-1]), PhoneLookup.expires_at < now)
+        .delete(synchronize_session=False)
+    )
+    db.session.commit()
+    return deleted, keys[-1]
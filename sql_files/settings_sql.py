@@ -0,0 +1,31 @@
+from sqlalchemy.exc import IntegrityError
+from models import db, AppSetting
+
+
+def get_setting(key):
+    """
+    Retrieves a shared setting by key, or None if it was never stored.
+    """
+    return db.session.get(AppSetting, key)
+
+
+def add_setting_if_absent(key, value, updated_at):
+    """
+    Stores a shared setting unless one exists already, and returns the stored row.
+    When several processes race, the first insert wins and the others get its row.
+    """
+    db.session.add(AppSetting(key=key, value=value, updated_at=updated_at))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+    return db.session.get(AppSetting, key, populate_existing=True)
+
+
+def save_setting(key, value, updated_at):
+    """
+    Inserts or replaces a shared setting.
+    """
+    setting = db.session.merge(AppSetting(key=key, value=value, updated_at=updated_at))
+    db.session.commit()
+    return setting
@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, update, func
+from models import db, SmsOutbox
+
+# Bodies can carry OTP codes, so they are not kept once a message is finished
+REDACTED_BODY = "[redacted]"
+
+
+def enqueue_sms(to_number, body, kind):
+    """
+    Adds a message to the SMS outbox for the background dispatcher to send.
+    """
+    message = SmsOutbox(to_number=to_number, body=body, kind=kind, status="pending")
+    db.session.add(message)
+    db.session.commit()
+    return message
+
+
+def release_stale_sms_claims(claim_timeout_seconds):
+    """
+    Puts messages back to pending if a dispatcher claimed them and never finished, e.g. after a crash.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=claim_timeout_seconds)
+    result = db.session.execute(
+        update(SmsOutbox)
+        .where(SmsOutbox.status == "sending", SmsOutbox.claimed_at < cutoff)
+        .values(status="pending", claimed_at=None)
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def claim_due_sms(limit):
+    """
+    Claims up to limit pending messages that are due, marking them as sending.
+    A conditional update makes sure two dispatchers never claim the same message.
+    Returns a list of (id, to_number, body, attempts) tuples.
+    """
+    now = datetime.now(timezone.utc)
+    candidates = db.session.execute(
+        select(SmsOutbox.id, SmsOutbox.to_number, SmsOutbox.body, SmsOutbox.attempts)
+        .where(SmsOutbox.status == "pending", SmsOutbox.next_attempt_at <= now)
+        .order_by(SmsOutbox.next_attempt_at, SmsOutbox.id)
+        .limit(limit)
+    ).all()
+
+    claimed = []
+    for message in candidates:
+        result = db.session.execute(
+            update(SmsOutbox)
+            .where(SmsOutbox.id == message.id, SmsOutbox.status == "pending")
+            .values(status="sending", claimed_at=now)
+        )
+        if result.rowcount:
+            claimed.append(tuple(message))
+    db.session.commit()
+    return claimed
+
+
+def mark_sms_sent(message_id, provider_message_id):
+    """
+    Marks a message as delivered to the provider and redacts its body.
+    """
+    db.session.execute(
+        update(SmsOutbox)
+        .where(SmsOutbox.id == message_id)
+        .values(
+            status="sent", body=REDACTED_BODY, provider_message_id=provider_message_id,
+            sent_at=datetime.now(timezone.utc), claimed_at=None
+        )
+    )
+    db.session.commit()
+
+
+def mark_sms_retry(message_id, attempts, next_attempt_at, error):
+    """
+    Records a failed attempt and schedules the next one.
+    """
+    db.session.execute(
+        update(SmsOutbox)
+        .where(SmsOutbox.id == message_id)
+        .values(status="pending", attempts=attempts, next_attempt_at=next_attempt_at, last_error=error[:500], claimed_at=None)
+    )
+    db.session.commit()
+
+
+def mark_sms_failed(message_id, attempts, error):
+    """
+    Gives up on a message after its last attempt and redacts its body.
+    """
+    db.session.execute(
+        update(SmsOutbox)
+        .where(SmsOutbox.id == message_id)
+        .values(status="failed", body=REDACTED_BODY, attempts=attempts, last_error=error[:500], claimed_at=None)
+    )
+    db.session.commit()
+
+
+def count_pending_sms():
+    """
+    Returns the number of messages waiting to be sent.
+    """
+    return db.session.scalar(
+        select(func.count(SmsOutbox.id)).where(SmsOutbox.status.in_(("pending", "sending")))
+    )
+
+
+def delete_finished_sms_batch(created_before, after_id, batch_size):
+    """
+    Deletes up to batch_size sent or failed messages created before created_before, scanning by primary key
+    after after_id. Returns (rows deleted, last id scanned), or (0, None) when nothing is left.
+    """
+    finished = (SmsOutbox.status.in_(("sent", "failed")), SmsOutbox.created_at < created_before)
+    ids = db.session.scalars(
+        select(SmsOutbox.id)
+        .where(SmsOutbox.id > after_id, *finished)
+        .order_by(SmsOutbox.id)
+        .limit(batch_size)
+    ).all()
+    if not ids:
+        return 0, None
+    deleted = (
+        SmsOutbox.query
+        .filter(SmsOutbox.id.between(ids[0], ids[-1]), *finished)
+        .delete(synchronize_session=False)
+    )
+    db.session.commit()
+    return deleted, ids[-1]
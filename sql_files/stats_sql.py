@@ -0,0 +1,29 @@
+from sqlalchemy import select, delete
+from models import db, CacheStats
+
+
+def save_cache_stats(process, stats, updated_at):
+    """
+    Inserts or replaces the cache stats snapshot (JSON text) of a process.
+    """
+    snapshot = db.session.merge(CacheStats(process=process, stats=stats, updated_at=updated_at))
+    db.session.commit()
+    return snapshot
+
+
+def get_cache_stats(since):
+    """
+    Retrieves the snapshots updated after since, by process.
+    """
+    return db.session.scalars(
+        select(CacheStats).where(CacheStats.updated_at > since).order_by(CacheStats.process)
+    ).all()
+
+
+def delete_cache_stats_before(cutoff):
+    """
+    Deletes the snapshots of processes that stopped publishing before cutoff.
+    """
+    deleted = db.session.execute(delete(CacheStats).where(CacheStats.updated_at < cutoff)).rowcount
+    db.session.commit()
+    return deleted
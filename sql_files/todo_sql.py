@@ -1,59 +1,369 @@
-from models import db, ToDo, User
+import uuid
+from models import db, ToDo, ToDoTombstone, User
 from datetime import datetime, timezone
-from sqlalchemy import func
+from sqlalchemy import Float, Integer, bindparam, delete, func, insert, literal_column, select, text, tuple_, update
+from sqlalchemy.exc import IntegrityError
+
+def _bump_todo_version(user_uid):
+    """
+    Increments the user's todo list version inside the current transaction and returns the new value,
+    or None if the user does not exist; the caller commits.
+    The version doubles as the change sequence stamped on the written todos. Bumping it before the
+    todo write locks the user row first, so concurrent writers get increasing sequences in commit order.
+    """
+    return db.session.scalar(
+        update(User)
+        .where(User.uid == user_uid)
+        .values(todo_version=User.todo_version + 1)
+        .returning(User.todo_version)
+        .execution_options(synchronize_session=False)
+    )
+
+def _uses_fts5():
+    # SQLite keeps the full-text index in the todo_fts table, written here along with todo rows;
+    # Postgres derives its search_vector column itself
+    return db.session.get_bind().dialect.name == "sqlite"
+
+def _fts_user_token(user_uid):
+    # Without hyphens a uuid is one FTS5 token, so narrowing a search to a user is a single-term AND
+    # instead of a five-token phrase match
+    return user_uid.replace("-", "")
+
+def _index_todos(rows):
+    """
+    Adds new todos (dicts with id, task, description and user_uid) to the full-text index.
+    """
+    if rows and _uses_fts5():
+        db.session.execute(
+            text("INSERT INTO todo_fts (rowid, task, description, user_uid) VALUES (:id, :task, :description, :user_uid)"),
+            [
+                {"id": row["id"], "task": row["task"], "description": row["description"], "user_uid": _fts_user_token(row["user_uid"])}
+                for row in rows
+            ]
+        )
+
+def _reindex_todos(rows):
+    """
+    Updates the full-text index for changed todos (dicts with id and optional new task and description).
+    Rows that change neither, such as status-only updates, cost nothing.
+    """
+    rows = [
+        {"id": row["id"], "task": row.get("task"), "description": row.get("description")}
+        for row in rows if row.get("task") is not None or row.get("description") is not None
+    ]
+    if rows and _uses_fts5():
+        db.session.execute(
+            text("UPDATE todo_fts SET task = coalesce(:task, task), description = coalesce(:description, description) WHERE rowid = :id"),
+            rows
+        )
+
+def _unindex_todos(todo_ids):
+    """
+    Removes deleted todos from the full-text index.
+    """
+    if todo_ids and _uses_fts5():
+        db.session.execute(
+            text("DELETE FROM todo_fts WHERE rowid IN :ids").bindparams(bindparam("ids", expanding=True)),
+            {"ids": list(todo_ids)}
+        )
+
+def get_todo_version(user_uid):
+    """
+    Returns the user's todo list version, which changes on every todo write, or None if the user does not exist.
+    """
+    return db.session.scalar(select(User.todo_version).where(User.uid == user_uid))
 
 def insert_todo(task, description, user_uid):
     """
     Creates and inserts a new ToDo item into the database for the specified user.
+    Raises IntegrityError if the user does not exist.
     """
-    todo = ToDo(task=task, description=description, user_uid=user_uid)
+    change_seq = _bump_todo_version(user_uid)
+    todo = ToDo(task=task, description=description, user_uid=user_uid, change_seq=change_seq)
     db.session.add(todo)
+    try:
+        db.session.flush()
+    except IntegrityError:
+        db.session.rollback()
+        raise
+    _index_todos([{"id": todo.id, "task": task, "description": description, "user_uid": user_uid}])
+    # Detach before committing, so reading the new item afterwards does not trigger a refresh SELECT
+    db.session.expunge(todo)
     db.session.commit()
     return todo
 
+def bulk_insert_todos(user_uid, items):
+    """
+    Inserts several ToDo items for the user with one batched INSERT ... RETURNING and a single commit.
+    Returns the new UIDs in input order. Raises IntegrityError if the user does not exist.
+    """
+    now = datetime.now(timezone.utc)
+    try:
+        change_seq = _bump_todo_version(user_uid)
+        rows = [
+            {
+                "uid": str(uuid.uuid4()),
+                "task": item["task"],
+                "description": item.get("description"),
+                "status": "in progress",
+                "created_at": now,
+                "modified_at": now,
+                "user_uid": user_uid,
+                "change_seq": change_seq,
+            }
+            for item in items
+        ]
+        ids = db.session.scalars(insert(ToDo).returning(ToDo.id, sort_by_parameter_order=True), rows).all()
+        _index_todos([dict(row, id=todo_id) for row, todo_id in zip(rows, ids)])
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        raise
+    return [row["uid"] for row in rows]
+
+def bulk_update_todos(user_uid, items):
+    """
+    Applies several partial updates to the user's ToDo items in one transaction.
+    Each item holds todo_uid plus the fields to change; rows are updated by primary key
+    with executemany, grouped by the set of changed columns.
+    Returns the set of todo UIDs that were updated; UIDs not owned by the user are skipped.
+    """
+    uids = {item["todo_uid"] for item in items}
+    ids = dict(db.session.execute(
+        select(ToDo.uid, ToDo.id).where(ToDo.user_uid == user_uid, ToDo.uid.in_(uids))
+    ).all())
+
+    if not ids:
+        db.session.rollback()
+        return set()
+
+    now = datetime.now(timezone.utc)
+    change_seq = _bump_todo_version(user_uid)
+    rows = [
+        dict(
+            {field: item[field] for field in ("task", "description", "status") if item.get(field) is not None},
+            id=ids[item["todo_uid"]],
+            modified_at=now,
+            change_seq=change_seq,
+        )
+        for item in items if item["todo_uid"] in ids
+    ]
+    db.session.execute(update(ToDo), rows)
+    _reindex_todos(rows)
+    db.session.commit()
+    return set(ids)
+
+def _delete_todos(user_uid, *criteria):
+    """
+    Deletes the user's ToDo items matching criteria with one DELETE ... RETURNING, records a
+    tombstone for each and drops them from the full-text index, in one transaction.
+    Returns the set of UIDs that were deleted.
+    """
+    change_seq = _bump_todo_version(user_uid)
+    deleted = db.session.execute(
+        delete(ToDo)
+        .where(ToDo.user_uid == user_uid, *criteria)
+        .returning(ToDo.id, ToDo.uid)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if not deleted:
+        db.session.rollback()
+        return set()
+    now = datetime.now(timezone.utc)
+    db.session.execute(insert(ToDoTombstone), [
+        {"todo_id": todo_id, "todo_uid": todo_uid, "user_uid": user_uid, "change_seq": change_seq, "deleted_at": now}
+        for todo_id, todo_uid in deleted
+    ])
+    _unindex_todos([todo_id for todo_id, _ in deleted])
+    db.session.commit()
+    return {todo_uid for _, todo_uid in deleted}
+
+def bulk_delete_todos(user_uid, todo_uids):
+    """
+    Deletes the user's ToDo items with the given UIDs in one statement, leaving tombstones.
+    Returns the set of UIDs that were deleted.
+    """
+    return _delete_todos(user_uid, ToDo.uid.in_(set(todo_uids)))
+
 def get_user_by_uid(user_uid):
     """
     Retrieves a user object by their UID.
     """
     return User.query.filter_by(uid=user_uid).first()
 
-def get_todos_by_user(user_uid, date=None):
+def _todos_query(user_uid, created_range=None):
+    query = ToDo.query.filter_by(user_uid=user_uid)
+    if created_range:
+        # Plain comparisons on the column keep the (user_uid, created_at) index usable
+        start, end = created_range
+        if start is not None:
+            query = query.filter(ToDo.created_at >= start)
+        if end is not None:
+            query = query.filter(ToDo.created_at < end)
+    return query.order_by(ToDo.created_at.desc(), ToDo.id.desc())
+
+def _with_columns(query, columns):
+    # Core rows of just these ToDo attributes, in this order, skip building ORM objects
+    return query.with_entities(*(getattr(ToDo, name) for name in columns))
+
+def get_todos_by_user(user_uid, created_range=None, limit=None, columns=None):
     """
-    Retrieves all ToDo items for a user, optionally filtered by creation date.
+    Retrieves ToDo items for a user, newest first, optionally filtered to a half-open
+    [start, end) UTC creation range and capped at limit rows.
+    With columns (ToDo attribute names), returns rows of those values instead of ToDo objects.
     """
-    query = ToDo.query.filter_by(user_uid=user_uid)
-    if date:
-        query = query.filter(func.date(ToDo.created_at) == date)
-    return query.order_by(ToDo.created_at.desc()).all()
+    query = _todos_query(user_uid, created_range)
+    if columns:
+        query = _with_columns(query, columns)
+    if limit:
+        query = query.limit(limit)
+    return query.all()
+
+def iter_todos_by_user(user_uid, created_range=None, batch_size=500, columns=None):
+    """
+    Yields a user's ToDo rows (Core rows with the ToDo column names, or just columns), newest first,
+    fetching batch_size rows at a time so memory stays flat for any list size.
+    """
+    query = _todos_query(user_uid, created_range)
+    query = _with_columns(query, columns) if columns else query.with_entities(*ToDo.__table__.columns)
+    statement = query.statement.execution_options(yield_per=batch_size)
+    yield from db.session.execute(statement)
+
+def get_todos_page(user_uid, limit, after=None, created_range=None, columns=None):
+    """
+    Retrieves one page of a user's ToDo items, newest first, using keyset pagination on (created_at, id).
+    after is the (created_at, id) of the last item on the previous page.
+    With columns, returns rows of those values (plus created_at and id for the cursor).
+    Returns (todos, has_more).
+    """
+    query = _todos_query(user_uid, created_range)
+    if columns:
+        query = _with_columns(query, [*columns, *(name for name in ("created_at", "id") if name not in columns)])
+    if after:
+        query = query.filter(tuple_(ToDo.created_at, ToDo.id) < tuple_(*after))
+    todos = query.limit(limit + 1).all()
+    return todos[:limit], len(todos) > limit
+
+def get_todo_changes(user_uid, limit, after=None, columns=None):
+    """
+    Retrieves up to limit + 1 todos and tombstones each, changed after the (change_seq, id) position after,
+    ordered by that position. With after=None (a full sync) every todo is returned and no tombstones.
+    Todo rows hold columns (ToDo attribute names) followed by change_seq and id;
+    tombstone rows hold todo_uid, change_seq and todo_id.
+    Returns (todo rows, tombstone rows).
+    """
+    todo_query = ToDo.query.filter_by(user_uid=user_uid).order_by(ToDo.change_seq, ToDo.id)
+    todo_query = _with_columns(todo_query, [*(columns or ()), "change_seq", "id"])
+    if after is None:
+        return todo_query.limit(limit + 1).all(), []
+
+    todos = todo_query.filter(tuple_(ToDo.change_seq, ToDo.id) > tuple_(*after)).limit(limit + 1).all()
+    tombstones = db.session.execute(
+        select(ToDoTombstone.todo_uid, ToDoTombstone.change_seq, ToDoTombstone.todo_id)
+        .where(
+            ToDoTombstone.user_uid == user_uid,
+            tuple_(ToDoTombstone.change_seq, ToDoTombstone.todo_id) > tuple_(*after)
+        )
+        .order_by(ToDoTombstone.change_seq, ToDoTombstone.todo_id)
+        .limit(limit + 1)
+    ).all()
+    return todos, tombstones
+
+def search_todos(user_uid, terms, limit, offset=0, columns=None):
+    """
+    Full-text search of a user's todos over task and description; every term must match a whole word.
+    Results are ordered by score, lower is better: bm25 with task matches weighted 10x on SQLite (FTS5),
+    negated ts_rank_cd with task weighted A on Postgres (tsvector + GIN), then by id.
+    Every match is scored either way, so pages skip offset results rather than seeking past a score:
+    bm25 depends on statistics of the whole index, which other users' writes shift between pages.
+    Returns (rows of columns followed by score and id, has_more).
+    """
+    if _uses_fts5():
+        # terms are plain words, quoted so FTS5 never reads them as query syntax
+        match = "{task description} : (%s) AND user_uid : \"%s\"" % (
+            " AND ".join(f'"{term}"' for term in terms), _fts_user_token(user_uid).replace('"', '""')
+        )
+        matches = (
+            text("SELECT rowid AS todo_id, bm25(todo_fts, 10.0, 1.0, 0.0) AS score FROM todo_fts WHERE todo_fts MATCH :match")
+            .bindparams(match=match)
+            .columns(todo_id=Integer, score=Float)
+            .subquery("matches")
+        )
+    else:
+        search_vector = literal_column("todo.search_vector")
+        tsquery = func.to_tsquery("simple", " & ".join(terms))
+        matches = (
+            select(ToDo.id.label("todo_id"), (-func.ts_rank_cd(search_vector, tsquery)).label("score"))
+            .where(ToDo.user_uid == user_uid, search_vector.op("@@")(tsquery))
+            .subquery("matches")
+        )
+
+    statement = (
+        select(*(getattr(ToDo, name) for name in columns or ()), matches.c.score, ToDo.id)
+        .join_from(matches, ToDo, ToDo.id == matches.c.todo_id)
+        .where(ToDo.user_uid == user_uid)
+        .order_by(matches.c.score, ToDo.id)
+        .offset(offset)
+        .limit(limit + 1)
+    )
+    rows = db.session.execute(statement).all()
+    return rows[:limit], len(rows) > limit
+
+def delete_old_tombstones_batch(deleted_before, after_id, batch_size):
+    """
+    Deletes up to batch_size tombstones recorded before deleted_before, scanning by primary key after after_id.
+    Returns (rows deleted, last id scanned), or (0, None) when nothing is left.
+    """
+    ids = db.session.scalars(
+        select(ToDoTombstone.id)
+        .where(ToDoTombstone.id > after_id, ToDoTombstone.deleted_at < deleted_before)
+        .order_by(ToDoTombstone.id)
+        .limit(batch_size)
+    ).all()
+    if not ids:
+        return 0, None
+    deleted = (
+        ToDoTombstone.query
+        .filter(ToDoTombstone.id.between(ids[0], ids[-1]), ToDoTombstone.deleted_at < deleted_before)
+        .delete(synchronize_session=False)
+    )
+    db.session.commit()
+    return deleted, ids[-1]
 
 def delete_todo_by_uid(todo_uid, user_uid):
     """
-    Deletes a ToDo item by its UID for the specified user.
+    Deletes a ToDo item by its UID for the specified user with a single DELETE, leaving a tombstone.
     Returns True if deletion was successful, otherwise False.
     """
-    todo = ToDo.query.filter_by(uid=todo_uid, user_uid=user_uid).first()    
-    if not todo:
-        return False
-    db.session.delete(todo)
-    db.session.commit()
-    return True
+    return bool(_delete_todos(user_uid, ToDo.uid == todo_uid))
 
 def update_todo_by_uid(todo_uid, user_uid, task=None, description=None, status=None):
     """
-    Updates fields of a ToDo item by its UID for the specified user.
+    Updates fields of a ToDo item by its UID for the specified user with a single
+    UPDATE ... RETURNING that writes only the given fields and modified_at.
     Returns the updated ToDo object, or None if not found.
     """
-    todo = ToDo.query.filter_by(uid=todo_uid, user_uid=user_uid).first()
-    if not todo:
-        return None
-
+    change_seq = _bump_todo_version(user_uid)
+    values = {"modified_at": datetime.now(timezone.utc), "change_seq": change_seq}
     if task is not None:
-        todo.task = task
+        values["task"] = task
     if description is not None:
-        todo.description = description
+        values["description"] = description
     if status is not None:
-        todo.status = status
+        values["status"] = status
 
-    todo.modified_at = datetime.now(timezone.utc)
+    todo = db.session.scalars(
+        update(ToDo)
+        .where(ToDo.uid == todo_uid, ToDo.user_uid == user_uid)
+        .values(**values)
+        .returning(ToDo),
+        execution_options={"populate_existing": True}
+    ).one_or_none()
+    if todo is None:
+        db.session.rollback()
+        return None
+    _reindex_todos([{"id": todo.id, "task": task, "description": description}])
+    # Detach before committing, so serializing the result does not trigger a refresh SELECT
+    db.session.expunge(todo)
     db.session.commit()
-    return todo
\ No newline at end of file
+    return todo
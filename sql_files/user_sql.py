@@ -1,5 +1,18 @@
 #user_sql.py
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from models import db, User,UserToken
+from utils import hash_token
+
+SESSION_TOKEN_COLUMNS = (
+    "access_token",
+    "access_token_digest",
+    "access_token_expiry",
+    "refresh_token",
+    "refresh_token_digest",
+    "refresh_token_expiry",
+)
 
 def get_user_by_email(email):
     """
@@ -19,6 +32,12 @@ def get_user_by_uid(uid):
     """
     return User.query.filter_by(uid=uid).first()
 
+def user_exists(uid):
+    """
+    Checks whether a user with this UID exists, without loading the row.
+    """
+    return db.session.scalar(select(User.id).where(User.uid == uid).limit(1)) is not None
+
 def insert_user(user):
     """
     Inserts a new user into the database.
@@ -29,21 +48,166 @@ def insert_user(user):
 
 def insert_user_token(user_uid, access_token, access_token_expiry, refresh_token, refresh_token_expiry, device_uuid):
     """
-    Inserts a new user token record into the database with access and refresh tokens.
+    Upserts the session row for (user_uid, device_uuid) with fresh access and refresh tokens,
+    so repeated logins from one device reuse a single row.
     """
 
-    token_record = UserToken(
-        user_uid=user_uid,
-        access_token=access_token,
-        access_token_expiry=access_token_expiry,
-        refresh_token=refresh_token,
-        refresh_token_expiry=refresh_token_expiry,
-        device_uuid=device_uuid
+    values = {
+        "user_uid": user_uid,
+        "device_uuid": device_uuid,
+        "access_token": access_token,
+        "access_token_digest": hash_token(access_token),
+        "access_token_expiry": access_token_expiry,
+        "refresh_token": refresh_token,
+        "refresh_token_digest": hash_token(refresh_token),
+        "refresh_token_expiry": refresh_token_expiry,
+    }
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        stmt = postgresql_insert(UserToken).values(**values)
+    elif dialect == "sqlite":
+        stmt = sqlite_insert(UserToken).values(**values)
+    else:
+        return _upsert_user_token_fallback(values)
+
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserToken.user_uid, UserToken.device_uuid],
+        set_={column: stmt.excluded[column] for column in SESSION_TOKEN_COLUMNS}
     )
-    db.session.add(token_record)
+    token_record = db.session.scalars(
+        stmt.returning(UserToken),
+        execution_options={"populate_existing": True}
+    ).one()
+    db.session.commit()
+    return token_record
+
+def _upsert_user_token_fallback(values):
+    """
+    Select-then-write upsert for dialects without ON CONFLICT support.
+    """
+    token_record = UserToken.query.filter_by(
+        user_uid=values["user_uid"],
+        device_uuid=values["device_uuid"]
+    ).first()
+    if token_record is None:
+        token_record = UserToken(**values)
+        db.session.add(token_record)
+    else:
+        for column in SESSION_TOKEN_COLUMNS:
+            setattr(token_record, column, values[column])
     db.session.commit()
     return token_record
 
+def compact_user_tokens():
+    """
+    Collapses duplicate session rows, keeping only the newest row per (user_uid, device_uuid).
+    Returns the number of rows deleted.
+    """
+    newest_ids = (
+        select(func.max(UserToken.id))
+        .group_by(UserToken.user_uid, UserToken.device_uuid)
+    )
+    deleted = (
+        UserToken.query
+        .filter(UserToken.id.not_in(newest_ids))
+        .delete(synchronize_session=False)
+    )
+    db.session.commit()
+    return deleted
+
+def delete_expired_user_tokens_batch(now, after_id, batch_size):
+    """
+    Deletes up to batch_size user token rows whose refresh token has expired, scanning by primary key after after_id.
+    Returns (rows deleted, last id scanned), or (0, None) when nothing is left.
+    """
+    ids = db.session.scalars(
+        select(UserToken.id)
+        .where(UserToken.id > after_id, UserToken.refresh_token_expiry < now)
+        .order_by(UserToken.id)
+        .limit(batch_size)
+    ).all()
+    if not ids:
+        return 0, None
+    deleted = (
+        UserToken.query
+        .filter(UserToken.id.between(ids[0], ids[-1]), UserToken.refresh_token_expiry < now)
+        .delete(synchronize_session=False)
+    )
+    db.session.commit()
+    return deleted, ids[-1]
+
+def get_user_token_by_access_token(user_uid, access_token):
+    """
+    Retrieves the token record holding the given access token for a user, using the indexed digest.
+    """
+    return UserToken.query.filter_by(
+        access_token_digest=hash_token(access_token),
+        user_uid=user_uid
+    ).first()
+
+def get_user_token_by_refresh_token(user_uid, refresh_token):
+    """
+    Retrieves the token record holding the given refresh token for a user, using the indexed digest.
+    """
+    return UserToken.query.filter_by(
+        refresh_token_digest=hash_token(refresh_token),
+        user_uid=user_uid
+    ).first()
+
+def update_user_access_token(token_record, access_token, access_token_expiry):
+    """
+    Replaces the access token of an existing token record.
+    """
+    token_record.access_token = access_token
+    token_record.access_token_digest = hash_token(access_token)
+    token_record.access_token_expiry = access_token_expiry
+    db.session.commit()
+    return token_record
+
+def delete_user_token(token_record):
+    """
+    Deletes a user token record, revoking both of its tokens.
+    """
+    db.session.delete(token_record)
+    db.session.commit()
+
+def delete_user_tokens(user_uid):
+    """
+    Deletes every token record of a user. Returns the number of rows deleted.
+    """
+    deleted = UserToken.query.filter_by(user_uid=user_uid).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+def get_token_generation(user_uid):
+    """
+    Retrieves a user's current session generation, or None if the user does not exist.
+    """
+    return db.session.scalar(select(User.token_generation).where(User.uid == user_uid))
+
+def increment_token_generation(user_uid):
+    """
+    Bumps a user's session generation, invalidating every access token issued before.
+    Returns the new generation, or None if the user does not exist.
+    """
+    generation = db.session.scalar(
+        update(User)
+        .where(User.uid == user_uid)
+        .values(token_generation=User.token_generation + 1)
+        .returning(User.token_generation)
+    )
+    db.session.commit()
+    return generation
+
+def update_user_password(user, hashed_password):
+    """
+    Replaces a user's stored password hash.
+    """
+    user.password = hashed_password
+    db.session.commit()
+    return user
+
 def is_username_taken(username):
     """
     Checks if a username is already taken.
@@ -61,14 +225,3 @@ def is_email_registered(email):
 #     Checks if a mobile number is already registered.
 #     """
 #     return db.session.query(User.id).filter_by(mobile_number=mobile_number).first() is not None
-
-def update_user_phone_verification(user_uid, phone_verified=True):
-    """
-    Updates the phone verification status for a user.
-    """
-    user = User.query.filter_by(uid=user_uid).first()
-    if user:
-        user.phone_verified = phone_verified
-        db.session.commit()
-        return user
-    return None
@@ -0,0 +1,212 @@
+import unittest
+import json
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event
+from app import create_app
+from config import TestConfig
+from extensions import bcrypt, token_cache
+from models import db, User, UserToken
+from utils import hash_token
+
+class StatelessTestConfig(TestConfig):
+    TOKEN_VERIFICATION_MODE = "stateless"
+
+class AuthTestCase(unittest.TestCase):
+    config_class = TestConfig
+
+    def setUp(self):
+        self.app = create_app(self.config_class)
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+
+            # Create a verified user directly, so no SMS is sent
+            password = "AuthPass123@" + self.app.config["PEPPER"]
+            user = User(
+                username="authuser",
+                first_name="Auth",
+                last_name="User",
+                email="auth@example.com",
+                mobile_number="+919876543210",
+                password=bcrypt.generate_password_hash(password).decode("utf-8"),
+                phone_verified=True
+            )
+            db.session.add(user)
+            db.session.commit()
+            self.user_uid = user.uid
+
+        self.device_headers = {
+            "Content-Type": "application/json",
+            "Device-Name": "test-device",
+            "Device-Uuid": "device-1"
+        }
+        login_resp = self.login()
+        login_data = login_resp.get_json()
+        assert login_resp.status_code == 200, f"Login failed in setUp: {login_data}"
+
+        self.token = login_data["access_token"]
+        self.refresh_token = login_data["refresh_token"]
+        self.auth_headers = dict(self.device_headers, Authorization=f"Bearer {self.token}")
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def login(self, headers=None):
+        return self.client.post(
+            "/user/login",
+            headers=headers or self.device_headers,
+            data=json.dumps({"email": "auth@example.com", "password": "AuthPass123@"})
+        )
+
+    def get_todos(self, headers=None):
+        return self.client.get('/todo/gettodo', headers=headers or self.auth_headers)
+
+    def test_verified_token_is_served_from_cache(self):
+        token_cache.clear()
+        self.assertEqual(self.get_todos().status_code, 200)
+        self.assertEqual(self.get_todos().status_code, 200)
+
+        stats = token_cache.stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["size"], 1)
+
+    def test_cached_token_still_checks_device(self):
+        self.assertEqual(self.get_todos().status_code, 200)
+        headers = dict(self.auth_headers, **{"Device-Uuid": "other-device"})
+        response = self.get_todos(headers)
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("Device UUID mismatch", response.get_json().get("error"))
+
+    def test_logout_revokes_cached_token(self):
+        self.assertEqual(self.get_todos().status_code, 200)
+
+        response = self.client.post('/user/logout', headers=self.auth_headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(token_cache.stats()["size"], 0)
+
+        response = self.get_todos()
+        self.assertEqual(response.status_code, 401)
+        with self.app.app_context():
+            self.assertEqual(UserToken.query.filter_by(user_uid=self.user_uid).count(), 0)
+
+    def test_refresh_invalidates_replaced_token(self):
+        self.assertEqual(self.get_todos().status_code, 200)
+        self.assertEqual(token_cache.stats()["size"], 1)
+
+        headers = dict(self.device_headers, Authorization=f"Bearer {self.refresh_token}")
+        response = self.client.post('/user/refresh', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(token_cache.stats()["size"], 0)
+
+    def test_tokens_are_stored_with_digests(self):
+        with self.app.app_context():
+            record = UserToken.query.filter_by(user_uid=self.user_uid).first()
+            self.assertEqual(record.access_token_digest, hash_token(self.token))
+            self.assertEqual(record.refresh_token_digest, hash_token(self.refresh_token))
+
+        # Logging in twice in the same second must not produce colliding tokens
+        second = self.login(dict(self.device_headers, **{"Device-Uuid": "device-2"}))
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second.get_json()["access_token"], self.token)
+
+    def test_repeated_login_reuses_device_session(self):
+        self.assertEqual(self.get_todos().status_code, 200)
+
+        second = self.login()
+        self.assertEqual(second.status_code, 200)
+        with self.app.app_context():
+            self.assertEqual(UserToken.query.filter_by(user_uid=self.user_uid).count(), 1)
+
+        # The replaced access token must stop working, even though it was cached
+        self.assertEqual(self.get_todos().status_code, 401)
+        headers = dict(self.device_headers, Authorization=f"Bearer {second.get_json()['access_token']}")
+        self.assertEqual(self.get_todos(headers).status_code, 200)
+
+    def test_compact_tokens_command(self):
+        # Databases from before the one-session-per-device index can hold several rows per device
+        index = next(index for index in UserToken.__table__.indexes if index.name == "uq_user_tokens_user_device")
+        expiry = datetime.now(timezone.utc) + timedelta(days=1)
+        with self.app.app_context():
+            index.drop(db.engine)
+            for i, device_uuid in enumerate(["phone", "phone", "tablet", "phone"]):
+                db.session.add(UserToken(
+                    user_uid=self.user_uid,
+                    device_uuid=device_uuid,
+                    access_token=f"access-{i}",
+                    access_token_digest=hash_token(f"access-{i}"),
+                    refresh_token=f"refresh-{i}",
+                    refresh_token_digest=hash_token(f"refresh-{i}"),
+                    refresh_token_expiry=expiry
+                ))
+                db.session.commit()
+
+        runner = self.app.test_cli_runner()
+        result = runner.invoke(args=["maintenance", "compact-tokens"])
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("Removed 2 duplicate session rows", result.output)
+
+        with self.app.app_context():
+            seeded = UserToken.query.filter(UserToken.device_uuid.in_(["phone", "tablet"]))
+            sessions = sorted((token.device_uuid, token.access_token) for token in seeded)
+            self.assertEqual(sessions, [("phone", "access-3"), ("tablet", "access-2")])
+            # Only the newest row per device is left, so the unique index can be built again
+            index.create(db.engine)
+
+
+class StatelessAuthTestCase(AuthTestCase):
+    config_class = StatelessTestConfig
+
+    def capture_statements(self):
+        statements = []
+        with self.app.app_context():
+            engine = db.engine
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(engine, "before_cursor_execute", listener)
+        self.addCleanup(event.remove, engine, "before_cursor_execute", listener)
+        return statements
+
+    # Token cache behaviour only applies to the DB-checked mode, and a replaced
+    # stateless access token stays valid until it expires
+    test_verified_token_is_served_from_cache = None
+    test_logout_revokes_cached_token = None
+    test_refresh_invalidates_replaced_token = None
+    test_repeated_login_reuses_device_session = None
+
+    def test_access_token_is_verified_without_user_tokens(self):
+        self.assertEqual(self.get_todos().status_code, 200)
+        statements = self.capture_statements()
+        self.assertEqual(self.get_todos().status_code, 200)
+        self.assertFalse([s for s in statements if "user_tokens" in s])
+
+    def test_refresh_token_is_not_an_access_token(self):
+        headers = dict(self.device_headers, Authorization=f"Bearer {self.refresh_token}")
+        self.assertEqual(self.get_todos(headers).status_code, 401)
+
+    def test_logout_bumps_generation(self):
+        self.assertEqual(self.get_todos().status_code, 200)
+        response = self.client.post('/user/logout', headers=self.auth_headers)
+        self.assertEqual(response.status_code, 200)
+
+        response = self.get_todos()
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("Token revoked", response.get_json().get("error"))
+
+    def test_logout_all_revokes_every_device(self):
+        other_headers = dict(self.device_headers, **{"Device-Uuid": "device-2"})
+        other = self.login(other_headers).get_json()
+        other_headers["Authorization"] = f"Bearer {other['access_token']}"
+        self.assertEqual(self.get_todos(other_headers).status_code, 200)
+
+        response = self.client.post('/user/logout-all', headers=self.auth_headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_todos(other_headers).status_code, 401)
+        with self.app.app_context():
+            self.assertEqual(UserToken.query.filter_by(user_uid=self.user_uid).count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import time
+import json
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+from twilio.base.exceptions import TwilioRestException
+from app import create_app
+from config import TestConfig
+from models import db
+import twilio_client
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError, CallTimeoutError, ServiceUnavailableError
+from twilio_client import lookup_breaker, is_twilio_outage
+from utils import validate_phone_number
+
+def fail():
+    raise RuntimeError("down")
+
+class BreakerTestConfig(TestConfig):
+    TWILIO_TIMEOUT_SECONDS = 0.2
+    TWILIO_BREAKER_FAILURES = 2
+    TWILIO_BREAKER_RESET_SECONDS = 60
+
+class StubLookupClient:
+    """
+    Local stand-in for the Twilio client whose Lookup calls can be made slow or failing.
+    """
+    def __init__(self, mode="ok", delay=0):
+        self.mode = mode
+        self.delay = delay
+        self.calls = 0
+        self.lookups = SimpleNamespace(v2=SimpleNamespace(phone_numbers=self.phone_numbers))
+
+    def phone_numbers(self, number):
+        return SimpleNamespace(fetch=lambda: self.fetch(number))
+
+    def fetch(self, number):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.mode == "fail":
+            raise TwilioRestException(503, "/Lookups", "Service unavailable")
+        if self.mode == "invalid":
+            raise TwilioRestException(404, "/Lookups", "Not found")
+        return SimpleNamespace(phone_number=number, country_code="IN")
+
+class CircuitBreakerTestCase(unittest.TestCase):
+    def test_opens_after_consecutive_failures_and_half_opens(self):
+        transitions = []
+        breaker = CircuitBreaker("stub", failure_threshold=2, reset_timeout=0.1)
+        breaker.add_listener(lambda name, old, new: transitions.append((old, new)))
+
+        for _ in range(2):
+            with self.assertRaises(RuntimeError):
+                breaker.call(fail)
+        self.assertEqual(breaker.state, "open")
+        with self.assertRaises(CircuitOpenError) as raised:
+            breaker.call(lambda: "never called")
+        self.assertTrue(0 < raised.exception.retry_after <= 0.1)
+
+        time.sleep(0.15)
+        self.assertEqual(breaker.call(lambda: "recovered"), "recovered")
+        self.assertEqual(breaker.state, "closed")
+        self.assertEqual(transitions, [("closed", "open"), ("open", "half_open"), ("half_open", "closed")])
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker("stub", failure_threshold=1, reset_timeout=0.05)
+        with self.assertRaises(RuntimeError):
+            breaker.call(fail)
+        time.sleep(0.1)
+        with self.assertRaises(RuntimeError):
+            breaker.call(fail)
+        self.assertEqual(breaker.state, "open")
+
+    def test_slow_call_times_out(self):
+        breaker = CircuitBreaker("stub", failure_threshold=1, timeout=0.05)
+        started = time.perf_counter()
+        with self.assertRaises(CallTimeoutError):
+            breaker.call(time.sleep, 1)
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(breaker.state, "open")
+
+    def test_client_errors_do_not_count(self):
+        self.assertFalse(is_twilio_outage(TwilioRestException(404, "/Lookups", "Not found")))
+        self.assertTrue(is_twilio_outage(TwilioRestException(503, "/Lookups", "Unavailable")))
+        self.assertTrue(is_twilio_outage(ConnectionError()))
+
+class TwilioLookupBreakerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(BreakerTestConfig)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+    def tearDown(self):
+        lookup_breaker.reset()
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_failing_lookup_opens_circuit(self):
+        stub = StubLookupClient(mode="fail")
+        with patch("utils.get_twilio_client", return_value=stub):
+            # A Twilio 5xx is an outage, not an invalid number, even before the circuit opens
+            for _ in range(2):
+                with self.assertRaises(ServiceUnavailableError) as raised:
+                    validate_phone_number("+919876543210")
+                self.assertNotIsInstance(raised.exception, CircuitOpenError)
+            with self.assertRaises(CircuitOpenError):
+                validate_phone_number("+919876543210")
+        self.assertEqual(stub.calls, 2)
+        self.assertEqual(lookup_breaker.stats()["state"], "open")
+
+    def test_invalid_numbers_keep_circuit_closed(self):
+        stub = StubLookupClient(mode="invalid")
+        with patch("utils.get_twilio_client", return_value=stub):
+            for _ in range(3):
+                self.assertIsNone(validate_phone_number("+910000000000"))
+        self.assertEqual(lookup_breaker.state, "closed")
+
+    def test_slow_lookup_returns_503(self):
+        stub = StubLookupClient(delay=1)
+        payload = {
+            "username": "slowuser",
+            "first_name": "Slow",
+            "last_name": "User",
+            "email": "slow@example.com",
+            "mobile_number": "+919876543210",
+            "password": "SlowPass123@"
+        }
+        with patch("utils.get_twilio_client", return_value=stub):
+            response = self.app.test_client().post(
+                "/user/register",
+                headers={"Content-Type": "application/json", "Device-Name": "test", "Device-Uuid": "device-1"},
+                data=json.dumps(payload)
+            )
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers.get("Retry-After"), "60")
+
+    def test_client_is_built_from_app_config(self):
+        client = twilio_client.get_twilio_client()
+        self.assertEqual(client.http_client.timeout, 0.2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import os
+import time
+import unittest
+import json
+import tempfile
+from app import create_app
+from config import TestConfig
+from extensions import bcrypt, password_hasher
+from models import db, User, AppSetting
+from services.hashing import HashingBusyError, calibrate_bcrypt_cost, hash_cost
+
+class PooledHashingConfig(TestConfig):
+    BCRYPT_LOG_ROUNDS = 4
+    HASH_POOL_WORKERS = 1
+    HASH_QUEUE_LIMIT = 1
+
+class PasswordHasherTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(PooledHashingConfig)
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            password = "Secret123@" + self.app.config["PEPPER"]
+            db.session.add(User(
+                username="hashuser",
+                first_name="Hash",
+                last_name="User",
+                email="hash@example.com",
+                mobile_number="+919876543210",
+                password=bcrypt.generate_password_hash(password).decode("utf-8")
+            ))
+            db.session.commit()
+
+    def tearDown(self):
+        password_hasher.in_flight = 0
+        password_hasher.shutdown()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_pooled_hash_matches_flask_bcrypt(self):
+        pw_hash = password_hasher.generate_password_hash("Secret123@")
+        self.assertTrue(pw_hash.startswith("$2b$04$"))
+        self.assertTrue(bcrypt.check_password_hash(pw_hash, "Secret123@"))
+        self.assertTrue(password_hasher.check_password_hash(pw_hash, "Secret123@"))
+        self.assertFalse(password_hasher.check_password_hash(pw_hash, "Wrong123@"))
+
+    def test_saturated_pool_rejects_fast(self):
+        password_hasher.in_flight = 1
+        with self.assertRaises(HashingBusyError):
+            password_hasher.generate_password_hash("Secret123@")
+        self.assertEqual(password_hasher.stats()["rejected"], 1)
+
+    def test_timed_out_hash_holds_its_slot_until_done(self):
+        password_hasher.timeout = 0.01
+        started = password_hasher._get_executor().submit(time.sleep, 0.5)
+        with self.assertRaises(HashingBusyError):
+            password_hasher.generate_password_hash("Secret123@")
+        # The queued hash is still pending behind the sleep, so its slot is not free yet
+        self.assertEqual(password_hasher.stats()["in_flight"], 1)
+        with self.assertRaises(HashingBusyError):
+            password_hasher.generate_password_hash("Secret123@")
+        self.assertEqual(password_hasher.stats()["rejected"], 1)
+
+        started.result()
+        deadline = time.time() + 5
+        while password_hasher.stats()["in_flight"] and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(password_hasher.stats()["in_flight"], 0)
+
+    def test_saturated_login_returns_503(self):
+        password_hasher.in_flight = 1
+        response = self.client.post(
+            "/user/login",
+            headers={"Content-Type": "application/json", "Device-Name": "test", "Device-Uuid": "device-1"},
+            data=json.dumps({"email": "hash@example.com", "password": "Secret123@"})
+        )
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers.get("Retry-After"), "1")
+
+    def test_login_upgrades_hash_to_current_cost(self):
+        password_hasher.settings["BCRYPT_LOG_ROUNDS"] = 5
+        response = self.client.post(
+            "/user/login",
+            headers={"Content-Type": "application/json", "Device-Name": "test", "Device-Uuid": "device-1"},
+            data=json.dumps({"email": "hash@example.com", "password": "Secret123@"})
+        )
+        self.assertEqual(response.status_code, 200)
+        with self.app.app_context():
+            user = User.query.filter_by(email="hash@example.com").first()
+            self.assertEqual(hash_cost(user.password), 5)
+            self.assertTrue(bcrypt.check_password_hash(user.password, "Secret123@" + self.app.config["PEPPER"]))
+
+    def test_hash_with_a_different_cost_is_rehashed(self):
+        password_hasher.settings["BCRYPT_LOG_ROUNDS"] = 5
+        stronger = password_hasher.generate_password_hash("Secret123@")
+        self.assertFalse(password_hasher.needs_rehash(stronger))
+        password_hasher.settings["BCRYPT_LOG_ROUNDS"] = 4
+        self.assertTrue(password_hasher.needs_rehash(stronger))
+        self.assertTrue(password_hasher.needs_rehash(stronger.replace("$05$", "$03$", 1)))
+
+    def test_boot_calibrates_once_and_workers_share_the_cost(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            uri = "sqlite:///" + os.path.join(tmp, "app.db")
+            first = create_app(type("FirstBoot", (PooledHashingConfig,), {
+                "SQLALCHEMY_DATABASE_URI": uri, "BCRYPT_AUTO_CALIBRATE": True,
+                "BCRYPT_TARGET_MS": 60000, "BCRYPT_MIN_ROUNDS": 4, "BCRYPT_MAX_ROUNDS": 5
+            }))
+            self.assertEqual(first.config["BCRYPT_LOG_ROUNDS"], 5)
+
+            # A worker that would measure a lower cost reads the stored one instead
+            worker = create_app(type("WorkerBoot", (PooledHashingConfig,), {
+                "SQLALCHEMY_DATABASE_URI": uri, "BCRYPT_AUTO_CALIBRATE": True,
+                "BCRYPT_TARGET_MS": 0, "BCRYPT_MIN_ROUNDS": 4, "BCRYPT_MAX_ROUNDS": 5
+            }))
+            self.assertEqual(worker.config["BCRYPT_LOG_ROUNDS"], 5)
+            self.assertEqual(password_hasher.rounds, 5)
+
+            # Re-measuring replaces the stored cost for the next boot
+            result = worker.test_cli_runner().invoke(args=["maintenance", "calibrate-bcrypt"])
+            self.assertEqual(result.exit_code, 0, result.output)
+            self.assertIn("Stored bcrypt cost 4 (was 5)", result.output)
+            with worker.app_context():
+                self.assertEqual(json.loads(db.session.get(AppSetting, "bcrypt_cost").value)["rounds"], 4)
+
+    def test_calibration_stays_within_bounds(self):
+        self.assertEqual(calibrate_bcrypt_cost(target_ms=0, min_rounds=4, max_rounds=6)[0], 4)
+        self.assertEqual(calibrate_bcrypt_cost(target_ms=60000, min_rounds=4, max_rounds=6)[0], 6)
+        with self.assertRaises(ValueError):
+            calibrate_bcrypt_cost(target_ms=250, min_rounds=6, max_rounds=4)
+
+    def test_calibrate_command_reports_cost(self):
+        self.app.config.update(BCRYPT_TARGET_MS=60000, BCRYPT_MIN_ROUNDS=4, BCRYPT_MAX_ROUNDS=5)
+        result = self.app.test_cli_runner().invoke(args=["maintenance", "calibrate-bcrypt"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("bcrypt cost 5 takes", result.output)
+        self.assertIn("BCRYPT_AUTO_CALIBRATE is off, so servers keep BCRYPT_LOG_ROUNDS=4", result.output)
+
+        self.app.config.update(BCRYPT_MIN_ROUNDS=12, BCRYPT_MAX_ROUNDS=10)
+        result = self.app.test_cli_runner().invoke(args=["maintenance", "calibrate-bcrypt"])
+        self.assertNotEqual(result.exit_code, 0)
+        self.assertIn("min (12) <= max (10)", result.output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import json
+import unittest
+from datetime import datetime, timedelta, timezone
+from app import create_app
+from config import TestConfig
+from extensions import response_cache
+from models import db, User, UserToken, UserOTP, ToDoTombstone, CacheStats
+from manager.maintenance_manager import MaintenanceManager
+
+class MaintenanceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.runner = self.app.test_cli_runner()
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(
+                username="maintuser",
+                first_name="Maint",
+                last_name="User",
+                email="maint@example.com",
+                mobile_number="+919876543210",
+                password="not-a-real-hash"
+            )
+            db.session.add(user)
+            db.session.commit()
+            self.user_uid = user.uid
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def add_token(self, device_uuid, refresh_expiry):
+        db.session.add(UserToken(
+            user_uid=self.user_uid,
+            device_uuid=device_uuid,
+            access_token=f"access-{device_uuid}",
+            access_token_digest=f"access-digest-{device_uuid}",
+            refresh_token=f"refresh-{device_uuid}",
+            refresh_token_digest=f"refresh-digest-{device_uuid}",
+            refresh_token_expiry=refresh_expiry
+        ))
+
+    def add_otp(self, created_at, expires_at, is_used=False):
+        db.session.add(UserOTP(
+            user_uid=self.user_uid,
+            otp_code="123456",
+            purpose="phone_verification",
+            created_at=created_at,
+            expires_at=expires_at,
+            is_used=is_used
+        ))
+
+    def test_purge_expired_deletes_in_batches(self):
+        now = datetime.now(timezone.utc)
+        with self.app.app_context():
+            for i in range(5):
+                self.add_token(f"expired-{i}", now - timedelta(days=1))
+            self.add_token("live", now + timedelta(days=1))
+
+            old = now - timedelta(hours=2)
+            self.add_otp(old, old + timedelta(minutes=5))
+            self.add_otp(old, now + timedelta(minutes=5), is_used=True)
+            # Recent OTPs are kept so resend limits still see them
+            self.add_otp(now, now - timedelta(minutes=1))
+            self.add_otp(now, now + timedelta(minutes=5))
+
+            for days_ago in (45, 1):
+                db.session.add(ToDoTombstone(
+                    todo_id=days_ago, todo_uid=f"todo-{days_ago}", user_uid=self.user_uid,
+                    change_seq=days_ago, deleted_at=now - timedelta(days=days_ago)
+                ))
+            db.session.commit()
+
+        result = self.runner.invoke(args=["maintenance", "purge-expired", "--batch-size", "2"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("user_tokens: reclaimed 5 rows in 3 batches", result.output)
+        self.assertIn("user_otps: reclaimed 2 rows in 1 batches", result.output)
+        self.assertIn("todo_tombstones: reclaimed 1 rows in 1 batches", result.output)
+
+        with self.app.app_context():
+            self.assertEqual([t.device_uuid for t in UserToken.query.all()], ["live"])
+            self.assertEqual(UserOTP.query.count(), 2)
+            self.assertEqual([t.todo_uid for t in ToDoTombstone.query.all()], ["todo-1"])
+
+    def test_cache_stats_reads_published_server_stats(self):
+        result = self.runner.invoke(args=["maintenance", "cache-stats"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("No server process published cache stats", result.output)
+
+        # What a serving process's publish job stores, with its own counters
+        with self.app.app_context():
+            response_cache.set(self.user_uid, "k", b"[]")
+            MaintenanceManager().publish_cache_stats()
+            db.session.add(CacheStats(process="gone:1", stats="{}", updated_at=datetime.now(timezone.utc) - timedelta(hours=1)))
+            db.session.commit()
+
+        result = self.runner.invoke(args=["maintenance", "cache-stats"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        stats = json.loads(result.output)
+        self.assertEqual(len(stats), 1)
+        (published,) = stats.values()
+        self.assertEqual(published["response_cache"]["entries"], 1)
+        self.assertEqual(published["sms_dispatcher"]["queue_depth"], 0)
+        self.assertIn("latency_p95_ms", published["sms_dispatcher"])
+        self.assertIn("updated_at", published)
+
+
+if __name__ == '__main__':
+    unittest.main()
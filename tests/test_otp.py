@@ -0,0 +1,89 @@
+import json
+import unittest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event
+from app import create_app
+from config import TestConfig
+from extensions import bcrypt
+from models import db, User, UserOTP
+from sql_files.otp_sql import store_otp, consume_phone_verification_otp
+
+class OtpVerificationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        user = User(
+            username="otpuser",
+            first_name="Otp",
+            last_name="User",
+            email="otp@example.com",
+            mobile_number="+919876543210",
+            password=bcrypt.generate_password_hash("OtpPass123@" + self.app.config["PEPPER"]).decode("utf-8"),
+            phone_verified=False
+        )
+        db.session.add(user)
+        db.session.commit()
+        self.user_uid = user.uid
+        store_otp(self.user_uid, "123456", "phone_verification")
+
+        self.headers = {
+            "Content-Type": "application/json",
+            "Device-Name": "test-device",
+            "Device-Uuid": "device-1"
+        }
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def verify(self, otp_code):
+        return self.client.post(
+            "/user/verify-otp",
+            headers=self.headers,
+            data=json.dumps({"user_uid": self.user_uid, "otp_code": otp_code})
+        )
+
+    def test_otp_is_consumed_once(self):
+        self.assertEqual(self.verify("654321").status_code, 400)
+
+        response = self.verify("123456")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.get_json()["user"]["phone_verified"])
+        self.assertTrue(UserOTP.query.filter_by(user_uid=self.user_uid).one().is_used)
+
+        self.assertEqual(self.verify("123456").status_code, 400)
+
+    def test_expired_otp_is_rejected(self):
+        otp = UserOTP.query.filter_by(user_uid=self.user_uid).one()
+        otp.expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+        db.session.commit()
+
+        self.assertIsNone(consume_phone_verification_otp(self.user_uid, "123456"))
+        self.assertFalse(User.query.filter_by(uid=self.user_uid).one().phone_verified)
+
+    def test_consume_is_one_transaction(self):
+        statements = []
+        commits = []
+        engine = db.engine
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        on_commit = lambda session: commits.append(session)
+        event.listen(engine, "before_cursor_execute", listener)
+        event.listen(db.session, "after_commit", on_commit)
+        try:
+            user = consume_phone_verification_otp(self.user_uid, "123456")
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+            event.remove(db.session, "after_commit", on_commit)
+
+        self.assertTrue(user.phone_verified)
+        self.assertEqual(len(commits), 1)
+        self.assertEqual([s.split()[0] for s in statements], ["UPDATE", "UPDATE"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+from twilio.base.exceptions import TwilioRestException
+from app import create_app
+from config import TestConfig
+from marshmallow import ValidationError
+from models import db, PhoneLookup
+from schemas.user_schema import UserSchema
+from services.number_plan import number_plan
+from services.phone_lookup import phone_lookup_cache
+from utils import validate_phone_number
+
+class TrustedRegionConfig(TestConfig):
+    PHONE_LOOKUP_SKIP_REGIONS = "IN, GB, US"
+
+class StubLookupClient:
+    def __init__(self, invalid=()):
+        self.invalid = set(invalid)
+        self.calls = []
+        self.lookups = SimpleNamespace(v2=SimpleNamespace(phone_numbers=self.phone_numbers))
+
+    def phone_numbers(self, number):
+        return SimpleNamespace(fetch=lambda: self.fetch(number))
+
+    def fetch(self, number):
+        self.calls.append(number)
+        if number in self.invalid:
+            raise TwilioRestException(404, "/Lookups", "Not found")
+        return SimpleNamespace(phone_number=number, country_code="IN", valid=True)
+
+class PhoneLookupCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_result_is_cached_in_memory_and_database(self):
+        stub = StubLookupClient()
+        with patch("utils.get_twilio_client", return_value=stub):
+            first = validate_phone_number("+91 98765-43210")
+            second = validate_phone_number("+919876543210")
+            self.assertEqual(first, second)
+            self.assertEqual(stub.calls, ["+919876543210"])
+
+            # A fresh process (empty memory layer) is served from the table
+            phone_lookup_cache.clear()
+            self.assertEqual(validate_phone_number("+919876543210")["number"], "+919876543210")
+            self.assertEqual(len(stub.calls), 1)
+        self.assertTrue(db.session.get(PhoneLookup, "+919876543210").valid)
+
+    def test_invalid_numbers_are_negatively_cached(self):
+        stub = StubLookupClient(invalid=["+910000000000"])
+        with patch("utils.get_twilio_client", return_value=stub):
+            self.assertIsNone(validate_phone_number("+910000000000"))
+            self.assertIsNone(validate_phone_number("+910000000000"))
+        self.assertEqual(len(stub.calls), 1)
+        self.assertFalse(db.session.get(PhoneLookup, "+910000000000").valid)
+
+
+class NumberPlanTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TrustedRegionConfig)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_parse_normalizes_and_checks_length(self):
+        self.assertEqual(number_plan.parse("+44 (20) 7946-0958"), {"number": "+442079460958", "country_code": "GB", "calling_code": "44"})
+        self.assertEqual(number_plan.parse("0014155552671"), {"number": "+14155552671", "country_code": None, "calling_code": "1"})
+        # Impossible NANP area codes and exchanges (leading 0/1, N11, N9X)
+        for number in ("+10155552671", "+14115552671", "+14955552671", "+14151552671", "+14159112671"):
+            self.assertIsNone(number_plan.parse(number), number)
+        self.assertIsNone(number_plan.parse("+91987654321"))
+        self.assertIsNone(number_plan.parse("+1415555267"))
+        self.assertIsNone(number_plan.parse("9876543210"))
+        # Calling codes missing from the table are left to Lookup
+        self.assertEqual(number_plan.parse("+2991234567")["country_code"], None)
+
+    def test_impossible_number_skips_lookup(self):
+        stub = StubLookupClient()
+        with patch("utils.get_twilio_client", return_value=stub):
+            self.assertIsNone(validate_phone_number("+91987654321"))
+        self.assertEqual(stub.calls, [])
+
+    def test_trusted_region_skips_lookup(self):
+        stub = StubLookupClient()
+        with patch("utils.get_twilio_client", return_value=stub):
+            result = validate_phone_number("+91 98765 43210")
+            validate_phone_number("+14155552671")
+            # Trusting US does not cover Canada and the Caribbean, which share calling code 1
+            validate_phone_number("+14165552671")
+        self.assertEqual(result, {"valid": True, "number": "+919876543210", "country_code": "IN"})
+        self.assertEqual(stub.calls, ["+14155552671", "+14165552671"])
+
+    def test_schema_rejects_impossible_number(self):
+        payload = {
+            "username": "planuser",
+            "first_name": "Plan",
+            "last_name": "User",
+            "email": "plan@example.com",
+            "mobile_number": "+91 98765 4321",
+            "password": "PlanPass123@"
+        }
+        with self.assertRaises(ValidationError) as error:
+            UserSchema().load(payload)
+        self.assertIn("mobile_number", error.exception.messages)
+
+        payload["mobile_number"] = "+91 98765-43210"
+        self.assertEqual(UserSchema().load(payload)["mobile_number"], "+919876543210")
+
+
+if __name__ == '__main__':
+    unittest.main()
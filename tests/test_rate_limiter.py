@@ -0,0 +1,108 @@
+import os
+import json
+import tempfile
+import unittest
+from app import create_app
+from config import TestConfig
+from extensions import bcrypt, rate_limiter
+from models import db, User
+from services.rate_limiter import MemoryRateLimitStore, SqliteRateLimitStore
+
+class RateLimitStoreTestCase(unittest.TestCase):
+    def check_sliding_window(self, store):
+        # Three requests late in one window use up the limit
+        for _ in range(3):
+            self.assertTrue(store.hit("k", 3, 100, 190).allowed)
+        rejected = store.hit("k", 3, 100, 190)
+        self.assertFalse(rejected.allowed)
+        self.assertEqual(rejected.retry_after, 44)
+
+        # Early in the next window the previous count still weighs in
+        self.assertFalse(store.hit("k", 3, 100, 210).allowed)
+        self.assertTrue(store.hit("k", 3, 100, 240).allowed)
+        self.assertTrue(store.hit("other", 3, 100, 210).allowed)
+
+        store.reset("k")
+        self.assertEqual(store.hit("k", 3, 100, 240).remaining, 2)
+
+    def test_zero_limit_rejects_without_dividing_by_zero(self):
+        rejected = MemoryRateLimitStore().hit("k", 0, 100, 190)
+        self.assertFalse(rejected.allowed)
+        self.assertEqual(rejected.retry_after, 10)
+
+    def test_memory_store(self):
+        self.check_sliding_window(MemoryRateLimitStore())
+
+    def test_sqlite_store_is_shared(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "ratelimit.db")
+            self.check_sliding_window(SqliteRateLimitStore(path))
+
+            # A second store on the same file sees the first one's counters, as another worker would
+            first, second = SqliteRateLimitStore(path), SqliteRateLimitStore(path)
+            first.reset()
+            self.assertTrue(first.hit("shared", 2, 100, 10).allowed)
+            self.assertTrue(second.hit("shared", 2, 100, 10).allowed)
+            self.assertFalse(first.hit("shared", 2, 100, 10).allowed)
+
+class OtpRateLimitTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        user = User(
+            username="limituser",
+            first_name="Limit",
+            last_name="User",
+            email="limit@example.com",
+            mobile_number="+919876543210",
+            password=bcrypt.generate_password_hash("LimitPass123@" + self.app.config["PEPPER"]).decode("utf-8"),
+            phone_verified=False
+        )
+        db.session.add(user)
+        db.session.commit()
+        self.user_uid = user.uid
+        self.headers = {
+            "Content-Type": "application/json",
+            "Device-Name": "test-device",
+            "Device-Uuid": "device-1"
+        }
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def post(self, path, payload):
+        return self.client.post(path, headers=self.headers, data=json.dumps(payload))
+
+    def test_resend_otp_is_limited(self):
+        for _ in range(self.app.config["OTP_RESEND_LIMIT"]):
+            self.assertEqual(self.post("/user/resend-otp", {"user_uid": self.user_uid}).status_code, 200)
+
+        response = self.post("/user/resend-otp", {"user_uid": self.user_uid})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response.headers["Retry-After"]), 0)
+
+    def test_zero_limit_answers_429(self):
+        self.app.config["OTP_RESEND_LIMIT"] = 0
+        response = self.post("/user/resend-otp", {"user_uid": self.user_uid})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response.headers["Retry-After"]), 0)
+
+    def test_verify_otp_decorator(self):
+        payload = {"user_uid": self.user_uid, "otp_code": "000000"}
+        for _ in range(self.app.config["OTP_VERIFY_LIMIT"]):
+            self.assertEqual(self.post("/user/verify-otp", payload).status_code, 400)
+
+        response = self.post("/user/verify-otp", payload)
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response.headers)
+        self.assertEqual(rate_limiter.rejected, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
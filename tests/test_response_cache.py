@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+from services.response_cache import ResponseCache, SqliteResponseCacheBackend
+
+def render(body):
+    return lambda: (body, None)
+
+class ResponseCacheTestCase(unittest.TestCase):
+    def test_lru_is_bounded_by_bytes(self):
+        cache = ResponseCache(max_bytes=100)
+        cache.set("user-a", "k1", b"x" * 40)
+        cache.set("user-a", "k2", b"x" * 40)
+        self.assertIsNotNone(cache.get("user-a", "k1"))   # k1 is now most recently used
+        cache.set("user-b", "k3", b"x" * 40)
+
+        self.assertIsNone(cache.get("user-a", "k2"))
+        self.assertIsNotNone(cache.get("user-a", "k1"))
+        stats = cache.stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertLessEqual(stats["bytes"], 100)
+
+        # Replacing an entry does not count its old body twice
+        cache.set("user-a", "k1", b"x" * 40)
+        self.assertEqual(cache.stats()["bytes"], stats["bytes"])
+
+    def test_errors_are_not_cached(self):
+        cache = ResponseCache()
+        self.assertEqual(cache.get_or_render("user-a", "k", lambda: (None, "User not found")), (None, "User not found"))
+        self.assertEqual(cache.get_or_render("user-a", "k", render(b"[]")), (b"[]", None))
+        self.assertEqual(cache.get_or_render("user-a", "k", render(b"changed")), (b"[]", None))
+        self.assertEqual(cache.stats()["hit_ratio"], 1 / 3)
+
+    def test_shared_backend_across_workers(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "response_cache.db")
+            first, second = ResponseCache(), ResponseCache()
+            first.backend = SqliteResponseCacheBackend(path)
+            second.backend = SqliteResponseCacheBackend(path)
+
+            first.get_or_render("user-a", "k", render(b"[1]"))
+            self.assertEqual(second.get_or_render("user-a", "k", render(b"[2]")), (b"[1]", None))
+            self.assertEqual(second.stats()["backend_hits"], 1)
+
+            first.clear()
+            second._clear_local()
+            self.assertIsNone(second.get("user-a", "k"))
+
+    def test_shared_backend_evicts_oldest_entries(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            backend = SqliteResponseCacheBackend(os.path.join(tmp, "response_cache.db"), max_bytes=100, prune_every=3)
+            backend.set("user-a", "k1", b"x" * 40)
+            backend.set("user-a", "k2", b"x" * 40)
+            backend.set("user-a", "k3", b"x" * 40)
+            # The third write pruned the oldest entry beyond 100 bytes
+            self.assertIsNone(backend.get("user-a", "k1"))
+            self.assertEqual(backend.get("user-a", "k3"), b"x" * 40)
+            self.assertEqual(backend.prune(), 0)
+            rows = backend._connect().execute("SELECT key FROM response_cache ORDER BY stored_at").fetchall()
+            self.assertEqual([row[0] for row in rows], ["k2", "k3"])
+
+if __name__ == '__main__':
+    unittest.main()
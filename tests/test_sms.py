@@ -0,0 +1,156 @@
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+from datetime import datetime, timedelta, timezone
+from twilio.base.exceptions import TwilioRestException
+from app import create_app
+from config import TestConfig
+from models import db, SmsOutbox
+from services.sms_dispatcher import sms_dispatcher
+from services.sms_providers import TwilioSmsProvider
+from twilio_client import sms_breaker
+from sql_files.sms_sql import REDACTED_BODY
+from manager.maintenance_manager import MaintenanceManager
+from utils import send_otp_sms, send_welcome_sms
+
+class SmsOutboxTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.provider = sms_dispatcher.provider
+
+    def tearDown(self):
+        sms_dispatcher.stop()
+        sms_breaker.reset()
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_request_path_only_enqueues(self):
+        result = send_otp_sms("+919876543210", "123456")
+        self.assertTrue(result["success"])
+        self.assertEqual(self.provider.sent, [])
+        self.assertEqual(sms_dispatcher.stats()["queue_depth"], 1)
+
+        self.assertEqual(sms_dispatcher.dispatch_due(), 1)
+        self.assertEqual(len(self.provider.sent), 1)
+        self.assertIn("123456", self.provider.sent[0]["body"])
+
+        message = db.session.get(SmsOutbox, result["outbox_id"])
+        self.assertEqual(message.status, "sent")
+        self.assertEqual(message.provider_message_id, self.provider.sent[0]["message_id"])
+        self.assertEqual(sms_dispatcher.stats()["queue_depth"], 0)
+
+    def test_failed_send_is_retried_with_backoff(self):
+        outbox_id = send_welcome_sms("+919876543210", "Test")["outbox_id"]
+        self.provider.fail_next = 1
+
+        sms_dispatcher.dispatch_due()
+        message = db.session.get(SmsOutbox, outbox_id)
+        self.assertEqual((message.status, message.attempts), ("pending", 1))
+        self.assertGreater(message.next_attempt_at, datetime.now(timezone.utc).replace(tzinfo=None))
+
+        # Not due yet, so nothing is claimed
+        self.assertEqual(sms_dispatcher.dispatch_due(), 0)
+
+        message.next_attempt_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+        db.session.commit()
+        sms_dispatcher.dispatch_due()
+        db.session.refresh(message)
+        self.assertEqual(message.status, "sent")
+        self.assertEqual(sms_dispatcher.stats()["retried"], 1)
+
+    def test_message_fails_after_max_attempts(self):
+        outbox_id = send_welcome_sms("+919876543210", "Test")["outbox_id"]
+        sms_dispatcher.max_attempts = 1
+        self.provider.fail_next = 1
+
+        sms_dispatcher.dispatch_due()
+        message = db.session.get(SmsOutbox, outbox_id)
+        self.assertEqual(message.status, "failed")
+        self.assertIn("Fake SMS provider failure", message.last_error)
+
+    def test_open_breaker_defers_without_using_an_attempt(self):
+        outbox_id = send_welcome_sms("+919876543210", "Test")["outbox_id"]
+        sms_dispatcher.provider = TwilioSmsProvider("+15005550006")
+        sms_breaker.state, sms_breaker.opened_at = "open", time.monotonic()
+        create = lambda **kwargs: self.fail("Twilio called while the circuit is open")
+
+        # Far more dispatch rounds than max_attempts; none of them may count
+        with patch("services.sms_providers.get_twilio_client", return_value=SimpleNamespace(messages=SimpleNamespace(create=create))):
+            for _ in range(sms_dispatcher.max_attempts + 1):
+                sms_dispatcher.dispatch_due()
+                message = db.session.get(SmsOutbox, outbox_id)
+                message.next_attempt_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+                db.session.commit()
+
+        sms_dispatcher.dispatch_due()
+        db.session.refresh(message)
+        self.assertEqual((message.status, message.attempts), ("pending", 0))
+        self.assertGreater(message.next_attempt_at, datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(seconds=25))
+        self.assertEqual(sms_dispatcher.stats()["retried"], 0)
+
+    def test_client_error_fails_without_retrying(self):
+        outbox_id = send_welcome_sms("+919876543210", "Test")["outbox_id"]
+        sms_dispatcher.provider = TwilioSmsProvider("+15005550006")
+
+        def create(**kwargs):
+            raise TwilioRestException(400, "/Messages", "The 'To' number is not a valid phone number")
+
+        with patch("services.sms_providers.get_twilio_client", return_value=SimpleNamespace(messages=SimpleNamespace(create=create))):
+            sms_dispatcher.dispatch_due()
+        message = db.session.get(SmsOutbox, outbox_id)
+        self.assertEqual((message.status, message.attempts), ("failed", 1))
+        self.assertEqual(sms_breaker.state, "closed")
+
+    def test_background_dispatcher_sends_queued_messages(self):
+        sms_dispatcher.poll_interval = 0.05
+        sms_dispatcher.start()
+        send_otp_sms("+919876543210", "654321")
+
+        deadline = time.time() + 5
+        while not self.provider.sent and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(len(self.provider.sent), 1)
+        self.assertIsNotNone(sms_dispatcher.stats()["latency_p50_ms"])
+
+    def test_sent_and_failed_bodies_are_redacted_and_purged(self):
+        sent_id = send_otp_sms("+919876543210", "123456")["outbox_id"]
+        sms_dispatcher.dispatch_due()
+        failed_id = send_otp_sms("+919876543210", "654321")["outbox_id"]
+        sms_dispatcher.max_attempts = 1
+        self.provider.fail_next = 1
+        sms_dispatcher.dispatch_due()
+        pending_id = send_otp_sms("+919876543210", "111111")["outbox_id"]
+
+        bodies = {message.id: message.body for message in SmsOutbox.query.all()}
+        self.assertEqual(bodies[sent_id], REDACTED_BODY)
+        self.assertEqual(bodies[failed_id], REDACTED_BODY)
+        self.assertIn("111111", bodies[pending_id])
+
+        # Finished messages are purged once past their retention, pending ones are kept
+        SmsOutbox.query.update({"created_at": datetime.now(timezone.utc) - timedelta(days=2)})
+        db.session.commit()
+        report = MaintenanceManager().purge_expired()
+        self.assertEqual(report["sms_outbox"]["rows"], 2)
+        self.assertEqual([message.id for message in SmsOutbox.query.all()], [pending_id])
+
+    def test_dispatcher_starts_with_the_first_request_only(self):
+        config = type("ServerConfig", (TestConfig,), {
+            "TESTING": False, "SMS_DISPATCHER_ENABLED": True, "CACHE_STATS_INTERVAL_SECONDS": 0,
+            "SMS_POLL_INTERVAL_SECONDS": 60
+        })
+        app = create_app(config)
+        result = app.test_cli_runner().invoke(args=["maintenance", "cache-stats"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIsNone(sms_dispatcher._thread)
+
+        app.test_client().get("/todo/gettodo")
+        self.assertIsNotNone(sms_dispatcher._thread)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,537 @@
+import json
+import base64
+import time
+import unittest
+from unittest.mock import patch
+from datetime import datetime, timedelta, timezone
+from app import create_app
+from config import TestConfig
+from extensions import bcrypt, user_cache, response_cache
+from sqlalchemy import event, text
+from models import db, User, ToDo
+from manager.todo_manager import ToDoManager
+from flask.json.provider import DefaultJSONProvider
+from schemas.compiled_schema import iso_datetime
+from schemas.todo_schema import ToDoQuerySchema, ToDoResponseSchema
+from sql_files.todo_sql import _todos_query, bulk_insert_todos
+from utils import encode_sync_cursor
+
+class TodoApiTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            password = "TodoPass123@" + self.app.config["PEPPER"]
+            user = User(
+                username="todouser",
+                first_name="Todo",
+                last_name="User",
+                email="todo@example.com",
+                mobile_number="+919876543210",
+                password=bcrypt.generate_password_hash(password).decode("utf-8"),
+                phone_verified=True
+            )
+            db.session.add(user)
+            db.session.commit()
+            self.user_uid = user.uid
+
+        headers = {
+            "Content-Type": "application/json",
+            "Device-Name": "test-device",
+            "Device-Uuid": "device-1"
+        }
+        response = self.client.post(
+            "/user/login",
+            headers=headers,
+            data=json.dumps({"email": "todo@example.com", "password": "TodoPass123@"})
+        )
+        self.auth_headers = dict(headers, Authorization=f"Bearer {response.get_json()['access_token']}")
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def add_todos(self, created_ats):
+        with self.app.app_context():
+            todos = [
+                ToDo(task=f"Task {i}", description="Seeded", user_uid=self.user_uid, created_at=created_at)
+                for i, created_at in enumerate(created_ats)
+            ]
+            db.session.add_all(todos)
+            db.session.commit()
+            return [todo.uid for todo in todos]
+
+    def get_todos(self, query=""):
+        return self.client.get(f"/todo/gettodo{query}", headers=self.auth_headers)
+
+    def test_keyset_pages_cover_every_todo_once(self):
+        base = datetime(2025, 1, 1, 12, 0, 0)
+        # Two pairs share a created_at, so the id tie-breaker matters
+        uids = self.add_todos([base, base, base + timedelta(minutes=1), base + timedelta(minutes=1), base + timedelta(minutes=2)])
+
+        seen = []
+        response = self.get_todos("?limit=2")
+        while True:
+            self.assertEqual(response.status_code, 200)
+            body = response.get_json()
+            self.assertLessEqual(len(body["todos"]), 2)
+            seen.extend(todo["uid"] for todo in body["todos"])
+            if not body["next_cursor"]:
+                break
+            response = self.get_todos(f"?limit=2&cursor={body['next_cursor']}")
+
+        self.assertEqual(seen, list(reversed(uids)))
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.get_todos("?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("cursor", response.get_json()["details"])
+
+    def test_unpaginated_list_is_capped(self):
+        self.app.config["TODO_UNPAGINATED_LIMIT"] = 3
+        self.add_todos([datetime(2025, 1, 1) + timedelta(minutes=i) for i in range(5)])
+
+        response = self.get_todos()
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.get_json(), list)
+        self.assertEqual([todo["task"] for todo in response.get_json()], ["Task 4", "Task 3", "Task 2"])
+
+    def test_date_filters_use_timezone_day_boundaries(self):
+        # 2025-03-01 in Asia/Kolkata (UTC+5:30) is [2025-02-28 18:30, 2025-03-01 18:30) UTC
+        self.add_todos([
+            datetime(2025, 2, 28, 18, 29),
+            datetime(2025, 2, 28, 18, 30),
+            datetime(2025, 3, 1, 18, 29),
+            datetime(2025, 3, 1, 18, 30),
+        ])
+
+        tasks = lambda response: sorted(todo["task"] for todo in response.get_json())
+        self.assertEqual(tasks(self.get_todos("?date=2025-03-01&tz=Asia/Kolkata")), ["Task 1", "Task 2"])
+        self.assertEqual(tasks(self.get_todos("?date=2025-03-01")), ["Task 2", "Task 3"])
+        self.assertEqual(tasks(self.get_todos("?from=2025-02-28&to=2025-03-01")), ["Task 0", "Task 1", "Task 2", "Task 3"])
+        self.assertEqual(tasks(self.get_todos("?from=2025-03-01&tz=Asia/Kolkata")), ["Task 1", "Task 2", "Task 3"])
+
+        self.assertEqual(self.get_todos("?date=2025-03-01&tz=Mars/Olympus").status_code, 400)
+        self.assertEqual(self.get_todos("?from=2025-03-02&to=2025-03-01").status_code, 400)
+
+    def test_date_range_uses_index(self):
+        params = ToDoQuerySchema().load({"date": "2025-03-01", "tz": "Asia/Kolkata"})
+        with self.app.app_context():
+            statement = _todos_query(self.user_uid, params["created_range"]).statement
+            query = str(statement.compile(db.engine, compile_kwargs={"literal_binds": True}))
+            plan = db.session.execute(text("EXPLAIN QUERY PLAN " + query)).fetchall()
+        self.assertIn("USING INDEX ix_todo_user_created_id", plan[0][-1])
+        self.assertIn("created_at>? AND created_at<?", plan[0][-1])
+
+    def count_queries(self, request):
+        statements = []
+        with self.app.app_context():
+            engine = db.engine
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            response = request()
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+        return response, statements
+
+    def assertTodoWrite(self, statements, verb, *followups):
+        # The list version bump, which also hands out the change sequence, then one statement on todo
+        # and any followups, all in the same transaction
+        self.assertEqual(len(statements), 2 + len(followups), statements)
+        self.assertIn("todo_version", statements[0])
+        self.assertTrue(statements[1].startswith(verb), statements)
+        for statement, followup in zip(statements[2:], followups):
+            self.assertTrue(statement.startswith(followup), statements)
+
+    def test_todo_endpoints_skip_user_lookup(self):
+        # The first request verifies the token and the user; later ones are served from the caches
+        self.assertEqual(self.get_todos().status_code, 200)
+
+        response, statements = self.count_queries(lambda: self.client.post(
+            "/todo/create",
+            headers=self.auth_headers,
+            data=json.dumps({"task": "Count", "description": "Queries"})
+        ))
+        self.assertEqual(response.status_code, 201)
+        self.assertTodoWrite(statements, "INSERT INTO todo ", "INSERT INTO todo_fts")
+
+        # The list version lookup, then the list itself
+        response, statements = self.count_queries(self.get_todos)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(statements), 2, statements)
+
+    def test_deleted_user_is_rejected(self):
+        self.assertEqual(self.get_todos().status_code, 200)
+        self.assertTrue(user_cache.exists(self.user_uid))
+
+        with self.app.app_context():
+            db.session.delete(User.query.filter_by(uid=self.user_uid).one())
+            db.session.commit()
+        self.assertIsNone(user_cache.exists(self.user_uid))
+
+        response = self.get_todos()
+        self.assertEqual(response.status_code, 401)
+
+    def test_foreign_key_guards_todo_insert(self):
+        with self.app.app_context():
+            todo, error = ToDoManager().create("Orphan", "No owner", "missing-user")
+        self.assertIsNone(todo)
+        self.assertEqual(error, "User does not exist")
+
+    def test_bulk_create_update_delete(self):
+        response = self.client.post(
+            "/todo/bulk-create",
+            headers=self.auth_headers,
+            data=json.dumps([{"task": f"Bulk {i}", "description": "Offline edit"} for i in range(3)])
+        )
+        self.assertEqual(response.status_code, 201)
+        results = response.get_json()["results"]
+        self.assertEqual([result["status"] for result in results], ["created"] * 3)
+        uids = [result["todo_uid"] for result in results]
+
+        response, statements = self.count_queries(lambda: self.client.put(
+            "/todo/bulk-update",
+            headers=self.auth_headers,
+            data=json.dumps([
+                {"todo_uid": uids[0], "status": "completed"},
+                {"todo_uid": uids[1], "task": "Renamed", "description": "Changed"},
+                {"todo_uid": "missing", "status": "completed"},
+            ])
+        ))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result["status"] for result in response.get_json()["results"]], ["updated", "updated", "not_found"])
+        # One SELECT for ownership, the version bump, one executemany per distinct column set,
+        # then the full-text index update for the renamed item only
+        self.assertEqual(len(statements), 5, statements)
+        self.assertTrue(statements[-1].startswith("UPDATE todo_fts"), statements)
+
+        with self.app.app_context():
+            todos = {todo.uid: todo for todo in ToDo.query.all()}
+            self.assertEqual(todos[uids[0]].status, "completed")
+            self.assertEqual(todos[uids[0]].task, "Bulk 0")
+            self.assertEqual((todos[uids[1]].task, todos[uids[1]].description), ("Renamed", "Changed"))
+
+        response = self.client.delete(
+            "/todo/bulk-delete",
+            headers=self.auth_headers,
+            data=json.dumps({"todo_uids": [uids[0], uids[2], "missing"]})
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result["status"] for result in response.get_json()["results"]], ["deleted", "deleted", "not_found"])
+        with self.app.app_context():
+            self.assertEqual([todo.uid for todo in ToDo.query.all()], [uids[1]])
+
+    def test_bulk_validation_reports_item_index(self):
+        response = self.client.put(
+            "/todo/bulk-update",
+            headers=self.auth_headers,
+            data=json.dumps([{"todo_uid": "a", "status": "completed"}, {"todo_uid": "b", "status": "done"}])
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.get_json()["details"]), ["1"])
+
+        self.app.config["TODO_BULK_MAX_ITEMS"] = 2
+        response = self.client.post(
+            "/todo/bulk-create",
+            headers=self.auth_headers,
+            data=json.dumps([{"task": "Too", "description": "Many"}] * 3)
+        )
+        self.assertEqual(response.status_code, 400)
+        with self.app.app_context():
+            self.assertEqual(ToDo.query.count(), 0)
+
+    def test_bulk_server_errors_return_500(self):
+        with patch("manager.todo_manager.bulk_delete_todos", side_effect=RuntimeError("database is locked")):
+            response = self.client.delete("/todo/bulk-delete", headers=self.auth_headers, data=json.dumps({"todo_uids": ["a"]}))
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.get_json(), {"error": "Internal server error"})
+
+    def test_single_update_and_delete_run_one_statement(self):
+        self.assertEqual(self.get_todos().status_code, 200)
+        uid = self.add_todos([datetime(2025, 1, 1)])[0]
+
+        response, statements = self.count_queries(lambda: self.client.put(
+            f"/todo/update?todo_uid={uid}",
+            headers=self.auth_headers,
+            data=json.dumps({"status": "completed"})
+        ))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["todo"]["status"], "completed")
+        self.assertEqual(response.get_json()["todo"]["task"], "Task 0")
+        self.assertTodoWrite(statements, "UPDATE todo")
+        self.assertNotIn("task", statements[1].split("SET")[1].split("WHERE")[0])
+
+        response, statements = self.count_queries(lambda: self.client.delete(f"/todo/delete?todo_uid={uid}", headers=self.auth_headers))
+        self.assertEqual(response.status_code, 200)
+        self.assertTodoWrite(statements, "DELETE FROM todo", "INSERT INTO todo_tombstones", "DELETE FROM todo_fts")
+
+        self.assertEqual(self.client.delete(f"/todo/delete?todo_uid={uid}", headers=self.auth_headers).status_code, 404)
+        response = self.client.put(f"/todo/update?todo_uid={uid}", headers=self.auth_headers, data=json.dumps({"status": "completed"}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_unchanged_list_returns_304(self):
+        self.assertEqual(self.get_todos().status_code, 200)
+        response = self.get_todos()
+        etag = response.headers["ETag"]
+
+        response, statements = self.count_queries(
+            lambda: self.client.get("/todo/gettodo", headers=dict(self.auth_headers, **{"If-None-Match": etag}))
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+        self.assertEqual(response.headers["ETag"], etag)
+        self.assertEqual(len(statements), 1, statements)
+        self.assertIn("todo_version", statements[0])
+
+        # Proxies that compress the body weaken the ETag; If-None-Match uses weak comparison
+        weak = self.client.get("/todo/gettodo", headers=dict(self.auth_headers, **{"If-None-Match": f"W/{etag}"}))
+        self.assertEqual(weak.status_code, 304)
+
+        uid = self.client.post(
+            "/todo/create",
+            headers=self.auth_headers,
+            data=json.dumps({"task": "New", "description": "Changes the list"})
+        ).get_json()["todo_uid"]
+        for write in (
+            lambda: self.client.put(f"/todo/update?todo_uid={uid}", headers=self.auth_headers, data=json.dumps({"status": "completed"})),
+            lambda: self.client.delete(f"/todo/delete?todo_uid={uid}", headers=self.auth_headers),
+            lambda: None,
+        ):
+            response = self.client.get("/todo/gettodo?limit=10", headers=dict(self.auth_headers, **{"If-None-Match": etag}))
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response.headers["ETag"], etag)
+            etag = response.headers["ETag"]
+            write()
+
+    def test_list_is_served_from_response_cache(self):
+        self.add_todos([datetime(2025, 1, 1)])
+        first = self.get_todos("?limit=5")
+        self.assertEqual(first.status_code, 200)
+
+        response, statements = self.count_queries(lambda: self.get_todos("?limit=5"))
+        self.assertEqual(response.data, first.data)
+        # Only the list version is read; the body comes from the cache
+        self.assertEqual(len(statements), 1, statements)
+        stats = response_cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertGreater(stats["bytes"], len(first.data))
+
+        # Arguments the query schema ignores, like cache busters, share the entry
+        self.assertEqual(self.get_todos("?limit=5&_=1700000000").data, first.data)
+        self.assertEqual(response_cache.stats()["entries"], 1)
+
+        # A write bumps the list version, so the next request renders under a new key
+        self.client.post("/todo/create", headers=self.auth_headers, data=json.dumps({"task": "New", "description": "Item"}))
+        self.assertEqual(len(self.get_todos("?limit=5").get_json()["todos"]), 2)
+        stats = response_cache.stats()
+        self.assertEqual((stats["misses"], stats["entries"]), (2, 2))
+
+    def test_write_from_another_worker_is_never_served_from_cache(self):
+        self.add_todos([datetime(2025, 1, 1)])
+        first = self.get_todos()
+        self.assertEqual(self.get_todos().data, first.data)
+
+        # Written straight through the SQL layer, as another worker would: nothing here is told to drop
+        # the cached body, yet the bumped version keys the next request to a fresh render
+        with self.app.app_context():
+            bulk_insert_todos(self.user_uid, [{"task": "Other worker", "description": None}])
+        tasks = [todo["task"] for todo in self.get_todos().get_json()]
+        self.assertIn("Other worker", tasks)
+        self.assertEqual(response_cache.stats()["hits"], 1)
+
+    def test_stream_matches_buffered_list(self):
+        self.add_todos([datetime(2025, 1, 1) + timedelta(minutes=i) for i in range(7)])
+        self.app.config["TODO_STREAM_BATCH_SIZE"] = 3
+
+        buffered = self.get_todos("?from=2025-01-01")
+        streamed = self.get_todos("?from=2025-01-01&stream=true")
+        self.assertEqual(streamed.status_code, 200)
+        self.assertTrue(streamed.is_streamed)
+        self.assertEqual(streamed.data, buffered.data)
+        self.assertEqual(streamed.headers["ETag"], buffered.headers["ETag"])
+
+        self.assertEqual(self.get_todos("?stream=true").data, self.get_todos().data)
+        self.assertEqual(self.get_todos("?stream=true&limit=5").status_code, 400)
+
+        # An empty list still streams valid JSON
+        self.assertEqual(self.get_todos("?date=2030-01-01&stream=true").get_json(), [])
+
+
+    def test_compiled_serializer_matches_schema_and_stdlib_json(self):
+        uids = self.add_todos([datetime(2025, 1, 1, 9, 30, 15, 250000), datetime(2025, 1, 2), datetime(2025, 1, 3)])
+        with self.app.app_context():
+            todo = ToDo.query.filter_by(uid=uids[1]).one()
+            todo.task, todo.description = "Café ☕ \u2028 \"quoted\"", None
+            ToDo.query.filter_by(uid=uids[0]).one().task = "Bell \x07 and DEL \x7f"
+            db.session.commit()
+            todos = ToDo.query.order_by(ToDo.created_at.desc(), ToDo.id.desc()).all()
+            expected_list = DefaultJSONProvider(self.app).response(ToDoResponseSchema(many=True).dump(todos)).get_data()
+
+        self.assertEqual(self.get_todos().data, expected_list)
+        self.assertEqual(self.get_todos("?stream=true").data, expected_list)
+        self.assertEqual(json.loads(self.get_todos("?limit=2").data)["todos"], json.loads(expected_list)[:2])
+
+        response = self.client.put(f"/todo/update?todo_uid={uids[1]}", headers=self.auth_headers, data=json.dumps({"status": "completed"}))
+        self.assertEqual(response.status_code, 200)
+        with self.app.app_context():
+            expected_item = ToDoResponseSchema().dump(ToDo.query.filter_by(uid=uids[1]).one())
+        self.assertEqual(response.get_json()["todo"], expected_item)
+
+        # Values orjson writes differently from the stdlib encoder still come out identical
+        payload = {"floats": [1e16, 1e-7, 0.1, -0.0, float("nan"), float("inf")], "text": "del \x7f", "n": 2 ** 70}
+        with self.app.app_context():
+            self.assertEqual(
+                self.app.json.response(payload).get_data(), DefaultJSONProvider(self.app).response(payload).get_data()
+            )
+
+        # Equal aware datetimes in different zones keep their own offsets
+        utc = datetime(2025, 1, 1, 12, tzinfo=timezone.utc)
+        ist = utc.astimezone(timezone(timedelta(hours=5, minutes=30)))
+        self.assertEqual([iso_datetime(utc), iso_datetime(ist)], [utc.isoformat(), ist.isoformat()])
+
+
+    def test_sparse_fieldset_selects_only_requested_columns(self):
+        uids = self.add_todos([datetime(2025, 1, 1) + timedelta(minutes=i) for i in range(3)])
+        self.assertEqual(self.get_todos().status_code, 200)
+
+        response, statements = self.count_queries(lambda: self.get_todos("?fields=status, task,uid"))
+        self.assertEqual(response.status_code, 200)
+        expected = [{"uid": uid, "task": f"Task {i}", "status": "in progress"} for i, uid in enumerate(uids)]
+        self.assertEqual(response.get_json(), expected[::-1])
+        select_list = statements[-1].split(" FROM ")[0]
+        self.assertIn("todo.task", select_list)
+        self.assertNotIn("description", select_list)
+
+        # Pages still get a cursor, and streams the same bytes
+        page = self.get_todos("?fields=uid&limit=2").get_json()
+        self.assertEqual(page["todos"], [{"uid": uids[2]}, {"uid": uids[1]}])
+        rest = self.get_todos(f"?fields=uid&limit=2&cursor={page['next_cursor']}").get_json()
+        self.assertEqual(rest["todos"], [{"uid": uids[0]}])
+        self.assertEqual(self.get_todos("?fields=uid,task&stream=true").data, self.get_todos("?fields=uid,task").data)
+
+        response = self.get_todos("?fields=uid,password")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("fields", response.get_json()["details"])
+        self.assertEqual(self.get_todos("?fields=,").status_code, 400)
+
+
+    def get_changes(self, since=None, limit=None):
+        query = "&".join(f"{name}={value}" for name, value in (("since", since), ("limit", limit)) if value)
+        response = self.client.get(f"/todo/changes?{query}", headers=self.auth_headers)
+        self.assertEqual(response.status_code, 200, response.get_json())
+        return response.get_json()
+
+    def test_change_feed_returns_only_changes_after_cursor(self):
+        uids = self.add_todos([datetime(2025, 1, 1) + timedelta(minutes=i) for i in range(3)])
+
+        # Full sync in pages, then nothing new
+        first = self.get_changes(limit=2)
+        self.assertEqual(([todo["uid"] for todo in first["todos"]], first["deleted"], first["has_more"]), (uids[:2], [], True))
+        second = self.get_changes(first["next_cursor"], limit=2)
+        self.assertEqual(([todo["uid"] for todo in second["todos"]], second["has_more"]), (uids[2:], False))
+        cursor = second["next_cursor"]
+        self.assertEqual(self.get_changes(cursor), {"todos": [], "deleted": [], "next_cursor": cursor, "has_more": False})
+
+        self.client.put(f"/todo/update?todo_uid={uids[1]}", headers=self.auth_headers, data=json.dumps({"status": "completed"}))
+        self.client.delete(f"/todo/delete?todo_uid={uids[0]}", headers=self.auth_headers)
+        created = self.client.post("/todo/create", headers=self.auth_headers, data=json.dumps({"task": "New", "description": "Item"}))
+        new_uid = created.get_json()["todo_uid"]
+
+        changes = self.get_changes(cursor)
+        self.assertEqual([(todo["uid"], todo["status"]) for todo in changes["todos"]], [(uids[1], "completed"), (new_uid, "in progress")])
+        self.assertEqual(changes["deleted"], [uids[0]])
+        self.assertFalse(changes["has_more"])
+
+        # Paging one change at a time interleaves updates and deletions in write order
+        seen, since = [], cursor
+        while True:
+            page = self.get_changes(since, limit=1)
+            seen.extend([todo["uid"] for todo in page["todos"]] + [f"-{uid}" for uid in page["deleted"]])
+            since = page["next_cursor"]
+            if not page["has_more"]:
+                break
+        self.assertEqual(seen, [uids[1], f"-{uids[0]}", new_uid])
+        self.assertEqual(self.get_changes(since)["todos"], [])
+
+    def test_change_feed_rejects_bad_and_expired_cursors(self):
+        response = self.client.get("/todo/changes?since=not-a-cursor", headers=self.auth_headers)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("since", response.get_json()["details"])
+
+        retention = self.app.config["TODO_TOMBSTONE_RETENTION_DAYS"] * 86400
+        expired = encode_sync_cursor(1, 1, time.time() - retention - 60)
+        response = self.client.get(f"/todo/changes?since={expired}", headers=self.auth_headers)
+        self.assertEqual(response.status_code, 410)
+
+
+    def search(self, query):
+        return self.client.get(f"/todo/search?{query}", headers=self.auth_headers)
+
+    def test_search_ranks_matches_and_follows_writes(self):
+        created = self.client.post(
+            "/todo/bulk-create",
+            headers=self.auth_headers,
+            data=json.dumps([
+                {"task": "Buy milk", "description": "From the corner shop"},
+                {"task": "Call plumber", "description": "Ask about the milk stain under the sink"},
+                {"task": "Café visit", "description": "Try the milkshake"},
+                {"task": "Pay rent", "description": "Before Friday"},
+            ])
+        )
+        uids = [result["todo_uid"] for result in created.get_json()["results"]]
+        found = lambda query: [todo["uid"] for todo in self.search(query).get_json()["todos"]]
+
+        # Task matches outrank description matches; whole words match, case and accents ignored
+        self.assertEqual(found("q=milk"), uids[:2])
+        self.assertEqual(found("q=milkshake"), [uids[2]])
+        self.assertEqual(found("q=CAFE"), [uids[2]])
+        self.assertEqual(found("q=milk+stain"), [uids[1]])
+        # Query syntax characters in q are ignored rather than breaking the MATCH expression
+        self.assertEqual(found("q=%22milk%22%2A+("), found("q=milk"))
+
+        # Pages cover every match once, in rank order
+        seen, response = [], self.search("q=the&limit=2")
+        while True:
+            body = response.get_json()
+            seen.extend(todo["uid"] for todo in body["todos"])
+            if not body["next_cursor"]:
+                break
+            response = self.search(f"q=the&limit=2&cursor={body['next_cursor']}")
+        self.assertEqual(seen, found("q=the"))
+        self.assertEqual(set(seen), set(uids[:3]))
+
+        # A cursor carries no score, only continues its own query, and expires once the list changes
+        cursor = self.search("q=the&limit=2").get_json()["next_cursor"]
+        position = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        self.assertFalse(any(isinstance(value, float) for value in position))
+        self.assertEqual(self.search(f"q=milk&limit=2&cursor={cursor}").status_code, 400)
+        self.client.put(f"/todo/update?todo_uid={uids[2]}", headers=self.auth_headers, data=json.dumps({"status": "completed"}))
+        self.assertEqual(self.search(f"q=the&limit=2&cursor={cursor}").status_code, 410)
+
+        # The index follows updates and deletes
+        self.client.put(f"/todo/update?todo_uid={uids[3]}", headers=self.auth_headers, data=json.dumps({"description": "Milk money"}))
+        self.client.delete(f"/todo/delete?todo_uid={uids[0]}", headers=self.auth_headers)
+        self.assertEqual(set(found("q=milk")), {uids[1], uids[3]})
+        self.assertEqual(found("q=friday"), [])
+
+        # Other users' todos are never matched
+        with self.app.app_context():
+            other = User(
+                username="other", first_name="Other", last_name="User", email="other@example.com",
+                mobile_number="+919876543211", password="x", phone_verified=True
+            )
+            db.session.add(other)
+            db.session.commit()
+            bulk_insert_todos(other.uid, [{"task": "Milk for the cat", "description": None}])
+        self.assertEqual(len(found("q=milk")), 2)
+
+        self.assertEqual(self.search("q=%21%21").status_code, 400)
+        self.assertEqual(self.search("").status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,12 +1,41 @@
 from twilio.rest import Client
-import os
+from twilio.http.http_client import TwilioHttpClient
+from twilio.base.exceptions import TwilioRestException
+from services.circuit_breaker import CircuitBreaker
 
-account_sid = os.getenv("TWILIO_ACCOUNT_SID")
-auth_token = os.getenv("TWILIO_AUTH_TOKEN")
-twilio_client = Client(account_sid, auth_token)
+# Built from the app config by configure_twilio_breakers
+twilio_client = None
 
-TWILIO_FROM_NUMBER = os.getenv("TWILIO_PHONE_NUMBER") 
+def is_twilio_outage(error):
+    """
+    Decides whether an error should count against the circuit breaker.
+    Client errors such as an unknown number mean Twilio answered, so only server errors,
+    rate limiting and network failures count.
+    """
+    if isinstance(error, TwilioRestException):
+        return error.status is None or error.status >= 500 or error.status == 429
+    return True
+
+sms_breaker = CircuitBreaker("twilio-sms", is_failure=is_twilio_outage)
+lookup_breaker = CircuitBreaker("twilio-lookup", is_failure=is_twilio_outage)
 
 def get_twilio_client():
     return twilio_client
 
+def configure_twilio_breakers(app):
+    """
+    Builds the Twilio client with the credentials and HTTP timeout from the app config,
+    and applies the breaker thresholds and per-call timeout.
+    """
+    global twilio_client
+    twilio_client = Client(
+        app.config.get("TWILIO_ACCOUNT_SID"),
+        app.config.get("TWILIO_AUTH_TOKEN"),
+        http_client=TwilioHttpClient(timeout=app.config.get("TWILIO_TIMEOUT_SECONDS", 5))
+    )
+    for breaker in (sms_breaker, lookup_breaker):
+        breaker.configure(
+            failure_threshold=app.config.get("TWILIO_BREAKER_FAILURES", 5),
+            reset_timeout=app.config.get("TWILIO_BREAKER_RESET_SECONDS", 30),
+            timeout=app.config.get("TWILIO_TIMEOUT_SECONDS", 5)
+        )
@@ -1,24 +1,35 @@
 import jwt
+import json
+import uuid
+import base64
 import random
+import hashlib
 import logging 
-from datetime import datetime, timedelta, timezone
+import pytz
+from datetime import datetime, time, timedelta, timezone
 from flask import current_app, request, jsonify
 from functools import wraps
 from twilio.base.exceptions import TwilioRestException
-from twilio_client import get_twilio_client
-from twilio_client import twilio_client
+from twilio_client import get_twilio_client, lookup_breaker, is_twilio_outage
+from services.circuit_breaker import ServiceUnavailableError
 
-def generate_access_token(user_uid): 
+def generate_access_token(user_uid, device_uuid=None, generation=None): 
     """
     Generates a JWT access token for the given user.
+    The device and session generation claims allow stateless verification.
     """
     expires_in = current_app.config.get("ACCESS_TOKEN_EXPIRES", 120)
     expiry = datetime.now(timezone.utc) + timedelta(seconds=expires_in)
     payload = {
         "uid": user_uid,
         "type": "access",
+        "jti": uuid.uuid4().hex,
         "exp": expiry
     }
+    if device_uuid is not None:
+        payload["device"] = device_uuid
+    if generation is not None:
+        payload["gen"] = generation
     token = jwt.encode(payload, current_app.config["SECRET_KEY"], algorithm="HS256")
     return token,expiry
 
@@ -31,6 +42,7 @@ def generate_refresh_token(user_uid):
     payload = {
         "uid": user_uid,
         "type": "refresh",
+        "jti": uuid.uuid4().hex,
         "exp": expiry
     }
     token = jwt.encode(payload, current_app.config["SECRET_KEY"], algorithm="HS256")
@@ -43,6 +55,101 @@ def decode_token(token):
     return jwt.decode(token, current_app.config["SECRET_KEY"], algorithms=["HS256"])
 
 
+def hash_token(token):
+    """
+    Returns the SHA-256 hex digest of a token, used as a fixed-length lookup key.
+    """
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def encode_cursor(created_at, row_id):
+    """
+    Encodes a (created_at, id) keyset position as an opaque, URL-safe pagination cursor.
+    """
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decodes a cursor made by encode_cursor back into (created_at, id). Raises ValueError if it is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _search_query_digest(terms):
+    return hashlib.sha256(" ".join(terms).encode("utf-8")).hexdigest()[:16]
+
+
+def encode_search_cursor(offset, version, terms):
+    """
+    Encodes a position in ranked search results as an opaque, URL-safe cursor: the number of results
+    already returned, the todo list version they were ranked at, and a digest of the query terms.
+    """
+    raw = json.dumps([offset, version, _search_query_digest(terms)], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_search_cursor(cursor, terms):
+    """
+    Decodes a cursor made by encode_search_cursor for the same terms back into (offset, version).
+    Raises ValueError if it is malformed or was made for another query.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        offset, version, digest = json.loads(raw)
+        offset, version = int(offset), int(version)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if offset < 0 or digest != _search_query_digest(terms):
+        raise ValueError("Invalid cursor")
+    return offset, version
+
+
+def encode_sync_cursor(change_seq, row_id, synced_at):
+    """
+    Encodes a /todo/changes position: the (change_seq, id) of the last change sent, and the UTC time
+    (epoch seconds) from which every later change is still recorded past that position.
+    """
+    raw = json.dumps([change_seq, row_id, int(synced_at)], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_sync_cursor(cursor):
+    """
+    Decodes a cursor made by encode_sync_cursor back into ((change_seq, id), synced_at).
+    Raises ValueError if it is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        change_seq, row_id, synced_at = json.loads(raw)
+        return (int(change_seq), int(row_id)), int(synced_at)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def local_days_to_utc_range(first_day=None, last_day=None, tz_name="UTC"):
+    """
+    Converts the calendar days first_day..last_day (inclusive) in timezone tz_name into a
+    half-open [start, end) range of naive UTC datetimes, matching how created_at is stored.
+    A missing day leaves that side of the range open (None).
+    """
+    tz = pytz.timezone(tz_name)
+
+    def day_start_utc(day):
+        local_start = tz.localize(datetime.combine(day, time.min))
+        return local_start.astimezone(pytz.utc).replace(tzinfo=None)
+
+    start = day_start_utc(first_day) if first_day else None
+    end = day_start_utc(last_day + timedelta(days=1)) if last_day else None
+    return start, end
+
+
 def require_standard_headers(f):
     """
     Decorator to ensure required headers are present in the request.
@@ -69,19 +176,52 @@ def require_standard_headers(f):
 
 def validate_phone_number(phone_number):
     """
-    Validates a phone number using Twilio Lookup API.
+    Validates a phone number using Twilio Lookup API, served from the phone lookup cache when possible.
+    Impossible numbers are rejected offline by the number plan, and numbers from trusted regions skip Lookup.
     Returns a dict with details if valid, else None.
+    Raises ServiceUnavailableError if Lookup fails, is timing out or its circuit is open.
     """
-    try:
-        client = get_twilio_client()
-        phone = client.lookups.v2.phone_numbers(phone_number).fetch()
+    from services.phone_lookup import phone_lookup_cache
+    from services.number_plan import number_plan
+
+    parsed = number_plan.parse(phone_number)
+    if parsed is None:
+        return None
+    phone_number = parsed["number"]
+    if number_plan.is_trusted(parsed):
         return {
             "valid": True,
-            "number": phone.phone_number,
-            "country_code": phone.country_code,
+            "number": phone_number,
+            "country_code": parsed["country_code"],
         }
-    except TwilioRestException as e:
-        return None
+
+    cached = phone_lookup_cache.get(phone_number)
+    if cached is not None:
+        return cached if cached["valid"] else None
+
+    try:
+        client = get_twilio_client()
+        phone = lookup_breaker.call(lambda: client.lookups.v2.phone_numbers(phone_number).fetch())
+        if getattr(phone, "valid", True) is False:
+            result = {"valid": False}
+        else:
+            result = {
+                "valid": True,
+                "number": phone.phone_number,
+                "country_code": phone.country_code,
+            }
+    except ServiceUnavailableError:
+        raise
+    except Exception as e:
+        if isinstance(e, TwilioRestException) and not is_twilio_outage(e):
+            result = {"valid": False}
+        else:
+            # Twilio failed rather than rejecting the number, so the number is neither cached nor refused
+            logging.warning(f"Phone lookup failed for {phone_number}: {str(e)}")
+            raise ServiceUnavailableError(f"Phone lookup failed: {str(e)}") from e
+
+    phone_lookup_cache.put(phone_number, result)
+    return result if result["valid"] else None
 
 
 def generate_otp():
@@ -93,21 +233,23 @@ def generate_otp():
 
 def send_otp_sms(phone_number, otp_code):
     """
-    Send OTP via SMS using Twilio.
+    Queue an OTP SMS in the outbox; the SMS dispatcher sends it in the background.
     """
+    from sql_files.sms_sql import enqueue_sms
     try:
-        message = twilio_client.messages.create(
-            body=f"Your verification code is: {otp_code}. This code will expire in 5 minutes.",
-            from_=current_app.config.get('TWILIO_PHONE_NUMBER'),  
-            to=phone_number
+        expiry_minutes = current_app.config.get("OTP_EXPIRY_MINUTES", 5)
+        message = enqueue_sms(
+            to_number=phone_number,
+            body=f"Your verification code is: {otp_code}. This code will expire in {expiry_minutes} minutes.",
+            kind="otp"
         )
-        logging.info(f"OTP sent successfully to {phone_number}. Message SID: {message.sid}")
+        logging.info(f"OTP queued for {phone_number}. Outbox id: {message.id}")
         return {
             "success": True,
-            "message_sid": message.sid
+            "outbox_id": message.id
         }
     except Exception as e:
-        logging.error(f"Failed to send OTP to {phone_number}: {str(e)}")
+        logging.error(f"Failed to queue OTP to {phone_number}: {str(e)}")
         return {
             "success": False,
             "error": str(e)
@@ -116,23 +258,23 @@ def send_otp_sms(phone_number, otp_code):
 
 def send_welcome_sms(phone_number, first_name):
     """
-    Send welcome SMS after successful registration.
+    Queue a welcome SMS after successful registration.
     """
-    from twilio_client import twilio_client
+    from sql_files.sms_sql import enqueue_sms
     try:
-        message = twilio_client.messages.create(
+        message = enqueue_sms(
+            to_number=phone_number,
             body=f"Welcome {first_name}! Your account has been successfully created. Thank you for joining us!",
-            from_=current_app.config.get('TWILIO_PHONE_NUMBER'),
-            to=phone_number
+            kind="welcome"
         )
-        logging.info(f"Welcome SMS sent successfully to {phone_number}. Message SID: {message.sid}")
+        logging.info(f"Welcome SMS queued for {phone_number}. Outbox id: {message.id}")
         return {
             "success": True,
-            "message_sid": message.sid
+            "outbox_id": message.id
         }
     except Exception as e:
-        logging.error(f"Failed to send welcome SMS to {phone_number}: {str(e)}")
+        logging.error(f"Failed to queue welcome SMS to {phone_number}: {str(e)}")
         return {
             "success": False,
             "error": str(e)
-        }
\ No newline at end of file
+        }